@@ -0,0 +1,180 @@
+# Benchmarks of the analysis pipeline on synthetic traces, run with asv
+
+import tempfile
+
+from carbonplan_benchmarks.analysis import (
+    create_summary,
+    load_data,
+    load_snapshots,
+    plot_frames,
+    plot_requests,
+    plot_screenshot_rmse,
+    plot_zoom_levels,
+    process_run,
+)
+from carbonplan_benchmarks.analysis.parsing import (
+    extract_event_type,
+    extract_frame_data,
+    extract_request_data,
+)
+from carbonplan_benchmarks.analysis.processing import calculate_snapshot_rmse, process_actions
+from carbonplan_benchmarks.analysis.tasks import extract_task_data
+from carbonplan_benchmarks.testing import make_trace, write_trace
+
+# Trace sizes, from a quick run to a long run with many tiles
+SIZES = {
+    'small': {'requests': 50, 'frames': 300, 'screenshots': 20},
+    'medium': {'requests': 500, 'frames': 1500, 'screenshots': 60},
+    'large': {'requests': 2000, 'frames': 6000, 'screenshots': 200},
+}
+ZOOM_LEVELS = [0, 4]
+URL_FILTER = 'pyramids'
+
+
+class LoadData:
+    params = [list(SIZES), ZOOM_LEVELS]
+    param_names = ['size', 'zoom_levels']
+
+    def setup(self, size, zoom_levels):
+        self.directory = tempfile.TemporaryDirectory()
+        self.metadata_path, self.snapshot_path = write_trace(
+            self.directory.name, **SIZES[size], zoom_levels=zoom_levels
+        )
+
+    def teardown(self, size, zoom_levels):
+        self.directory.cleanup()
+
+    def time_load_data(self, size, zoom_levels):
+        load_data(metadata_path=self.metadata_path, run=0)
+
+    def peakmem_load_data(self, size, zoom_levels):
+        load_data(metadata_path=self.metadata_path, run=0)
+
+    def time_load_snapshots(self, size, zoom_levels):
+        load_snapshots(snapshot_path=self.snapshot_path)
+
+
+class FrameStore:
+    params = [list(SIZES), [False, True]]
+    param_names = ['size', 'frame_store']
+
+    def setup(self, size, frame_store):
+        self.directory = tempfile.TemporaryDirectory()
+        self.metadata_path, snapshot_path = write_trace(
+            self.directory.name, **SIZES[size], frame_store=frame_store
+        )
+        self.metadata, self.trace_events = load_data(metadata_path=self.metadata_path, run=0)
+        self.snapshots = load_snapshots(snapshot_path=snapshot_path)
+
+    def teardown(self, size, frame_store):
+        self.directory.cleanup()
+
+    def time_load_data(self, size, frame_store):
+        load_data(metadata_path=self.metadata_path, run=0)
+
+    def peakmem_load_data(self, size, frame_store):
+        load_data(metadata_path=self.metadata_path, run=0)
+
+    def time_calculate_snapshot_rmse(self, size, frame_store):
+        calculate_snapshot_rmse(
+            trace_events=self.trace_events, snapshots=self.snapshots, metadata=self.metadata
+        )
+
+
+class Parsing:
+    params = [list(SIZES)]
+    param_names = ['size']
+
+    def setup(self, size):
+        self.metadata, self.trace_events, self.snapshots = make_trace(**SIZES[size])
+
+    def time_extract_event_type(self, size):
+        extract_event_type(trace_events=self.trace_events, event_name='Screenshot')
+
+    def time_extract_request_data(self, size):
+        extract_request_data(trace_events=self.trace_events)
+
+    def time_extract_frame_data(self, size):
+        extract_frame_data(trace_events=self.trace_events)
+
+    def time_extract_task_data(self, size):
+        extract_task_data(trace_events=self.trace_events)
+
+
+class Processing:
+    params = [list(SIZES), ZOOM_LEVELS]
+    param_names = ['size', 'zoom_levels']
+
+    def setup(self, size, zoom_levels):
+        self.metadata, self.trace_events, self.snapshots = make_trace(
+            **SIZES[size], zoom_levels=zoom_levels
+        )
+        self.screenshot_data = calculate_snapshot_rmse(
+            trace_events=self.trace_events, snapshots=self.snapshots, metadata=self.metadata
+        )
+        self.data = process_run(
+            metadata=self.metadata,
+            trace_events=self.trace_events,
+            snapshots=self.snapshots,
+            url_filter=URL_FILTER,
+            profile=False,
+        )
+
+    def time_calculate_snapshot_rmse(self, size, zoom_levels):
+        calculate_snapshot_rmse(
+            trace_events=self.trace_events, snapshots=self.snapshots, metadata=self.metadata
+        )
+
+    def time_process_actions(self, size, zoom_levels):
+        process_actions(trace_events=self.trace_events, screenshot_data=self.screenshot_data)
+
+    def time_process_run(self, size, zoom_levels):
+        process_run(
+            metadata=self.metadata,
+            trace_events=self.trace_events,
+            snapshots=self.snapshots,
+            url_filter=URL_FILTER,
+            profile=False,
+        )
+
+    def peakmem_process_run(self, size, zoom_levels):
+        process_run(
+            metadata=self.metadata,
+            trace_events=self.trace_events,
+            snapshots=self.snapshots,
+            url_filter=URL_FILTER,
+            profile=False,
+        )
+
+    def time_create_summary(self, size, zoom_levels):
+        create_summary(
+            metadata=self.metadata,
+            data=self.data,
+            url_filter=URL_FILTER,
+            profile=False,
+            chunk_size=False,
+        )
+
+
+class Plotting:
+    params = [list(SIZES)]
+    param_names = ['size']
+
+    def setup(self, size):
+        metadata, trace_events, snapshots = make_trace(**SIZES[size])
+        self.metadata = metadata
+        self.data = process_run(
+            metadata=metadata, trace_events=trace_events, snapshots=snapshots, profile=False
+        )
+
+    def time_plot_requests(self, size):
+        plot_requests(self.data['request_data'], URL_FILTER)
+
+    def time_plot_frames(self, size):
+        plot_frames(self.data['frames_data'])
+
+    def time_plot_zoom_levels(self, size):
+        plot_zoom_levels(self.data['action_data'])
+
+    def time_plot_screenshot_rmse(self, size):
+        plot_screenshot_rmse(screenshot_data=self.data['screenshot_data'], metadata=self.metadata)
@@ -0,0 +1,18 @@
+# Import time benchmarks, each run in a fresh interpreter by asv
+
+
+class Imports:
+    def timeraw_import_package(self):
+        return 'import carbonplan_benchmarks'
+
+    def timeraw_import_analysis(self):
+        return 'import carbonplan_benchmarks.analysis'
+
+    def timeraw_import_processing(self):
+        return 'import carbonplan_benchmarks.analysis.processing'
+
+    def timeraw_import_plotting(self):
+        return 'import carbonplan_benchmarks.analysis.plotting'
+
+    def timeraw_import_cli(self):
+        return 'import carbonplan_benchmarks.playwright.cli'
@@ -1,2 +1,69 @@
-from .processing import process_run, load_data, load_snapshots, create_summary  # noqa
-from .plotting import plot_frames, plot_requests, plot_zoom_levels, plot_screenshot_rmse  # noqa
+import importlib
+
+# Public functions and the submodule defining each. Submodules are imported on first access so that
+# importing the package does not load plotting, dashboard and image processing dependencies.
+_LAZY_IMPORTS = {
+    'process_run': 'processing',
+    'load_data': 'processing',
+    'load_snapshots': 'processing',
+    'create_summary': 'processing',
+    'load_metadata': 'processing',
+    'plot_frames': 'plotting',
+    'plot_requests': 'plotting',
+    'plot_zoom_levels': 'plotting',
+    'plot_screenshot_rmse': 'plotting',
+    'extract_tile_requests': 'simulation',
+    'simulate_layout': 'simulation',
+    'suggest_layouts': 'simulation',
+    'summarize_coalescing': 'sharding',
+    'compute_waterfall': 'network',
+    'summarize_network': 'network',
+    'extract_task_data': 'tasks',
+    'summarize_tasks': 'tasks',
+    'summarize_frames': 'frames',
+    'summarize_visual_progress': 'visual',
+    'dashboard': 'dashboard',
+    'summarize_resources': 'resources',
+    'load_observer_data': 'observer',
+    'process_observer_run': 'observer',
+    'load_harness_data': 'harness',
+    'summarize_phases': 'harness',
+    'summarize_profiles': 'profiling',
+    'summarize_memory': 'profiling',
+}
+_SUBMODULES = {
+    'actions',
+    'dashboard',
+    'frames',
+    'harness',
+    'intervals',
+    'network',
+    'observer',
+    'parsing',
+    'plotting',
+    'processing',
+    'profiling',
+    'resources',
+    'sharding',
+    'simulation',
+    'tasks',
+    'visual',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(f'.{_LAZY_IMPORTS[name]}', __name__)
+        value = getattr(module, name)
+        # Cache the attribute so that later lookups skip __getattr__
+        globals()[name] = value
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_IMPORTS, *_SUBMODULES})
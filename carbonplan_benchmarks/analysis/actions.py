@@ -0,0 +1,85 @@
+# Utilities for pairing the user timing marks around each benchmarked action
+
+import re
+
+import pandas as pd
+
+from .parsing import extract_event_type
+
+# Marks of the initial load, of scripted actions, e.g. ``benchmark-2-pan:start``, and of runs
+# with a single repeated action, e.g. ``benchmark-zoom_in-level-0:start``
+ACTION_MARK = re.compile(
+    r'^benchmark-(?:initial-load|(?P<index>\d+)-(?P<action>\w+)|(?P<repeated>\w+)-level-\d+)'
+    r':(?P<edge>start|end)$'
+)
+# Change in the zoom level after each zoom action
+ZOOM_STEPS = {'zoom_in': 1, 'zoom_out': -1}
+ACTION_COLUMNS = ['label', 'action', 'zoom', 'start_time', 'action_end_time', 'baseline']
+
+
+def pair_action_marks(marks: pd.DataFrame):
+    """
+    Pair the start and end marks of each benchmarked action.
+
+    Parameters
+    ----------
+
+    marks: pd.DataFrame
+        User timing marks with ``name`` and ``startTime`` columns, e.g. trace events or the marks
+        recorded by the observer.
+
+    Returns
+    -------
+    actions : DataFrame with a row per action in the order they started, with the label and type
+        of the action, the zoom level after the action relative to the initial view, its start and
+        end marks and the zoom level of the baseline snapshot showing the view after the action.
+        The baseline is missing for actions below the initial zoom level and for any action after
+        the map was panned, stepped in time or switched variable.
+    """
+    rows = {}
+    for name, time in zip(marks['name'], marks['startTime']):
+        match = ACTION_MARK.match(name)
+        if not match:
+            continue
+        label = name.removeprefix('benchmark-').rsplit(':', 1)[0]
+        row = rows.setdefault(
+            label,
+            {'label': label, 'action': match['action'] or match['repeated'] or 'initial-load'},
+        )
+        row['start_time' if match['edge'] == 'start' else 'action_end_time'] = time
+    if not rows:
+        return pd.DataFrame(columns=ACTION_COLUMNS)
+    actions = pd.DataFrame(list(rows.values())).sort_values('start_time', ignore_index=True)
+    zooms, baselines = [], []
+    zoom, baseline = 0, 0
+    for action in actions['action']:
+        zoom += ZOOM_STEPS.get(action, 0)
+        if action in ZOOM_STEPS and baseline is not None:
+            baseline = zoom if zoom >= 0 else None
+        elif action != 'initial-load':
+            baseline = None
+        zooms.append(zoom)
+        baselines.append(baseline)
+    actions['zoom'] = zooms
+    actions['baseline'] = pd.array(baselines, dtype='Int64')
+    return actions[ACTION_COLUMNS]
+
+
+def extract_actions(*, trace_events: list):
+    """
+    Extract the benchmarked actions from the user timing marks of a Chromium trace.
+
+    Parameters
+    ----------
+
+    trace_events: list
+        The list of trace events.
+
+    Returns
+    -------
+    actions : DataFrame returned by ``pair_action_marks``
+    """
+    if not any(ACTION_MARK.match(event['name']) for event in trace_events):
+        return pd.DataFrame(columns=ACTION_COLUMNS)
+    marks = extract_event_type(trace_events=trace_events, event_name='benchmark-', exact=False)
+    return pair_action_marks(marks)
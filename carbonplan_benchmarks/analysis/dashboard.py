@@ -0,0 +1,276 @@
+# Utilities for comparing many benchmark runs from a consolidated summary table
+
+import json
+
+import fsspec
+import holoviews as hv
+import pandas as pd
+import panel as pn
+
+from ..compare import METRICS
+from .plotting import plot_frames, plot_requests, plot_zoom_levels
+from .processing import load_data, load_snapshots, process_run
+
+# Columns identifying a cell of the heatmap and a single run
+HEATMAP_COLUMNS = ['zoom', 'target_chunk_size', 'shard_size']
+RUN_COLUMNS = ['dataset', 'metadata_path', 'trace_path']
+# Other configuration columns, which are selected rather than mixed within a heatmap cell
+FILTER_COLUMNS = [
+    'action_type',
+    'cache_mode',
+    'device_profile',
+    'rendering_backend',
+    'projection',
+    'pixels_per_tile',
+]
+STATS = ['median', 'mean', 'std', 'min', 'max', 'count']
+
+
+def _filesystem(path: str):
+    storage_options = {'anon': True} if 's3' in path else {}
+    return fsspec.core.url_to_fs(path, **storage_options)
+
+
+@pn.cache
+def _read_summary(path: str, columns: tuple, key: str):
+    fs, fs_path = _filesystem(path)
+    with fs.open(fs_path) as f:
+        summary = pd.read_parquet(f, columns=list(columns) if columns else None)
+    if 'dataset' not in summary.columns:
+        summary = summary.reset_index()
+    return summary
+
+
+def read_summary(path: str, *, columns: tuple = None):
+    """
+    Read a consolidated summary table, loading only the requested columns
+
+    Tables are cached until the file changes, and each call returns its own copy.
+
+    Parameters
+    ----------
+
+    path: str
+        Path to the Parquet summary table.
+
+    columns: tuple, optional
+        Columns to load. Loads every column by default.
+
+    Returns
+    -------
+    summary : pd.DataFrame with the dataset as a column
+    """
+    fs, fs_path = _filesystem(path)
+    return _read_summary(path, columns, fs.ukey(fs_path)).copy()
+
+
+def summary_columns(path: str):
+    """
+    Get the columns of a Parquet summary table without reading it
+    """
+    import pyarrow.parquet as pq
+
+    fs, fs_path = _filesystem(path)
+    with fs.open(fs_path) as f:
+        return pq.read_schema(f).names
+
+
+def aggregate_summary(
+    summary: pd.DataFrame,
+    *,
+    metric: str = 'duration',
+    by: list = HEATMAP_COLUMNS,
+    stats: list = STATS,
+):
+    """
+    Aggregate a metric across runs of each configuration
+
+    Parameters
+    ----------
+
+    summary: pd.DataFrame
+        Consolidated summary table from ``create_summary``.
+
+    metric: str
+        Column to aggregate.
+
+    by: list
+        Columns identifying a configuration.
+
+    stats: list
+        Aggregations to compute.
+
+    Returns
+    -------
+    aggregated : DataFrame with one row per configuration and one column per statistic
+    """
+    return summary.groupby(list(by))[metric].agg(list(stats)).reset_index()
+
+
+def plot_heatmap(summary: pd.DataFrame, *, metric: str = 'duration', stat: str = 'median'):
+    """
+    Plot a heatmap of a metric against chunk size and shard size for each zoom level
+    """
+    aggregated = aggregate_summary(summary, metric=metric)
+    heatmaps = {
+        zoom: hv.HeatMap(
+            group, kdims=['target_chunk_size', 'shard_size'], vdims=[stat, 'count']
+        ).opts(
+            width=500,
+            colorbar=True,
+            tools=['hover', 'tap'],
+            xlabel='Target chunk size (MB)',
+            ylabel='Shard size',
+            title=f'{stat} {metric}',
+        )
+        for zoom, group in aggregated.groupby('zoom')
+    }
+    return hv.HoloMap(heatmaps, kdims='zoom')
+
+
+def plot_distributions(summary: pd.DataFrame, *, metric: str = 'duration', by: str = 'dataset'):
+    """
+    Plot the distribution of a metric across runs of each configuration for each zoom level
+    """
+    distributions = {
+        zoom: hv.BoxWhisker(group, kdims=[by], vdims=[metric]).opts(
+            width=1000, xrotation=90, tools=['hover'], title=metric
+        )
+        for zoom, group in summary.groupby('zoom')
+    }
+    return hv.HoloMap(distributions, kdims='zoom')
+
+
+def load_run(*, metadata_path: str, trace_path: str, snapshots: dict, url_filter: str = None):
+    """
+    Load and process the run recorded at ``trace_path`` within a metadata file
+
+    Returns
+    -------
+    data : Dict returned by ``process_run``
+    """
+    fs = fsspec.filesystem('s3', anon=True) if 's3' in metadata_path else fsspec.filesystem('file')
+    with fs.open(metadata_path) as f:
+        runs = [run['trace_path'] for run in json.loads(f.read())]
+    metadata, trace_events = load_data(
+        metadata_path=metadata_path, run=runs.index(trace_path.split('/')[-1])
+    )
+    return process_run(
+        metadata=metadata, trace_events=trace_events, snapshots=snapshots, url_filter=url_filter
+    )
+
+
+def plot_run(data: dict, *, url_filter: str = None):
+    """
+    Plot the network waterfall and frames of a single run with the span of each action
+    """
+    request_data = data['request_data'].reset_index(drop=True)
+    action_data = data['action_data']
+    requests = plot_requests(request_data, url_filter) * plot_zoom_levels(
+        action_data, yh=len(request_data)
+    )
+    frames = plot_frames(data['frames_data']) * plot_zoom_levels(action_data, yl=1, yh=2)
+    return (requests + frames).cols(1)
+
+
+def dashboard(*, summary_path: str, snapshot_path: str, url_filter: str = None):
+    """
+    Create a Panel app comparing runs across configurations
+
+    Selecting a cell of the heatmap lists the runs of that configuration, and selecting a run
+    plots its network waterfall and frames. Runs with other action types, cache modes, device
+    profiles, rendering backends, projections or pixels per tile are chosen with selectors
+    rather than mixed together. Summary columns and runs are loaded only when needed.
+
+    Parameters
+    ----------
+
+    summary_path: str
+        Path to the Parquet summary table.
+
+    snapshot_path: str
+        Path to the baseline snapshots used to process individual runs.
+
+    url_filter: str, optional
+        Filter requests based on this url.
+
+    Returns
+    -------
+    app : pn.Column, which can be displayed in a notebook or served with ``.servable()``
+    """
+    columns = summary_columns(summary_path)
+    filter_columns = [column for column in FILTER_COLUMNS if column in columns]
+    configurations = read_summary(summary_path, columns=tuple(['zoom'] + filter_columns))
+    zooms = sorted(configurations['zoom'].unique())
+    metric = pn.widgets.Select(name='Metric', options=list(METRICS))
+    stat = pn.widgets.Select(name='Statistic', options=STATS)
+    zoom = pn.widgets.Select(name='Zoom', options=zooms)
+    filters = {
+        column: pn.widgets.Select(
+            name=column.replace('_', ' ').capitalize(),
+            options=sorted(configurations[column].dropna().unique().tolist()),
+        )
+        for column in filter_columns
+    }
+
+    def load(metric, *values):
+        summary = read_summary(
+            summary_path, columns=tuple(RUN_COLUMNS + HEATMAP_COLUMNS + filter_columns + [metric])
+        )
+        for column, value in zip(filter_columns, values):
+            summary = summary[summary[column] == value]
+        return summary
+
+    def cell_heatmap(metric, stat, zoom, *values):
+        return plot_heatmap(load(metric, *values), metric=metric, stat=stat)[zoom]
+
+    heatmap = hv.DynamicMap(pn.bind(cell_heatmap, metric, stat, zoom, *filters.values()))
+    tap = hv.streams.Tap(source=heatmap, x=None, y=None)
+    runs = pn.widgets.Tabulator(
+        pd.DataFrame(columns=RUN_COLUMNS + [metric.value]),
+        selectable=1,
+        disabled=True,
+        show_index=False,
+        height=250,
+    )
+
+    def update_runs(*events):
+        summary = load(metric.value, *(widget.value for widget in filters.values()))
+        # Categorical axes report the tapped cell as strings
+        selected = (summary['zoom'] == zoom.value) & (
+            summary['target_chunk_size'].astype(str) == str(tap.x)
+        )
+        selected &= summary['shard_size'].astype(str) == str(tap.y)
+        runs.value = summary.loc[selected, RUN_COLUMNS + [metric.value]].reset_index(drop=True)
+
+    tap.param.watch(update_runs, ['x', 'y'])
+    metric.param.watch(update_runs, 'value')
+    zoom.param.watch(update_runs, 'value')
+    for widget in filters.values():
+        widget.param.watch(update_runs, 'value')
+
+    @pn.cache
+    def snapshots():
+        return load_snapshots(snapshot_path=snapshot_path)
+
+    def drilldown(selection):
+        if not selection:
+            return pn.pane.Markdown('Select a run to plot its network waterfall and frames.')
+        run = runs.value.iloc[selection[0]]
+        data = load_run(
+            metadata_path=run['metadata_path'],
+            trace_path=run['trace_path'],
+            snapshots=snapshots(),
+            url_filter=url_filter,
+        )
+        return plot_run(data, url_filter=url_filter)
+
+    def distributions(metric, zoom, *values):
+        return plot_distributions(load(metric, *values), metric=metric)[zoom]
+
+    return pn.Column(
+        pn.Row(metric, stat, zoom, *filters.values()),
+        pn.Row(heatmap, runs),
+        pn.panel(pn.bind(distributions, metric, zoom, *filters.values())),
+        pn.panel(pn.bind(drilldown, runs.param.selection)),
+    )
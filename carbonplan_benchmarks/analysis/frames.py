@@ -0,0 +1,62 @@
+# Utilities for summarizing frame pacing within each action
+
+import pandas as pd
+
+from .intervals import assign_actions
+
+
+def summarize_frames(
+    *, frames_data: pd.DataFrame, action_data: pd.DataFrame, frame_budget: float = 1000 / 60
+):
+    """
+    Summarize frame durations and dropped frames for each action.
+
+    Frames are assigned to an action when they begin within ``start_time`` and ``end_time``,
+    matching the ``fps`` column of ``create_summary``.
+
+    Parameters
+    ----------
+
+    frames_data: pd.DataFrame
+        Frame data returned by ``extract_frame_data``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    frame_budget: float
+        Target frame duration in ms.
+
+    Returns
+    -------
+    frames : DataFrame with one row per action. ``jank_score`` is the time by which frames
+        exceeded ``frame_budget`` as a percentage of the action duration.
+    """
+    frames = frames_data[['startTime', 'duration', 'dropped']].copy()
+    frames['action'] = assign_actions(frames['startTime'], action_data=action_data, end='end_time')
+    frames = frames.dropna(subset=['action']).sort_values('startTime')
+    frames['over_budget'] = (frames['duration'] - frame_budget).clip(lower=0)
+    # Label runs of consecutive frames that share the same dropped state within an action
+    frames['run'] = (
+        (frames['dropped'] != frames['dropped'].shift())
+        | (frames['action'] != frames['action'].shift())
+    ).cumsum()
+    dropped_runs = frames[frames['dropped']].groupby(['action', 'run']).size()
+
+    grouped = frames.groupby('action')
+    summary = pd.DataFrame(index=action_data.index)
+    summary['frame_duration_p50'] = grouped['duration'].quantile(0.5)
+    summary['frame_duration_p95'] = grouped['duration'].quantile(0.95)
+    summary['frame_duration_p99'] = grouped['duration'].quantile(0.99)
+    summary['longest_frame'] = grouped['duration'].max()
+    summary['dropped_frames'] = grouped['dropped'].sum()
+    summary['dropped_frame_percent'] = grouped['dropped'].mean() * 100
+    summary['longest_dropped_run'] = dropped_runs.groupby('action').max()
+    summary[['dropped_frames', 'longest_dropped_run']] = summary[
+        ['dropped_frames', 'longest_dropped_run']
+    ].fillna(0)
+    summary['jank_score'] = (
+        grouped['over_budget'].sum().reindex(summary.index, fill_value=0)
+        / action_data['duration']
+        * 100
+    )
+    return summary
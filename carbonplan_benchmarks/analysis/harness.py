@@ -0,0 +1,111 @@
+# Utilities for summarizing where the wall-clock time of the benchmark harness goes
+
+import json
+import re
+
+import fsspec
+import pandas as pd
+
+# Phases during which the benchmarked page is measured. Every other phase is harness overhead.
+MEASURED_PHASES = ['initial-load', 'actions']
+
+
+def phase_group(name: str):
+    """
+    Group the phases of each benchmarked action, e.g. ``zoom_in-level-2`` or ``3-pan``, as
+    ``actions``
+    """
+    return 'actions' if re.search(r'-level-\d+$|^\d+-', name) else name
+
+
+def load_harness_data(path: str):
+    """
+    Load the harness phase spans recorded in the metadata of each run
+
+    Parameters
+    ----------
+
+    path: str
+        Path or glob of ``data-*.json`` metadata files, e.g.
+        ``s3://carbonplan-benchmarks/benchmark-data/v0.2/data-*.json``
+
+    Returns
+    -------
+    phase_data : DataFrame with one row per phase span of each run, including the background
+        upload of each output as an ``upload`` span without a start time
+    """
+    fs, _, paths = fsspec.get_fs_token_paths(path)
+    if not paths:
+        raise FileNotFoundError(f'No metadata found at {path}')
+    rows = []
+    for p in paths:
+        with fs.open(p) as f:
+            metadata = json.loads(f.read())
+        for run in metadata:
+            if 'phases' not in run:
+                continue
+            info = {
+                'metadata_path': p,
+                'run_number': run['run_number'],
+                'dataset': run['dataset'],
+                'harness_duration': run['harness_duration'],
+            }
+            rows.extend({**info, **span, 'background': False} for span in run['phases'])
+            rows.extend(
+                {**info, 'name': 'upload', 'duration': upload['duration'], 'background': True}
+                for upload in run.get('uploads', {}).values()
+                if 'duration' in upload
+            )
+    if not rows:
+        raise ValueError(f'No harness phases were recorded in the metadata at {path}')
+    phase_data = pd.DataFrame(rows)
+    phase_data['group'] = phase_data['name'].map(phase_group)
+    phase_data['measured'] = phase_data['group'].isin(MEASURED_PHASES)
+    return phase_data
+
+
+def summarize_phases(phase_data: pd.DataFrame):
+    """
+    Summarize where the harness wall-clock time goes across all runs.
+
+    Time within a run that is not covered by any phase is reported as ``unaccounted``. Uploads
+    overlap with later runs, so they are reported separately and not included in the percentages.
+
+    Parameters
+    ----------
+
+    phase_data: pd.DataFrame
+        Phase spans returned by ``load_harness_data``.
+
+    Returns
+    -------
+    summary : DataFrame indexed by phase group with the total, mean and maximum seconds spent in
+        each group, the percentage of the total harness time, and whether the page is measured
+        during the group, sorted by total time
+    """
+    runs = phase_data.groupby(['metadata_path', 'run_number'])['harness_duration'].first()
+    total = runs.sum()
+    foreground = phase_data[~phase_data['background']]
+    unaccounted = runs - foreground.groupby(['metadata_path', 'run_number'])['duration'].sum()
+    phase_data = pd.concat(
+        [
+            phase_data,
+            pd.DataFrame(
+                {
+                    'group': 'unaccounted',
+                    'duration': unaccounted.clip(lower=0).to_numpy(),
+                    'background': False,
+                    'measured': False,
+                }
+            ),
+        ]
+    )
+    summary = phase_data.groupby('group').agg(
+        total_seconds=('duration', 'sum'),
+        mean_seconds=('duration', 'mean'),
+        max_seconds=('duration', 'max'),
+        measured=('measured', 'first'),
+        background=('background', 'first'),
+    )
+    summary['percent'] = (summary['total_seconds'] / total * 100).where(~summary['background'])
+    return summary.sort_values('total_seconds', ascending=False)
@@ -0,0 +1,71 @@
+# Utilities for working with time intervals and action windows
+
+import numpy as np
+import pandas as pd
+
+
+def assign_actions(times: pd.Series, *, action_data: pd.DataFrame, end: str = 'action_end_time'):
+    """
+    Assign each time to the action whose window contains it.
+
+    Windows are open at ``start_time`` and closed at ``end``, matching ``create_summary``.
+
+    Parameters
+    ----------
+
+    times: pd.Series
+        Times in ms relative to the start of the trace.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    end: str
+        Column of ``action_data`` marking the end of each window.
+
+    Returns
+    -------
+    actions : pd.Series
+        Index of the action containing each time, NaN for times outside every window
+    """
+    actions = pd.Series(np.nan, index=times.index)
+    for ind, action in action_data.iterrows():
+        actions[(times > action['start_time']) & (times <= action[end])] = ind
+    return actions
+
+
+def merge_intervals(starts, ends):
+    """
+    Merge overlapping intervals.
+
+    Parameters
+    ----------
+
+    starts, ends: array-like
+        Start and end of each interval.
+
+    Returns
+    -------
+    starts, ends : np.ndarray
+        Start and end of each disjoint interval, sorted by start
+    """
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    if not len(starts):
+        return starts, ends
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    running_end = np.maximum.accumulate(ends)
+    # A new interval begins wherever the start is past every previous end
+    new = np.r_[True, starts[1:] > running_end[:-1]]
+    group = np.cumsum(new) - 1
+    merged_ends = np.full(group[-1] + 1, -np.inf)
+    np.maximum.at(merged_ends, group, ends)
+    return starts[new], merged_ends
+
+
+def union_duration(starts, ends):
+    """
+    Total time covered by at least one interval.
+    """
+    starts, ends = merge_intervals(starts, ends)
+    return float(np.sum(ends - starts))
@@ -0,0 +1,172 @@
+# Utilities for analyzing the network waterfall of each action
+
+import numpy as np
+import pandas as pd
+
+from .intervals import assign_actions
+
+
+def concurrency_timeline(requests: pd.DataFrame):
+    """
+    Count the requests in flight over time.
+
+    Parameters
+    ----------
+
+    requests: pd.DataFrame
+        Request data with ``request_start`` and ``response_end`` columns.
+
+    Returns
+    -------
+    timeline : DataFrame with the number of requests in flight from each ``time`` onwards
+    """
+    requests = requests.dropna(subset=['request_start', 'response_end'])
+    times = np.r_[requests['request_start'].to_numpy(), requests['response_end'].to_numpy()]
+    steps = np.r_[np.ones(len(requests)), -np.ones(len(requests))]
+    # Sort ends before starts at the same time so back-to-back requests do not overlap
+    order = np.lexsort((steps, times))
+    timeline = pd.DataFrame({'time': times[order], 'in_flight': np.cumsum(steps[order])})
+    return timeline.drop_duplicates(subset=['time'], keep='last').reset_index(drop=True)
+
+
+def critical_path(requests: pd.DataFrame):
+    """
+    Find the chain of requests that determines when the last response completes.
+
+    Starting from the request that finishes last, each step goes back to the latest request that
+    finished before the current request started, since the current request may have waited on it.
+
+    Parameters
+    ----------
+
+    requests: pd.DataFrame
+        Request data with ``request_start`` and ``response_end`` columns.
+
+    Returns
+    -------
+    path : list
+        Index labels of the requests on the critical path, in order
+    """
+    requests = requests.dropna(subset=['request_start', 'response_end'])
+    if requests.empty:
+        return []
+    ends = requests['response_end']
+    path = [ends.idxmax()]
+    while True:
+        prior = ends[ends <= requests.loc[path[-1], 'request_start']]
+        if prior.empty:
+            break
+        path.append(prior.idxmax())
+    return path[::-1]
+
+
+def compute_waterfall(
+    *, request_data: pd.DataFrame, action_data: pd.DataFrame, url_filter: str = None
+):
+    """
+    Break each request into queueing, time to first byte and transfer time and mark the requests
+    on the critical path of each action.
+
+    Parameters
+    ----------
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_request_data``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    url_filter: str, optional
+        If specified, only include requests where the URL contains this string.
+
+    Returns
+    -------
+    waterfall_data : DataFrame with one row per request in an action window
+    """
+    requests = request_data
+    if url_filter:
+        requests = requests[requests['url'].str.contains(url_filter)]
+    requests = requests.copy()
+    requests['action'] = assign_actions(requests['request_start'], action_data=action_data)
+    requests = requests.dropna(subset=['action'])
+    requests['action'] = requests['action'].astype(int)
+    # Fall back to the renderer's view of the response when network timing was not recorded
+    headers_end = requests['receive_headers_end'].fillna(requests['response_start'])
+    send_start = requests['send_start'].fillna(requests['request_start'])
+    requests['queueing'] = send_start - requests['request_start']
+    requests['ttfb'] = headers_end - send_start
+    requests['transfer'] = requests['response_end'] - headers_end
+    requests['critical_path'] = False
+    for _, group in requests.groupby('action'):
+        requests.loc[critical_path(group), 'critical_path'] = True
+    return requests[
+        [
+            'action',
+            'url',
+            'method',
+            'request_start',
+            'response_end',
+            'encoded_data_length',
+            'total_response_time_ms',
+            'queueing',
+            'ttfb',
+            'transfer',
+            'critical_path',
+        ]
+    ].reset_index(drop=True)
+
+
+def summarize_network(*, waterfall_data: pd.DataFrame, action_data: pd.DataFrame):
+    """
+    Summarize concurrency, throughput and latency components of the requests in each action.
+
+    Parameters
+    ----------
+
+    waterfall_data: pd.DataFrame
+        Per-request data returned by ``compute_waterfall``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    Returns
+    -------
+    network : DataFrame with one row per action
+    """
+
+    def summarize(requests):
+        duration = requests['response_end'].max() - requests['request_start'].min()
+        path = requests[requests['critical_path']]
+        return pd.Series(
+            {
+                'max_concurrent_requests': concurrency_timeline(requests)['in_flight'].max(),
+                # Time-weighted mean of the number of requests in flight
+                'mean_concurrent_requests': requests['total_response_time_ms'].sum() / duration,
+                'bytes_per_second': requests['encoded_data_length'].sum() / (duration * 1e-3),
+                'median_ttfb': requests['ttfb'].median(),
+                'median_queueing': requests['queueing'].median(),
+                'median_transfer': requests['transfer'].median(),
+                'critical_path_requests': len(path),
+                'critical_path_queueing': path['queueing'].sum(),
+                'critical_path_ttfb': path['ttfb'].sum(),
+                'critical_path_transfer': path['transfer'].sum(),
+            }
+        )
+
+    columns = [
+        'max_concurrent_requests',
+        'mean_concurrent_requests',
+        'bytes_per_second',
+        'median_ttfb',
+        'median_queueing',
+        'median_transfer',
+        'critical_path_requests',
+        'critical_path_queueing',
+        'critical_path_ttfb',
+        'critical_path_transfer',
+    ]
+    network = pd.DataFrame(index=action_data.index, columns=columns, dtype=float)
+    for action, requests in waterfall_data.groupby('action'):
+        network.loc[action] = summarize(requests)
+    network['critical_path_requests'] = network['critical_path_requests'].fillna(0)
+    return network
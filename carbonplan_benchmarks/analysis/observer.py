@@ -0,0 +1,213 @@
+# Utilities for processing lightweight in-page metrics into the same tables as a Chromium trace
+
+import json
+
+import fsspec
+import numpy as np
+import pandas as pd
+
+from .actions import pair_action_marks
+from .network import compute_waterfall
+from .parsing import compact_dtypes
+from .processing import load_metadata
+
+
+def load_observer_data(*, metadata_path: str, run: int):
+    """
+    Load data associated with a run recorded with ``--collection-mode observer``
+
+    metadata_path: str
+        Path to metadata file for a specific run.
+
+    run: int
+        Integer index of run to process.
+
+    Returns
+    -------
+    metadata, observer_data
+    """
+    metadata = load_metadata(metadata_path=metadata_path, run=run)
+    if metadata.get('collection_mode') != 'observer':
+        raise ValueError(f'Run {run} in {metadata_path} was not recorded in observer mode')
+    if 's3' in metadata_path:
+        fs = fsspec.filesystem('s3', anon=True)
+    else:
+        fs = fsspec.filesystem('file')
+    observer_path = f'{"/".join(metadata_path.split("/")[:-1])}/{metadata["observer_path"]}'
+    metadata['full_observer_path'] = observer_path
+    with fs.open(observer_path) as f:
+        observer_data = json.loads(f.read())
+    return metadata, observer_data
+
+
+def _entries(observer_data: dict, key: str):
+    return pd.DataFrame(observer_data[key], columns=observer_data['fields'][key])
+
+
+def extract_observer_request_data(*, observer_data: dict, url_filter: str = None):
+    """
+    Convert resource timing entries to the columns of ``extract_request_data``.
+
+    Cross-origin responses without a ``Timing-Allow-Origin`` header report zero for the detailed
+    timings, which are left missing. Resource timing does not expose request methods, priorities or
+    headers, so method and priority are always missing.
+
+    Parameters
+    ----------
+
+    observer_data: dict
+        Observer data returned by ``load_observer_data``.
+
+    url_filter: str, optional
+        If specified, only include requests where the URL contains this string.
+
+    Returns
+    -------
+    request_data : DataFrame containing information about requests
+    """
+    resources = _entries(observer_data, 'resources')
+    timings = resources[['requestStart', 'responseStart']].astype(float).replace(0, np.nan)
+    data = pd.DataFrame(
+        {
+            'request_start': resources['startTime'].astype(float),
+            'response_end': resources['responseEnd'].astype(float),
+            'send_start': timings['requestStart'],
+            'receive_headers_end': timings['responseStart'],
+            'response_start': timings['responseStart'],
+            'received_data_length': resources['encodedBodySize'],
+            'encoded_data_length': resources['transferSize'],
+            'priority': None,
+            'url': resources['name'],
+            'method': None,
+            'status_code': resources['responseStatus'],
+        }
+    )
+    data['total_response_time_ms'] = data['response_end'] - data['request_start']
+    # Cached responses transfer no bytes over the network
+    data['from_cache'] = (resources['transferSize'] == 0) & (resources['encodedBodySize'] > 0)
+    for column in ['range_start', 'range_end', 'object_size', 'suffix_length']:
+        data[column] = np.nan
+    if url_filter:
+        data = data[data['url'].str.contains(url_filter)]
+    return compact_dtypes(data.sort_values('request_start').reset_index(drop=True))
+
+
+def extract_observer_frame_data(*, observer_data: dict, frame_budget: float = 1000 / 60):
+    """
+    Convert animation frame times to the columns of ``extract_frame_data``.
+
+    A frame is counted as dropped when it lasts longer than one and a half frame budgets, i.e.
+    when at least one vsync passed without a new frame.
+
+    Parameters
+    ----------
+
+    observer_data: dict
+        Observer data returned by ``load_observer_data``.
+
+    frame_budget: float
+        Target frame duration in ms.
+
+    Returns
+    -------
+    frame_data : DataFrame containing information about frames
+    """
+    times = np.asarray(observer_data['frames'], dtype=float)
+    frames = pd.DataFrame({'startTime': times[:-1], 'endTime': times[1:]})
+    frames['duration'] = frames['endTime'] - frames['startTime']
+    frames['dropped'] = frames['duration'] > 1.5 * frame_budget
+    frames['isPartial'] = False
+    frames['drawn'] = ~frames['dropped']
+    frames['idle'] = False
+    return compact_dtypes(frames)
+
+
+def process_observer_actions(*, observer_data: dict, request_data: pd.DataFrame):
+    """
+    Get the window of each action from the user timing marks.
+
+    Without screenshots, the end of each action is when the last response of a request made
+    during the action completed, and ``min_rmse`` is missing.
+
+    Parameters
+    ----------
+
+    observer_data: dict
+        Observer data returned by ``load_observer_data``.
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_observer_request_data``.
+
+    Returns
+    -------
+    action_data : DataFrame with the same columns as ``process_actions``
+    """
+    action_data = pair_action_marks(_entries(observer_data, 'marks'))
+    for ind, action in action_data.iterrows():
+        requests = request_data[
+            (request_data['request_start'] > action['start_time'])
+            & (request_data['request_start'] <= action['action_end_time'])
+        ]
+        action_data.loc[ind, 'end_time'] = (
+            requests['response_end'].max() if len(requests) else action['start_time']
+        )
+    action_data['min_rmse'] = np.nan
+    action_data['duration'] = action_data['end_time'] - action_data['start_time']
+    return action_data[
+        [
+            'label',
+            'action',
+            'zoom',
+            'start_time',
+            'end_time',
+            'action_end_time',
+            'min_rmse',
+            'duration',
+        ]
+    ]
+
+
+def process_observer_run(*, metadata: dict, observer_data: dict, url_filter: str = None):
+    """
+    Process the results from a benchmarking run recorded with ``--collection-mode observer``.
+
+    Parameters
+    ----------
+
+    metadata: dict
+        Metadata for a specific run.
+
+    observer_data: dict
+        Observer data returned by ``load_observer_data``.
+
+    url_filter: str
+        Filter requests based on this url.
+
+    Returns
+    -------
+    data : Dict containing request_data, frames_data, action_data, waterfall_data, the
+        url_filter of the waterfall and longtask_data for the run, which can be passed to
+        ``create_summary``.
+    """
+    request_data = extract_observer_request_data(observer_data=observer_data)
+    frames_data = extract_observer_frame_data(observer_data=observer_data)
+    # Actions end when the last matching request completes
+    filtered_request_data = request_data
+    if url_filter:
+        filtered_request_data = request_data[request_data['url'].str.contains(url_filter)]
+    action_data = process_observer_actions(
+        observer_data=observer_data, request_data=filtered_request_data
+    )
+    waterfall_data = compute_waterfall(
+        request_data=request_data, action_data=action_data, url_filter=url_filter
+    )
+    longtask_data = _entries(observer_data, 'longtasks')
+    longtask_data['endTime'] = longtask_data['startTime'] + longtask_data['duration']
+    return {
+        'request_data': request_data,
+        'frames_data': frames_data,
+        'action_data': action_data,
+        'waterfall_data': waterfall_data,
+        'url_filter': url_filter,
+        'longtask_data': longtask_data,
+    }
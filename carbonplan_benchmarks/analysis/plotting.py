@@ -1,71 +1,112 @@
 # Utilities for plotting information from chromium trace records
 
+import functools
+import operator
+
 import holoviews as hv
 import hvplot.pandas  # noqa
+import numpy as np
 import pandas as pd
 from bokeh.models import HoverTool
 
 pd.options.plotting.backend = 'holoviews'
 
+# Number of rectangles above which plots are rasterized with datashader
+RASTERIZE_THRESHOLD = 5000
+
+REQUEST_TOOLTIPS = [
+    ('Request start (ms)', '@request_start'),
+    ('Response end (ms)', '@response_end'),
+    ('Request duration (ms)', '@total_response_time_ms'),
+    ('Encoded data length', '@encoded_data_length'),
+    ('url', '@url'),
+    ('Method', '@method'),
+]
+# Frame states in order of increasing precedence when a frame is in more than one state
+FRAME_COLORS = {'idle': 'lightgrey', 'isPartial': 'yellow', 'dropped': 'red', 'drawn': 'lightgreen'}
 
-def plot_request_with_hover_tool(row):
-    df = pd.DataFrame({'time': [row['request_start'] + 5, row['response_end'] - 5]})
-    df['y'] = row.name + 0.5
-    include_vars = [
-        'y',
-        'encoded_data_length',
-        'url',
-        'method',
-        'total_response_time_ms',
-        'request_start',
-        'response_end',
-    ]
-    for var in include_vars[1:]:
-        df[var] = row[var]
-    df['url'] = df['url'].apply(lambda x: '/'.join(x.split('/')[10:]))
-    lines = hv.Curve(df, 'time', include_vars)
-    tooltips = [
-        ('Request start (ms)', '@request_start'),
-        ('Response end (ms)', '@response_end'),
-        ('Request duration (ms)', '@total_response_time_ms'),
-        ('Encoded data length', '@encoded_data_length'),
-        ('url', '@url'),
-        ('Method', '@method'),
-    ]
-    hover = HoverTool(tooltips=tooltips)
-    lines.opts(tools=[hover], line_color='lightgrey')
-    return lines
-
-
-def plot_requests(request_data: pd.DataFrame, url_filter: str = None):
+
+def rasterize_rectangles(plt: hv.Rectangles, *, color: str, threshold: int = RASTERIZE_THRESHOLD):
+    """
+    Rasterize rectangles with datashader when there are more than ``threshold`` of them
+
+    Parameters
+    ----------
+
+    plt: hv.Rectangles
+        Rectangles to rasterize.
+
+    color: str
+        Color of the rasterized rectangles.
+
+    threshold: int, optional
+        Number of rectangles above which to rasterize. Use None to never rasterize.
+
+    Returns
+    -------
+    plt : The rectangles, or a dynamically rasterized image of the rectangles
+    """
+    if threshold is None or len(plt) <= threshold:
+        return plt
+    from holoviews.operation.datashader import rasterize
+
+    return rasterize(plt).opts(cmap=[color, color], colorbar=False)
+
+
+def plot_requests(
+    request_data: pd.DataFrame, url_filter: str = None, *, threshold: int = RASTERIZE_THRESHOLD
+):
     """
     Plot rectangles showing each request duration
     """
-    request_data['rectangle'] = request_data.apply(
-        lambda x: (
-            x['request_start'],
-            x.name,
-            x['response_end'],
-            x.name + 1,
-        ),
-        axis=1,
+    rectangles = pd.DataFrame(
+        {
+            'x0': request_data['request_start'],
+            'y0': request_data.index,
+            'x1': request_data['response_end'],
+            'y1': request_data.index + 1,
+            'request_start': request_data['request_start'],
+            'response_end': request_data['response_end'],
+            'total_response_time_ms': request_data['total_response_time_ms'],
+            'encoded_data_length': request_data['encoded_data_length'],
+            'url': request_data['url'].str.split('/').str[10:].str.join('/'),
+            'method': request_data['method'],
+        },
+        index=request_data.index,
     )
     if url_filter:
-        request_data = request_data[request_data.url.str.contains(url_filter)]
-    plt = hv.Rectangles(request_data['rectangle'].to_list())
-    plt.opts(width=1000, color='lightgrey', xlabel='Time (ms)', yaxis=None, title='Network')
-    for row in request_data.iterrows():
-        plt = plt * plot_request_with_hover_tool(row[1])
-    return plt
+        rectangles = rectangles[request_data['url'].str.contains(url_filter)]
+    plt = hv.Rectangles(
+        rectangles, kdims=['x0', 'y0', 'x1', 'y1'], vdims=list(rectangles.columns[4:])
+    )
+    plt.opts(
+        width=1000,
+        color='lightgrey',
+        line_color='lightgrey',
+        xlabel='Time (ms)',
+        yaxis=None,
+        title='Network',
+        tools=[HoverTool(tooltips=REQUEST_TOOLTIPS)],
+    )
+    return rasterize_rectangles(plt, color='lightgrey', threshold=threshold)
 
 
-def plot_frames(frame_data: pd.DataFrame, *, yl: int = 1):
+def plot_frames(frame_data: pd.DataFrame, *, yl: int = 1, threshold: int = RASTERIZE_THRESHOLD):
     """
-    Plot rectangles showing each fra,e duration
+    Plot rectangles showing each frame duration
     """
-    frame_data['rectangle'] = frame_data.apply(
-        lambda x: (x['startTime'], yl, x['endTime'], yl + 1), axis=1
+    states = list(FRAME_COLORS)[::-1]
+    state = np.select([frame_data[key].to_numpy(dtype=bool) for key in states], states, '')
+    rectangles = pd.DataFrame(
+        {
+            'x0': frame_data['startTime'],
+            'y0': yl,
+            'x1': frame_data['endTime'],
+            'y1': yl + 1,
+            'state': state,
+        }
     )
+    rectangles = rectangles[rectangles['state'] != '']
     plt_opts = {
         'width': 1000,
         'xlabel': 'Time (ms)',
@@ -73,32 +114,32 @@ def plot_frames(frame_data: pd.DataFrame, *, yl: int = 1):
         'title': 'Frames',
         'ylim': (yl * 0.99, (yl + 1) * 1.01),
     }
-    subsets = {'idle': 'lightgrey', 'isPartial': 'yellow', 'dropped': 'red', 'drawn': 'lightgreen'}
-    plots = {}
-    for key, value in subsets.items():
-        subset = frame_data[frame_data[key]]
-        plots[key] = hv.Rectangles(subset['rectangle'].to_list())
-        plots[key].opts(**plt_opts, color=value)
-    return plots['idle'] * plots['isPartial'] * plots['dropped'] * plots['drawn']
+    if len(rectangles) > (np.inf if threshold is None else threshold):
+        # Rasterize each state separately to keep its color
+        plots = [
+            rasterize_rectangles(
+                hv.Rectangles(rectangles[rectangles['state'] == key]), color=color, threshold=0
+            ).opts(**plt_opts)
+            for key, color in FRAME_COLORS.items()
+            if (rectangles['state'] == key).any()
+        ]
+        return functools.reduce(operator.mul, plots)
+    rectangles['color'] = rectangles['state'].map(FRAME_COLORS)
+    plt = hv.Rectangles(rectangles, kdims=['x0', 'y0', 'x1', 'y1'], vdims=['state', 'color'])
+    return plt.opts(**plt_opts, color='color', line_color='color')
 
 
 def plot_zoom_levels(action_data: pd.DataFrame, *, yl: int = 0, yh: int = 6):
     """
     Plot difference between the screenshots and baseline frames
     """
-    action_data['rectangle'] = action_data.apply(
-        lambda x: (
-            x['start_time'],
-            yl,
-            x['end_time'],
-            yh,
-        ),
-        axis=1,
+    rectangles = pd.DataFrame(
+        {'x0': action_data['start_time'], 'y0': yl, 'x1': action_data['end_time'], 'y1': yh}
     )
-    return hv.Rectangles(action_data['rectangle'].to_list()).opts(color='darkgrey', alpha=0.3)
+    return hv.Rectangles(rectangles).opts(color='darkgrey', alpha=0.3)
 
 
 def plot_screenshot_rmse(*, screenshot_data: pd.DataFrame, metadata: pd.DataFrame):
-    y = [f'rmse_snapshot_{x}' for x in range(metadata['zoom_level'] + 1)]
+    y = [column for column in screenshot_data if column.startswith('rmse_snapshot_')]
     plt = screenshot_data.hvplot(x='startTime', y=y)
     return plt.opts(width=1000, xlabel='Time (ms)', ylabel='RMSE')
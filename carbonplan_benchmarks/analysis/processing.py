@@ -1,17 +1,45 @@
 import base64
 import json
+import warnings
 
-import cv2 as cv
 import fsspec
 import numpy as np
 import pandas as pd
-import zarrita
 
-from .parsing import extract_event_type, extract_frame_data, extract_request_data
+from ..framestore import frame_reader
+from .actions import extract_actions
+from .frames import summarize_frames
+from .network import compute_waterfall, summarize_network
+from .parsing import (
+    compact_dtypes,
+    extract_event_type,
+    extract_frame_data,
+    extract_request_data,
+)
+from .profiling import profile_label, profiling_enabled, stage_profiler
+from .resources import load_resource_data, summarize_resources
+from .tasks import TASK_EVENT_PREFIXES, TASK_EVENT_TYPES, extract_task_data, summarize_tasks
+from .visual import summarize_visual_progress
 
-pd.options.plotting.backend = 'holoviews'
 pd.options.mode.chained_assignment = None
 
+# Trace events kept by load_data, in addition to metadata events
+EVENT_TYPES = [
+    'ResourceSendRequest',
+    'ResourceFinish',
+    'ResourceReceiveResponse',
+    'ResourceReceivedData',
+    'BeginFrame',
+    'DrawFrame',
+    'DroppedFrame',
+    'Commit',
+    'Screenshot',
+    *TASK_EVENT_TYPES,
+]
+EVENT_PREFIXES = ('benchmark-', *TASK_EVENT_PREFIXES)
+# Viewport width in CSS pixels of runs without a device profile
+DEFAULT_VIEWPORT_WIDTH = 1280
+
 
 def base64_to_img(base64jpeg):
     """
@@ -28,14 +56,55 @@ def base64_to_img(base64jpeg):
     image : np.ndarray
         Numpy array containing image
     """
-    arr = np.frombuffer(base64.b64decode(base64jpeg), np.uint8)
-    return cv.imdecode(arr, cv.IMREAD_COLOR)
+    return jpeg_to_img(base64.b64decode(base64jpeg))
+
+
+def jpeg_to_img(jpeg: bytes):
+    """
+    Load jpeg image from its bytes
+    """
+    import cv2 as cv
+
+    return cv.imdecode(np.frombuffer(jpeg, np.uint8), cv.IMREAD_COLOR)
+
+
+def screenshot_loader(*, screenshots: pd.DataFrame, metadata: dict):
+    """
+    Get a function loading the n-th screenshot, either embedded in the trace or from the frame
+    store of the run, so that only the screenshots that are used are read and decoded
+    """
+    if 'args.frame' in screenshots:
+        read = frame_reader(metadata['full_frames_path'])
+        frames = screenshots['args.frame'].astype(int).to_numpy()
+        return lambda pos: jpeg_to_img(read(frames[pos]))
+    snapshots = screenshots['args.snapshot'].to_numpy()
+    return lambda pos: base64_to_img(snapshots[pos])
+
+
+def get_snapshot(*, snapshots, metadata, zoom_level: int, device_profile: str = None):
+    """
+    Get the baseline snapshot of a zoom level for the layout of a run
+
+    Baselines for a device profile are stored under the profile name, e.g.
+    ``snapshots['laptop-hidpi']['3']['128']['3857']['0']``, and baselines for the default profile
+    at the top level.
+    """
+    if device_profile in snapshots:
+        snapshots = snapshots[device_profile]
+    return snapshots[str(metadata['zarr_version'])][str(metadata['pixels_per_tile'])][
+        str(metadata['projection'])
+    ][str(zoom_level)]
 
 
 def calculate_snapshot_rmse(*, trace_events, snapshots, metadata, xstart: int = 133):
     """
     Extract screenshots from a list of Chromium trace events.
 
+    Each screenshot is compared against the view after each action, in ``rmse_snapshot_<n>``
+    for the n-th action. The view is the baseline snapshot of the zoom level reached by the
+    action or, for actions without a baseline, e.g. after panning, the last screenshot before the
+    action ended.
+
     Parameters
     ----------
 
@@ -45,67 +114,184 @@ def calculate_snapshot_rmse(*, trace_events, snapshots, metadata, xstart: int =
     snapshots: list
         List of snapshots to compare screenshots against
 
+    xstart: int
+        Number of columns excluded on the left of screenshots taken with the default device
+        profile. The crop is scaled to cover the same CSS width for other viewports and pixel
+        ratios.
+
     Returns
     -------
-    screenshots : DataFrame containing screenshots
+    screenshots : DataFrame with the time of each screenshot, its frame in the frame store of the
+        run, if any, and its RMSE against the view after each action. The RMSE is missing, with a
+        warning, against baselines of a different view, i.e. when there are no baselines for the
+        device profile and its viewport differs from the default one.
     """
 
+    import cv2 as cv
+
     def calculate_rmse(predictions, targets):
-        return np.sqrt(np.mean((predictions - targets) ** 2))
+        # Cast before subtracting to avoid wrapping around uint8 pixel values
+        return np.sqrt(np.mean((predictions.astype(float) - targets.astype(float)) ** 2))
 
+    device_profile = metadata.get('device_profile')
+    viewport_scale = DEFAULT_VIEWPORT_WIDTH / (
+        metadata.get('viewport_width') or DEFAULT_VIEWPORT_WIDTH
+    )
     screenshots = extract_event_type(trace_events=trace_events, event_name='Screenshot')
-    for zoom_level in range(metadata['zoom_level'] + 1):
-        snapshot = base64_to_img(
-            snapshots[str(metadata['zarr_version'])][str(metadata['pixels_per_tile'])][
-                str(metadata['projection'])
-            ][str(zoom_level)]
+    load_screenshot = screenshot_loader(screenshots=screenshots, metadata=metadata)
+    times = screenshots['startTime']
+    actions = extract_actions(trace_events=trace_events)
+    if actions.empty:
+        # Without marks, compare against the baseline of each zoom level of the run
+        actions = pd.DataFrame(
+            {'baseline': pd.array(range(metadata['zoom_level'] + 1), dtype='Int64')}
         )
-        var = f'rmse_snapshot_{zoom_level}'
-        for ind, row in screenshots.iterrows():
-            frame = base64_to_img(row['args.snapshot'])
-            screenshots.loc[ind, var] = calculate_rmse(frame[:, xstart:], snapshot[:, xstart:])
-    return screenshots
+        selected = np.arange(len(screenshots))
+    else:
+        # Only compare the screenshots from the view before the first action until the last
+        # action ended, skipping e.g. the page loading before the benchmark started
+        start, end = actions['start_time'].min(), actions['action_end_time'].max()
+        before = np.flatnonzero(times <= start)
+        selected = np.flatnonzero((times > start) & (times <= end))
+        if len(before):
+            selected = np.concatenate([before[-1:], selected])
+    # Screenshots of the default profile set the number of pixels per CSS pixel
+    reference_width = base64_to_img(
+        get_snapshot(snapshots=snapshots, metadata=metadata, zoom_level=0)
+    ).shape[1]
+    targets = {}
+    for ind, action in actions.iterrows():
+        if not pd.isna(action['baseline']):
+            targets[ind] = base64_to_img(
+                get_snapshot(
+                    snapshots=snapshots,
+                    metadata=metadata,
+                    zoom_level=action['baseline'],
+                    device_profile=device_profile,
+                )
+            )
+            continue
+        window = np.flatnonzero(
+            (times > action['start_time']) & (times <= action['action_end_time'])
+        )
+        if len(window):
+            targets[ind] = load_screenshot(window[-1])
+    rmse = {ind: np.full(len(screenshots), np.nan) for ind in targets}
+    # Baselines of another profile only show the same view if just the pixel ratio differs
+    resizable = (metadata.get('viewport_width') or DEFAULT_VIEWPORT_WIDTH) == DEFAULT_VIEWPORT_WIDTH
+    # Decode each screenshot once and compare it against every target
+    for pos in selected:
+        frame = load_screenshot(pos)
+        crop = round(xstart * frame.shape[1] / reference_width * viewport_scale)
+        for ind, target in list(targets.items()):
+            # Without baselines for the profile, resize the default baselines to the screenshots
+            if target.shape != frame.shape:
+                if not resizable or not np.isclose(
+                    target.shape[0] / target.shape[1], frame.shape[0] / frame.shape[1], rtol=0.01
+                ):
+                    warnings.warn(
+                        f'No baselines of the {device_profile!r} device profile match its '
+                        f'{frame.shape[1]}x{frame.shape[0]} screenshots, leaving '
+                        f'rmse_snapshot_{ind} missing'
+                    )
+                    del targets[ind]
+                    continue
+                target = targets[ind] = cv.resize(target, (frame.shape[1], frame.shape[0]))
+            rmse[ind][pos] = calculate_rmse(frame[:, crop:], target[:, crop:])
+    for ind in actions.index:
+        screenshots[f'rmse_snapshot_{ind}'] = rmse[ind] if ind in rmse else np.nan
+    # Keep references to the frames in the frame store, but not embedded images
+    columns = [
+        'name',
+        'startTime',
+        'args.frame',
+        *(f'rmse_snapshot_{ind}' for ind in actions.index),
+    ]
+    return compact_dtypes(screenshots[[column for column in columns if column in screenshots]])
 
 
-def process_zoom_levels(*, trace_events, screenshot_data, zoom_level):
-    markers = extract_event_type(trace_events=trace_events, event_name='benchmark-', exact=False)
-    action_data = pd.DataFrame(
-        {
-            'start_time': markers[markers['name'] == 'benchmark-initial-load:start'].iloc[0][
-                'startTime'
-            ],
-            'end_time': screenshot_data.iloc[screenshot_data['rmse_snapshot_0'].argmin()][
-                'startTime'
-            ],
-            'action_end_time': markers[markers['name'] == 'benchmark-initial-load:end'].iloc[0][
-                'startTime'
-            ],
-            'min_rmse': screenshot_data.iloc[screenshot_data['rmse_snapshot_0'].argmin()][
-                'rmse_snapshot_0'
-            ],
-        },
-        index=[0],
-    )
-    for ind in range(1, zoom_level + 1):
-        action_data.loc[ind, 'start_time'] = markers[
-            markers['name'] == f'benchmark-zoom_in-level-{ind-1}:start'
-        ].iloc[0]['startTime']
-        action_data.loc[ind, 'end_time'] = screenshot_data.iloc[
-            screenshot_data[f'rmse_snapshot_{ind}'].argmin()
-        ]['startTime']
-        action_data.loc[ind, 'action_end_time'] = markers[
-            markers['name'] == f'benchmark-zoom_in-level-{ind-1}:end'
-        ].iloc[0]['startTime']
-        action_data.loc[ind, 'min_rmse'] = screenshot_data.iloc[
-            screenshot_data[f'rmse_snapshot_{ind}'].argmin()
-        ][f'rmse_snapshot_{ind}']
+def process_actions(*, trace_events, screenshot_data):
+    """
+    Get the timing of each benchmarked action from its user timing marks and screenshots.
+
+    An action ends with the screenshot closest to the view after the action. For actions compared
+    against a baseline snapshot this is the best match over the whole run, and for actions
+    compared against their own last screenshot the first screenshot within the action that shows
+    the settled view.
+
+    Parameters
+    ----------
+
+    trace_events: list
+        The list of trace events.
+
+    screenshot_data: pd.DataFrame
+        Screenshot data returned by ``calculate_snapshot_rmse``.
+
+    Returns
+    -------
+    action_data : DataFrame with a row per action, with the label and type of the action, the
+        zoom level after the action, its start time, end time and the time of its end mark in ms,
+        the RMSE of the screenshot ending the action and its duration
+    """
+    action_data = extract_actions(trace_events=trace_events)
+    times = screenshot_data['startTime']
+    action_data['end_time'] = np.nan
+    action_data['min_rmse'] = np.nan
+    for ind, action in action_data.iterrows():
+        rmse = screenshot_data[f'rmse_snapshot_{ind}']
+        if pd.isna(action['baseline']):
+            rmse = rmse[(times > action['start_time']) & (times <= action['action_end_time'])]
+        if rmse.isna().all():
+            continue
+        best = rmse.idxmin()
+        action_data.loc[ind, 'end_time'] = times[best]
+        action_data.loc[ind, 'min_rmse'] = rmse[best]
     action_data['duration'] = action_data['end_time'] - action_data['start_time']
-    return action_data
+    return action_data[
+        [
+            'label',
+            'action',
+            'zoom',
+            'start_time',
+            'end_time',
+            'action_end_time',
+            'min_rmse',
+            'duration',
+        ]
+    ]
 
 
-def load_data(*, metadata_path: str, run: int):
+def process_zoom_levels(*, trace_events, screenshot_data, zoom_level):
     """
-    Load data associated with a run
+    Get the timing of the initial load and of each zoom level of a run that repeated an action.
+
+    Parameters
+    ----------
+
+    trace_events: list
+        The list of trace events.
+
+    screenshot_data: pd.DataFrame
+        Screenshot data returned by ``calculate_snapshot_rmse``.
+
+    zoom_level: int
+        Number of zoom actions after the initial load.
+
+    Returns
+    -------
+    action_data : DataFrame with the start time, end time, time of the end mark, RMSE and duration
+        of the first ``zoom_level + 1`` actions returned by ``process_actions``
+    """
+    action_data = process_actions(trace_events=trace_events, screenshot_data=screenshot_data)
+    return action_data.loc[
+        :zoom_level, ['start_time', 'end_time', 'action_end_time', 'min_rmse', 'duration']
+    ]
+
+
+def load_metadata(*, metadata_path: str, run: int):
+    """
+    Load the metadata of a run, including the layout parsed from the dataset name
 
     metadata_path: str
         Path to metadata file for a specific run.
@@ -115,7 +301,7 @@ def load_data(*, metadata_path: str, run: int):
 
     Returns
     -------
-    metadata, trace_data
+    metadata
     """
     if 's3' in metadata_path:
         fs = fsspec.filesystem('s3', anon=True)
@@ -126,37 +312,48 @@ def load_data(*, metadata_path: str, run: int):
     metadata['metadata_path'] = metadata_path
     if not metadata['zoom_level']:
         metadata['zoom_level'] = 0
-    trace_path = f'{"/".join(metadata_path.split("/")[:-1])}/{metadata["trace_path"]}'
-    metadata['full_trace_path'] = trace_path
     metadata['zarr_version'] = int(metadata['dataset'].split('-')[1][1])
     metadata['projection'] = int(metadata['dataset'].split('-')[2])
     metadata['pixels_per_tile'] = int(metadata['dataset'].split('-')[4])
     metadata['target_chunk_size'] = int(metadata['dataset'].split('-')[5])
     metadata['shard_orientation'] = metadata['dataset'].split('-')[6]
     metadata['shard_size'] = int(metadata['dataset'].split('-')[7])
+    return metadata
+
+
+def load_data(*, metadata_path: str, run: int):
+    """
+    Load data associated with a run
+
+    metadata_path: str
+        Path to metadata file for a specific run.
+
+    run: int
+        Integer index of run to process.
+
+    Returns
+    -------
+    metadata, trace_data
+    """
+    metadata = load_metadata(metadata_path=metadata_path, run=run)
+    if 's3' in metadata_path:
+        fs = fsspec.filesystem('s3', anon=True)
+    else:
+        fs = fsspec.filesystem('file')
+    trace_path = f'{"/".join(metadata_path.split("/")[:-1])}/{metadata["trace_path"]}'
+    metadata['full_trace_path'] = trace_path
+    if metadata.get('frames_path'):
+        metadata['full_frames_path'] = (
+            f'{"/".join(metadata_path.split("/")[:-1])}/{metadata["frames_path"]}'
+        )
     with fs.open(trace_path) as f:
         trace_events = json.loads(f.read())['traceEvents']
-    event_types = [
-        'ResourceSendRequest',
-        'ResourceFinish',
-        'BeginFrame',
-        'DrawFrame',
-        'DroppedFrame',
-        'Commit',
-        'Screenshot',
-        'benchmark-initial-load:start',
-        'benchmark-initial-load:end',
-        'benchmark-zoom_in-level-0:start'
-        'benchmark-zoom_in-level-1:start'
-        'benchmark-zoom_in-level-2:start'
-        'benchmark-zoom_in-level-0:end'
-        'benchmark-zoom_in-level-1:end'
-        'benchmark-zoom_in-level-2:end',
-    ]
     trace_events = [
         event
         for event in trace_events
-        if event['name'] in event_types or 'benchmark-zoom' in event['name']
+        if event['name'] in EVENT_TYPES
+        or event['name'].startswith(EVENT_PREFIXES)
+        or event.get('ph') == 'M'
     ]
     return metadata, trace_events
 
@@ -185,6 +382,8 @@ def get_chunk_size(URI, zarr_version, sharded, var='tasmax'):
     """
     Get chunk size based on zoom level 0.
     """
+    import zarrita
+
     source_store = zarrita.RemoteStore(URI)
     if zarr_version == 2:
         source_array = zarrita.ArrayV2.open(source_store / '0' / var)
@@ -220,66 +419,141 @@ def add_chunk_size(
     return summary.set_index('dataset').join(datasets.set_index('dataset'))
 
 
-def create_summary(*, metadata: pd.DataFrame, data: dict, url_filter: str = None):
+def create_summary(
+    *,
+    metadata: pd.DataFrame,
+    data: dict,
+    url_filter: str = None,
+    profile: bool = None,
+    chunk_size: bool = True,
+):
     """
     Create summary DataFrame for a given run
+
+    The actual chunk size of each dataset is read from S3 unless ``chunk_size=False``, e.g. to
+    summarize runs offline.
+
+    When profiling, either with ``profile=True`` or the ``CARBONPLAN_BENCHMARKS_PROFILE``
+    environment variable, the stages of the summary are appended to ``data['profile_data']``.
     """
-    summary = pd.concat(
-        [pd.DataFrame(metadata, index=[0])] * (metadata['zoom_level'] + 1), ignore_index=True
+    enabled = profiling_enabled(profile)
+    stages, stage = stage_profiler(
+        enabled=enabled,
+        label=profile_label(metadata),
     )
-    frames_data = data['frames_data']
-    request_data = data['request_data']
-
-    actions = data['action_data']
-    for zoom in range(metadata['zoom_level'] + 1):
-        frames = frames_data[
-            (frames_data['startTime'] > actions.loc[zoom, 'start_time'])
-            & (frames_data['startTime'] <= actions.loc[zoom, 'end_time'])
+    with stage('create_summary', actions=len(data['action_data'])):
+        # Nested metadata, e.g. harness phases and uploads, is not part of the summary table, and
+        # the timeout column flags the actions that timed out rather than holding the limit
+        columns = {
+            key: value
+            for key, value in metadata.items()
+            if not isinstance(value, list | dict) and key != 'timeout'
+        }
+        actions = data['action_data']
+        summary = pd.concat([pd.DataFrame(columns, index=[0])] * len(actions), ignore_index=True)
+        frames_data = data['frames_data']
+        request_data = data['request_data']
+        # Steps of action scripts may wait for longer or shorter than the run's timeout
+        timeouts = [
+            metadata['timeout'],
+            *(step['timeout'] for step in metadata.get('action_steps') or []),
         ]
-        requests = request_data[
-            (request_data['request_start'] > actions.loc[zoom, 'start_time'])
-            & (request_data['request_start'] <= actions.loc[zoom, 'action_end_time'])
-        ]
-        summary.loc[zoom, 'total_requests'] = len(requests)
-        if url_filter:
-            requests = requests[requests['url'].str.contains(url_filter)]
-        summary.loc[zoom, 'filtered_requests'] = len(requests)
-        summary.loc[zoom, 'filtered_requests_average_encoded_data_length'] = requests[
-            'encoded_data_length'
-        ].mean()
-        summary.loc[zoom, 'filtered_requests_maximum_encoded_data_length'] = requests[
-            'encoded_data_length'
-        ].max()
-        summary.loc[zoom, 'zoom'] = zoom
-        summary.loc[zoom, 'duration'] = actions.loc[zoom, 'duration']
-        summary.loc[zoom, 'timeout'] = False
-        if requests['request_start'].max() > actions.loc[zoom, 'action_end_time']:
-            actions.loc[zoom, 'action_end_time'] = np.nan
-            summary.loc[zoom, 'duration'] = metadata['timeout']
-            summary.loc[zoom, 'timeout'] = True
-        if requests['response_end'].max() > actions.loc[zoom, 'action_end_time']:
-            actions.loc[zoom, 'action_end_time'] = np.nan
-            summary.loc[zoom, 'duration'] = metadata['timeout']
-            summary.loc[zoom, 'timeout'] = True
-        if summary.loc[zoom, 'duration'] > metadata['timeout']:
-            summary.loc[zoom, 'duration'] = metadata['timeout']
-            summary.loc[zoom, 'timeout'] = True
-        summary.loc[zoom, 'min_rmse'] = actions.loc[zoom, 'min_rmse']
-        summary.loc[zoom, 'fps'] = len(frames) / (actions.loc[zoom, 'duration'] * 1e-3)
-        if requests.empty:
-            summary.loc[zoom, 'request_duration'] = 0
-        else:
-            summary.loc[zoom, 'request_duration'] = (
-                requests['response_end'].max() - requests['request_start'].min()
+        # Reuse the waterfall of the run unless its requests were filtered differently
+        waterfall_data = data.get('waterfall_data')
+        if waterfall_data is None or data.get('url_filter') != url_filter:
+            waterfall_data = compute_waterfall(
+                request_data=request_data, action_data=actions, url_filter=url_filter
+            )
+        network = summarize_network(waterfall_data=waterfall_data, action_data=actions)
+        frame_stats = summarize_frames(frames_data=frames_data, action_data=actions)
+        visual = (
+            summarize_visual_progress(screenshot_data=data['screenshot_data'], action_data=actions)
+            if 'screenshot_data' in data
+            else None
+        )
+        for ind in actions.index:
+            timeout = timeouts[ind] if ind < len(timeouts) else metadata['timeout']
+            frames = frames_data[
+                (frames_data['startTime'] > actions.loc[ind, 'start_time'])
+                & (frames_data['startTime'] <= actions.loc[ind, 'end_time'])
+            ]
+            requests = request_data[
+                (request_data['request_start'] > actions.loc[ind, 'start_time'])
+                & (request_data['request_start'] <= actions.loc[ind, 'action_end_time'])
+            ]
+            summary.loc[ind, 'total_requests'] = len(requests)
+            if url_filter:
+                requests = requests[requests['url'].str.contains(url_filter)]
+            summary.loc[ind, 'filtered_requests'] = len(requests)
+            summary.loc[ind, 'cache_hits'] = requests['from_cache'].sum()
+            summary.loc[ind, 'filtered_requests_average_encoded_data_length'] = requests[
+                'encoded_data_length'
+            ].mean()
+            summary.loc[ind, 'filtered_requests_maximum_encoded_data_length'] = requests[
+                'encoded_data_length'
+            ].max()
+            summary.loc[ind, 'action_index'] = ind
+            summary.loc[ind, 'zoom'] = actions.loc[ind, 'zoom'] if 'zoom' in actions else ind
+            if 'action' in actions:
+                summary.loc[ind, 'action_type'] = actions.loc[ind, 'action']
+            summary.loc[ind, 'duration'] = actions.loc[ind, 'duration']
+            summary.loc[ind, 'timeout'] = False
+            if requests['request_start'].max() > actions.loc[ind, 'action_end_time']:
+                actions.loc[ind, 'action_end_time'] = np.nan
+                summary.loc[ind, 'duration'] = timeout
+                summary.loc[ind, 'timeout'] = True
+            if requests['response_end'].max() > actions.loc[ind, 'action_end_time']:
+                actions.loc[ind, 'action_end_time'] = np.nan
+                summary.loc[ind, 'duration'] = timeout
+                summary.loc[ind, 'timeout'] = True
+            if summary.loc[ind, 'duration'] > timeout:
+                summary.loc[ind, 'duration'] = timeout
+                summary.loc[ind, 'timeout'] = True
+            summary.loc[ind, 'min_rmse'] = actions.loc[ind, 'min_rmse']
+            summary.loc[ind, 'fps'] = len(frames) / (actions.loc[ind, 'duration'] * 1e-3)
+            if requests.empty:
+                summary.loc[ind, 'request_duration'] = 0
+            else:
+                summary.loc[ind, 'request_duration'] = (
+                    requests['response_end'].max() - requests['request_start'].min()
+                )
+        summary['request_percent'] = summary['request_duration'] / summary['duration'] * 100
+        summary['non_request_duration'] = summary['duration'] - summary['request_duration']
+        summary['cache_hit_percent'] = summary['cache_hits'] / summary['filtered_requests'] * 100
+        summary = summary.join(network)
+        summary = summary.join(frame_stats)
+        if visual is not None:
+            summary = summary.join(visual)
+        if 'task_data' in data:
+            summary = summary.join(
+                summarize_tasks(task_data=data['task_data'], action_data=data['action_data'])
+            )
+        if 'resource_data' in data:
+            summary = summary.join(
+                summarize_resources(
+                    resource_data=data['resource_data'], action_data=data['action_data']
+                )
             )
-    summary['request_percent'] = summary['request_duration'] / summary['duration'] * 100
-    summary['non_request_duration'] = summary['duration'] - summary['request_duration']
-    summary = add_chunk_size(summary)
+    if chunk_size:
+        with stage('add_chunk_size'):
+            summary = add_chunk_size(summary)
+    if enabled:
+        data['profile_data'] = pd.concat(
+            [data.get('profile_data'), pd.DataFrame(stages)], ignore_index=True
+        )
 
     return summary
 
 
-def process_run(*, metadata, trace_events, snapshots, url_filter=None):
+def process_run(
+    *,
+    metadata,
+    trace_events,
+    snapshots,
+    url_filter=None,
+    profile: bool = None,
+    profile_dir: str = None,
+):
     """
     Process the results from a benchmarking run.
 
@@ -297,28 +571,69 @@ def process_run(*, metadata, trace_events, snapshots, url_filter=None):
 
     url_filter: str
         Filter requests based on this url.
+
+    profile: bool, optional
+        Whether to profile each stage. Defaults to the ``CARBONPLAN_BENCHMARKS_PROFILE``
+        environment variable.
+
+    profile_dir: str, optional
+        Directory to dump cProfile statistics of each stage to when profiling. Defaults to the
+        ``CARBONPLAN_BENCHMARKS_PROFILE_DIR`` environment variable.
+
     Returns
     -------
-    data : Dict containing request_data, frames_data, and action_data for the run.
+    data : Dict containing request_data, frames_data, action_data, screenshot_data,
+        waterfall_data, the url_filter of the waterfall, task_data and, if resources were sampled,
+        resource_data for the run.
+        When profiling, profile_data contains the wall time, peak memory and input sizes of each
+        stage.
     """
+    enabled = profiling_enabled(profile)
+    stages, stage = stage_profiler(
+        enabled=enabled,
+        profile_dir=profile_dir,
+        label=profile_label(metadata),
+    )
+    sizes = {}
+    if enabled:
+        sizes['events'] = len(trace_events)
+        sizes['screenshots'] = sum(event['name'] == 'Screenshot' for event in trace_events)
     # Extract request data
-    filtered_request_data = extract_request_data(trace_events=trace_events)
+    with stage('extract_request_data', **sizes):
+        filtered_request_data = extract_request_data(trace_events=trace_events)
     # Extract frame data
-    filtered_frames_data = extract_frame_data(trace_events=trace_events)
+    with stage('extract_frame_data', **sizes):
+        filtered_frames_data = extract_frame_data(trace_events=trace_events)
     # Extract screenshot data
-    screenshot_data = calculate_snapshot_rmse(
-        trace_events=trace_events, snapshots=snapshots, metadata=metadata
-    )
+    with stage('calculate_snapshot_rmse', **sizes):
+        screenshot_data = calculate_snapshot_rmse(
+            trace_events=trace_events, snapshots=snapshots, metadata=metadata
+        )
     # Get action durations
-    action_data = process_zoom_levels(
-        trace_events=trace_events,
-        screenshot_data=screenshot_data,
-        zoom_level=metadata['zoom_level'],
-    )
+    with stage('process_actions', **sizes):
+        action_data = process_actions(trace_events=trace_events, screenshot_data=screenshot_data)
+    # Break requests into queueing, waiting and transfer time
+    with stage('compute_waterfall', requests=len(filtered_request_data)):
+        waterfall_data = compute_waterfall(
+            request_data=filtered_request_data, action_data=action_data, url_filter=url_filter
+        )
+    # Extract main thread, worker and GPU tasks
+    with stage('extract_task_data', **sizes):
+        task_data = extract_task_data(trace_events=trace_events)
     data = {
         'request_data': filtered_request_data,
         'frames_data': filtered_frames_data,
         'action_data': action_data,
         'screenshot_data': screenshot_data,
+        'waterfall_data': waterfall_data,
+        'url_filter': url_filter,
+        'task_data': task_data,
     }
+    # Load browser resource samples, if they were recorded
+    with stage('load_resource_data', **sizes):
+        resource_data = load_resource_data(metadata=metadata, trace_events=trace_events)
+    if resource_data is not None:
+        data['resource_data'] = resource_data
+    if enabled:
+        data['profile_data'] = pd.DataFrame(stages)
     return data
@@ -0,0 +1,159 @@
+# Utilities for profiling the stages of the analysis pipeline
+
+import contextlib
+import cProfile
+import os
+import pathlib
+import time
+import tracemalloc
+
+import pandas as pd
+
+# Set to 1 to profile every call of process_run and create_summary
+PROFILE_ENV_VAR = 'CARBONPLAN_BENCHMARKS_PROFILE'
+# Set to a directory to also dump cProfile statistics of each stage
+PROFILE_DIR_ENV_VAR = 'CARBONPLAN_BENCHMARKS_PROFILE_DIR'
+
+
+def profiling_enabled(profile: bool = None):
+    """
+    Check whether to profile, preferring an explicit argument over ``PROFILE_ENV_VAR``
+    """
+    if profile is not None:
+        return profile
+    return os.environ.get(PROFILE_ENV_VAR, '').lower() not in ('', '0', 'false', 'no')
+
+
+def profile_label(metadata: dict):
+    """
+    Name the cProfile statistics of a run after its trace, or its run number without a trace
+    """
+    path = metadata.get('trace_path') or metadata.get('observer_path')
+    if path:
+        return path.split('/')[-1].removesuffix('.json')
+    return f'run-{metadata.get("run_number")}'
+
+
+def stage_profiler(*, enabled: bool, profile_dir: str = None, label: str = 'run'):
+    """
+    Create a profiler of pipeline stages
+
+    Parameters
+    ----------
+
+    enabled: bool
+        Whether to profile. When False, stages are run without any overhead.
+
+    profile_dir: str, optional
+        Directory to dump cProfile statistics of each stage to, as ``<label>-<stage>.prof``.
+        Defaults to ``PROFILE_DIR_ENV_VAR``, and statistics are not dumped when neither is set.
+
+    label: str
+        Prefix of the cProfile statistics files, e.g. the name of the trace.
+
+    Returns
+    -------
+    stages, stage
+        ``stages`` is the list of profiled stages, each with the stage name, its wall time in
+        seconds, the peak memory allocated during the stage in MB and the input sizes passed to
+        ``stage``. ``stage`` is a context manager taking the stage name and input sizes as
+        keyword arguments.
+    """
+    profile_dir = profile_dir or os.environ.get(PROFILE_DIR_ENV_VAR)
+    stages = []
+
+    @contextlib.contextmanager
+    def stage(name: str, **sizes):
+        if not enabled:
+            yield
+            return
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        profiler = cProfile.Profile() if profile_dir else None
+        start = time.perf_counter()
+        try:
+            if profiler:
+                profiler.enable()
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+                path = pathlib.Path(profile_dir)
+                path.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(path / f'{label}-{name}.prof')
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            if started_tracing:
+                tracemalloc.stop()
+            stages.append(
+                {'stage': name, 'wall_seconds': wall, 'peak_memory': peak * 1e-6, **sizes}
+            )
+
+    return stages, stage
+
+
+def summarize_profiles(profile_data: list):
+    """
+    Aggregate stage profiles across a batch of runs.
+
+    Parameters
+    ----------
+
+    profile_data: list
+        ``profile_data`` tables of each run, as returned by ``process_run`` with profiling enabled.
+
+    Returns
+    -------
+    summary : DataFrame indexed by stage with the number of runs, the mean, median and maximum
+        wall time in seconds, the maximum peak memory in MB, the wall time per million trace events
+        and the percentage of the total wall time, sorted by total wall time
+    """
+    profiles = pd.concat(profile_data, ignore_index=True)
+    summary = profiles.groupby('stage').agg(
+        runs=('wall_seconds', 'size'),
+        total_seconds=('wall_seconds', 'sum'),
+        mean_seconds=('wall_seconds', 'mean'),
+        median_seconds=('wall_seconds', 'median'),
+        max_seconds=('wall_seconds', 'max'),
+        max_peak_memory=('peak_memory', 'max'),
+    )
+    if 'events' in profiles:
+        events = profiles.groupby('stage')['events'].sum()
+        summary['seconds_per_million_events'] = (
+            summary['total_seconds'] / events.where(events > 0) * 1e6
+        )
+    summary['percent'] = summary['total_seconds'] / summary['total_seconds'].sum() * 100
+    return summary.sort_values('total_seconds', ascending=False)
+
+
+def summarize_memory(data: dict):
+    """
+    Report the memory footprint of each table of a run.
+
+    Parameters
+    ----------
+
+    data: dict
+        Tables of a run, as returned by ``process_run`` or ``process_observer_run``.
+
+    Returns
+    -------
+    summary : DataFrame indexed by table with the number of rows and columns and the memory used in
+        MB, including the contents of string columns
+    """
+    return pd.DataFrame(
+        [
+            {
+                'table': name,
+                'rows': table.shape[0],
+                'columns': table.shape[1],
+                'memory': table.memory_usage(deep=True).sum() * 1e-6,
+            }
+            for name, table in data.items()
+            if isinstance(table, pd.DataFrame)
+        ],
+        columns=['table', 'rows', 'columns', 'memory'],
+    ).set_index('table')
@@ -0,0 +1,92 @@
+# Utilities for summarizing browser resource samples within each action
+
+import json
+
+import fsspec
+import numpy as np
+import pandas as pd
+
+from .parsing import get_start_time
+
+# Groups of chromium processes that resource samples are recorded for. Defined here rather than
+# with the sampler so that analysis does not depend on psutil.
+PROCESS_GROUPS = ['browser', 'renderer', 'gpu', 'other']
+
+
+def load_resource_data(*, metadata: dict, trace_events: list):
+    """
+    Load the resource samples recorded alongside a run
+
+    Parameters
+    ----------
+
+    metadata: dict
+        Metadata for a specific run, as returned by ``load_data``.
+
+    trace_events: list
+        The list of trace events.
+
+    Returns
+    -------
+    resource_data : DataFrame with one row per sample and ``startTime`` in ms on the same clock as
+        the other trace data, or None if resources were not sampled during the run
+    """
+    if not metadata.get('resources_path'):
+        return None
+    path = f'{"/".join(metadata["metadata_path"].split("/")[:-1])}/{metadata["resources_path"]}'
+    if 's3' in path:
+        fs = fsspec.filesystem('s3', anon=True)
+    else:
+        fs = fsspec.filesystem('file')
+    with fs.open(path) as f:
+        resource_data = pd.DataFrame(json.loads(f.read()))
+    resource_data['startTime'] = resource_data['timestamp'] * 1e3 - get_start_time(
+        trace_events=trace_events
+    )
+    return resource_data
+
+
+def summarize_resources(
+    *, resource_data: pd.DataFrame, action_data: pd.DataFrame, end: str = 'end_time'
+):
+    """
+    Summarize resource usage within each action window.
+
+    CPU time is the increase in cumulative CPU time between the last sample before the action
+    and the last sample within the action, so its resolution is the sampling interval.
+
+    Parameters
+    ----------
+
+    resource_data: pd.DataFrame
+        Resource samples returned by ``load_resource_data``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    end: str
+        Column of ``action_data`` marking the end of each window.
+
+    Returns
+    -------
+    resources : DataFrame with one row per action containing the peak JS heap in MB, the peak
+        number of DOM nodes, and the CPU seconds and peak RSS in MB of each process group
+    """
+    resource_data = resource_data.sort_values('startTime')
+    times = resource_data['startTime'].to_numpy()
+    summary = pd.DataFrame(index=action_data.index)
+    for ind, action in action_data.iterrows():
+        first = np.searchsorted(times, action['start_time'], side='right')
+        last = np.searchsorted(times, action[end], side='right')
+        window = resource_data.iloc[first:last]
+        if window.empty:
+            continue
+        summary.loc[ind, 'peak_js_heap'] = window['JSHeapUsedSize'].max() * 1e-6
+        summary.loc[ind, 'peak_dom_nodes'] = window['Nodes'].max()
+        before = resource_data.iloc[max(first - 1, 0)]
+        for group in PROCESS_GROUPS:
+            summary.loc[ind, f'{group}_cpu_seconds'] = (
+                window[f'cpu_{group}'].iloc[-1] - before[f'cpu_{group}']
+            )
+            summary.loc[ind, f'{group}_peak_rss'] = window[f'rss_{group}'].max() * 1e-6
+    return summary
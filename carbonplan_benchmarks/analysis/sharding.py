@@ -0,0 +1,157 @@
+# Utilities for analyzing byte range requests into sharded Zarr v3 stores
+
+import numpy as np
+import pandas as pd
+
+from .intervals import assign_actions, union_duration
+
+
+def extract_range_requests(
+    *, request_data: pd.DataFrame, action_data: pd.DataFrame, url_filter: str = None
+):
+    """
+    Extract the byte range requests of a run and assign them to actions.
+
+    Zarr v3 stores the shard index at the end of each shard, so requests that end at the last byte
+    of an object or request a suffix range (``bytes=-N``) are treated as shard index requests.
+
+    Parameters
+    ----------
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_request_data``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    url_filter: str, optional
+        If specified, only include requests where the URL contains this string.
+
+    Returns
+    -------
+    range_requests : DataFrame containing the action, shard URL and byte range of each request
+    """
+    requests = request_data
+    if url_filter:
+        requests = requests[requests['url'].str.contains(url_filter)]
+    requests = requests[requests['range_start'].notna() | requests['suffix_length'].notna()].copy()
+    requests['action'] = assign_actions(requests['request_start'], action_data=action_data)
+    requests = requests.dropna(subset=['action'])
+    requests['action'] = requests['action'].astype(int)
+    requests['is_index'] = requests['suffix_length'].notna() | (
+        requests['range_end'] == requests['object_size'] - 1
+    )
+    requests['range_length'] = (requests['range_end'] - requests['range_start'] + 1).fillna(
+        requests['suffix_length']
+    )
+    return requests[
+        [
+            'action',
+            'url',
+            'request_start',
+            'response_end',
+            'range_start',
+            'range_end',
+            'range_length',
+            'object_size',
+            'is_index',
+        ]
+    ].reset_index(drop=True)
+
+
+def _coalesce(ranges: pd.DataFrame, *, max_gap: int):
+    """
+    Count the adjacent, overlapping and coalescible ranges requested from a single shard.
+    """
+    ranges = ranges.sort_values('range_start')
+    starts = ranges['range_start'].to_numpy()
+    ends = ranges['range_end'].to_numpy()
+    previous_end = np.maximum.accumulate(ends)[:-1]
+    gaps = starts[1:] - previous_end - 1
+    overlap = np.clip(np.minimum(ends[1:], previous_end) - starts[1:] + 1, 0, None)
+    return pd.Series(
+        {
+            'adjacent_ranges': int(np.sum(gaps == 0)),
+            'overlapping_ranges': int(np.sum(gaps < 0)),
+            'coalesced_requests': int(np.sum(gaps > max_gap)) + 1,
+            'overlap_bytes': float(np.sum(overlap)),
+            'gap_bytes': float(np.sum(gaps[(gaps > 0) & (gaps <= max_gap)])),
+        }
+    )
+
+
+def summarize_coalescing(
+    *,
+    request_data: pd.DataFrame,
+    action_data: pd.DataFrame,
+    url_filter: str = None,
+    max_gap: int = 0,
+):
+    """
+    Summarize how many range requests could have been coalesced and the shard index overhead
+    for each action.
+
+    Parameters
+    ----------
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_request_data``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    url_filter: str, optional
+        If specified, only include requests where the URL contains this string.
+
+    max_gap: int
+        Largest gap in bytes between two ranges that a coalescing client would read through.
+
+    Returns
+    -------
+    coalescing : DataFrame with one row per action
+    """
+    requests = extract_range_requests(
+        request_data=request_data, action_data=action_data, url_filter=url_filter
+    )
+    actions = pd.Index(action_data.index, name='action')
+    chunks = requests[~requests['is_index']]
+    indexes = requests[requests['is_index']]
+
+    summary = pd.DataFrame(index=actions)
+    summary['range_requests'] = chunks.groupby('action').size()
+    summary['shards'] = requests.groupby('action')['url'].nunique()
+    if chunks.empty:
+        per_shard = pd.DataFrame(
+            columns=[
+                'adjacent_ranges',
+                'overlapping_ranges',
+                'coalesced_requests',
+                'overlap_bytes',
+                'gap_bytes',
+            ]
+        )
+    else:
+        per_shard = (
+            chunks.groupby(['action', 'url'])[['range_start', 'range_end']]
+            .apply(_coalesce, max_gap=max_gap)
+            .groupby('action')
+            .sum()
+        )
+    summary = summary.join(per_shard)
+    summary['coalescible_requests'] = summary['range_requests'] - summary['coalesced_requests']
+    summary['index_requests'] = indexes.groupby('action').size()
+    summary['index_bytes'] = indexes.groupby('action')['range_length'].sum()
+    # Fetching an index that was already fetched during the same action is wasted
+    duplicate_indexes = indexes[indexes.duplicated(subset=['action', 'url'])]
+    summary['duplicate_index_bytes'] = duplicate_indexes.groupby('action')['range_length'].sum()
+    summary = summary.fillna(0)
+    summary['wasted_bytes'] = summary['overlap_bytes'] + summary['duplicate_index_bytes']
+    summary['index_request_duration'] = pd.Series(
+        {
+            action: union_duration(group['request_start'], group['response_end'])
+            for action, group in indexes.groupby('action')
+        },
+        dtype=float,
+    )
+    summary['index_request_duration'] = summary['index_request_duration'].fillna(0)
+    return summary.reset_index()
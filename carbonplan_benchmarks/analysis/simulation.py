@@ -0,0 +1,363 @@
+# Utilities for simulating chunk, shard and tile layouts from recorded request traces
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .intervals import assign_actions
+
+# Matches the trailing '<level>/<variable>/<time>.<y>.<x>' (Zarr v2) or
+# '<level>/<variable>/c/<time>/<y>/<x>' (Zarr v3) component of a chunk URL
+CHUNK_KEY_PATTERN = (
+    r'/(?P<level>\d+)/(?P<variable>[^/]+)/(?:c[./])?(?P<time>\d+)[./](?P<y>\d+)[./](?P<x>\d+)$'
+)
+
+
+def time_chunk_length(*, pixels_per_tile: int, target_chunk_size: float, itemsize: int = 4):
+    """
+    Number of time steps per chunk for a given tile size and target chunk size.
+
+    Mirrors the chunking used to build the pyramids in ``notebooks/utils.py``.
+
+    Parameters
+    ----------
+
+    pixels_per_tile: int
+        Number of pixels along x and y per tile.
+
+    target_chunk_size: float
+        Target chunk size in MB.
+
+    itemsize: int
+        Size of each data element in bytes.
+
+    Returns
+    -------
+    length : int
+        Number of time steps per chunk
+    """
+    slice_mb = itemsize * pixels_per_tile * pixels_per_tile * 1e-6
+    return max(int(target_chunk_size // slice_mb), 1)
+
+
+def extract_tile_requests(
+    *,
+    request_data: pd.DataFrame,
+    action_data: pd.DataFrame,
+    metadata: dict,
+    url_filter: str = None,
+):
+    """
+    Map the chunk requests of a run to tile coordinates for each action.
+
+    Parameters
+    ----------
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_request_data``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    metadata: dict
+        Metadata for the run.
+
+    url_filter: str, optional
+        If specified, only include requests where the URL contains this string.
+
+    Returns
+    -------
+    tile_requests : DataFrame with the action, pyramid level, time chunk, y and x index of each
+        chunk request
+    """
+    if metadata['shard_size']:
+        raise ValueError(
+            'Tile footprints can only be recovered from runs against unsharded datasets, '
+            f"got shard size {metadata['shard_size']} for {metadata['dataset']}"
+        )
+    requests = request_data
+    if url_filter:
+        requests = requests[requests['url'].str.contains(url_filter)]
+    keys = requests['url'].str.extract(CHUNK_KEY_PATTERN)
+    tiles = pd.concat([requests[['request_start', 'encoded_data_length', 'url']], keys], axis=1)
+    tiles = tiles.dropna(subset=['level'])
+    tiles = tiles[tiles['variable'] == metadata['variable']]
+    tiles[['level', 'time', 'y', 'x']] = tiles[['level', 'time', 'y', 'x']].astype(int)
+    tiles['action'] = assign_actions(tiles['request_start'], action_data=action_data)
+    tiles = tiles.dropna(subset=['action'])
+    tiles['action'] = tiles['action'].astype(int)
+    tiles['pixels_per_tile'] = metadata['pixels_per_tile']
+    tiles['target_chunk_size'] = metadata['target_chunk_size']
+    return tiles[
+        [
+            'action',
+            'level',
+            'time',
+            'y',
+            'x',
+            'pixels_per_tile',
+            'target_chunk_size',
+            'encoded_data_length',
+            'url',
+        ]
+    ].reset_index(drop=True)
+
+
+def _time_chunk_lengths(tile_requests: pd.DataFrame, *, itemsize: int = 4):
+    """
+    Number of time steps per chunk for the layout each tile request was recorded with.
+    """
+    return tile_requests.apply(
+        lambda x: time_chunk_length(
+            pixels_per_tile=x['pixels_per_tile'],
+            target_chunk_size=x['target_chunk_size'],
+            itemsize=itemsize,
+        ),
+        axis=1,
+    )
+
+
+def estimate_compression_ratio(tile_requests: pd.DataFrame, *, itemsize: int = 4):
+    """
+    Estimate the ratio between encoded and raw chunk sizes from recorded requests.
+    """
+    lengths = _time_chunk_lengths(tile_requests, itemsize=itemsize)
+    raw_bytes = lengths * tile_requests['pixels_per_tile'] ** 2 * itemsize
+    return (tile_requests['encoded_data_length'] / raw_bytes).mean()
+
+
+def _candidate_chunks(tile_requests: pd.DataFrame, *, pixels_per_tile: int, levels: int):
+    """
+    Translate observed tiles into the tiles covering the same area at the same resolution for a
+    candidate number of pixels per tile.
+    """
+    tiles = tile_requests[['action', 'level', 'time', 'y', 'x', 'pixels_per_tile']].copy()
+    shift = np.rint(np.log2(tiles['pixels_per_tile'] / pixels_per_tile)).astype(int)
+    tiles['candidate_level'] = np.clip(tiles['level'] + shift, 0, levels - 1)
+    scale = 2.0 ** (tiles['candidate_level'] - tiles['level'])
+    tiles['y'] = [
+        range(int(np.floor(y * s)), max(int(np.ceil((y + 1) * s)), int(np.floor(y * s)) + 1))
+        for y, s in zip(tiles['y'], scale)
+    ]
+    tiles['x'] = [
+        range(int(np.floor(x * s)), max(int(np.ceil((x + 1) * s)), int(np.floor(x * s)) + 1))
+        for x, s in zip(tiles['x'], scale)
+    ]
+    tiles = tiles.explode('y').explode('x')
+    tiles['level'] = tiles['candidate_level']
+    return tiles[['action', 'level', 'time', 'y', 'x']].astype(int)
+
+
+def estimate_latency(
+    *,
+    chunk_requests: int,
+    index_requests: int = 0,
+    nbytes: float,
+    latency_ms: float = 50,
+    bandwidth_mbps: float = 100,
+    max_connections: int = 6,
+):
+    """
+    Estimate the time needed to complete a set of requests.
+
+    Requests are issued in waves of ``max_connections`` concurrent requests, each wave costing
+    one round trip, and all bytes share the available bandwidth. Shard index requests must
+    complete before the chunks inside the shard can be requested.
+
+    Parameters
+    ----------
+
+    chunk_requests: int
+        Number of chunk requests.
+
+    index_requests: int
+        Number of shard index requests.
+
+    nbytes: float
+        Total number of bytes transferred.
+
+    latency_ms: float
+        Round trip time for a single request in ms.
+
+    bandwidth_mbps: float
+        Available bandwidth in megabits per second.
+
+    max_connections: int
+        Maximum number of concurrent requests.
+
+    Returns
+    -------
+    latency : float
+        Estimated time in ms
+    """
+    waves = np.ceil(chunk_requests / max_connections) + np.ceil(index_requests / max_connections)
+    transfer = nbytes * 8 / (bandwidth_mbps * 1e6) * 1e3
+    return waves * latency_ms + transfer
+
+
+def simulate_layout(
+    *,
+    tile_requests: pd.DataFrame,
+    pixels_per_tile: int,
+    target_chunk_size: float,
+    shard_size: float = 0,
+    levels: int = 4,
+    itemsize: int = 4,
+    compression_ratio: float = None,
+    cache: bool = True,
+    latency_ms: float = 50,
+    bandwidth_mbps: float = 100,
+    max_connections: int = 6,
+):
+    """
+    Predict the requests, bytes and latency of each action for a candidate layout.
+
+    Parameters
+    ----------
+
+    tile_requests: pd.DataFrame
+        Tile requests returned by ``extract_tile_requests``.
+
+    pixels_per_tile: int
+        Candidate number of pixels along x and y per tile.
+
+    target_chunk_size: float
+        Candidate chunk size in MB.
+
+    shard_size: float
+        Candidate shard size in MB. Use 0 for an unsharded layout.
+
+    levels: int
+        Number of levels in the pyramid.
+
+    itemsize: int
+        Size of each data element in bytes.
+
+    compression_ratio: float, optional
+        Ratio between encoded and raw chunk sizes. Estimated from ``tile_requests`` by default.
+
+    cache: bool
+        Skip chunks and shard indexes that were already fetched by a previous action.
+
+    latency_ms, bandwidth_mbps, max_connections
+        Parameters of the network model, see ``estimate_latency``.
+
+    Returns
+    -------
+    simulation : DataFrame containing the predicted requests, bytes and latency per action
+    """
+    tile_requests = tile_requests.reset_index(drop=True)
+    if compression_ratio is None:
+        compression_ratio = estimate_compression_ratio(tile_requests, itemsize=itemsize)
+    chunks = _candidate_chunks(tile_requests, pixels_per_tile=pixels_per_tile, levels=levels)
+    # Map the first time step of each observed chunk to the candidate time chunk
+    source_lengths = _time_chunk_lengths(tile_requests, itemsize=itemsize)
+    length = time_chunk_length(
+        pixels_per_tile=pixels_per_tile, target_chunk_size=target_chunk_size, itemsize=itemsize
+    )
+    chunks['time'] = (tile_requests['time'] * source_lengths).reindex(chunks.index) // length
+    chunks = chunks.drop_duplicates()
+    if cache:
+        chunks = chunks.sort_values('action').drop_duplicates(subset=['level', 'time', 'y', 'x'])
+    chunk_bytes = length * pixels_per_tile**2 * itemsize * compression_ratio
+
+    if shard_size:
+        chunks_per_shard = max(int(shard_size // (chunk_bytes / compression_ratio * 1e-6)), 1)
+        side = 2 ** int(np.floor(np.log2(np.sqrt(chunks_per_shard))))
+        time_extent = max(chunks_per_shard // side**2, 1)
+        shard_side = np.minimum(side, 2 ** chunks['level'])
+        chunks['shard'] = list(
+            zip(
+                chunks['level'],
+                chunks['time'] // time_extent,
+                chunks['y'] // shard_side,
+                chunks['x'] // shard_side,
+            )
+        )
+        shards = chunks[['action', 'shard']]
+        if cache:
+            shards = shards.sort_values('action').drop_duplicates(subset=['shard'])
+        index_requests = shards.groupby('action').size()
+        index_bytes = 16 * chunks_per_shard + 4
+    else:
+        index_requests = pd.Series(dtype=int)
+        index_bytes = 0
+
+    actions = pd.Index(sorted(tile_requests['action'].unique()), name='action')
+    simulation = pd.DataFrame(index=actions)
+    simulation['pixels_per_tile'] = pixels_per_tile
+    simulation['target_chunk_size'] = target_chunk_size
+    simulation['shard_size'] = shard_size
+    simulation['chunk_requests'] = chunks.groupby('action').size().reindex(actions, fill_value=0)
+    simulation['index_requests'] = index_requests.reindex(actions, fill_value=0)
+    simulation['requests'] = simulation['chunk_requests'] + simulation['index_requests']
+    simulation['bytes'] = (
+        simulation['chunk_requests'] * chunk_bytes + simulation['index_requests'] * index_bytes
+    )
+    simulation['estimated_latency'] = estimate_latency(
+        chunk_requests=simulation['chunk_requests'],
+        index_requests=simulation['index_requests'],
+        nbytes=simulation['bytes'],
+        latency_ms=latency_ms,
+        bandwidth_mbps=bandwidth_mbps,
+        max_connections=max_connections,
+    )
+    return simulation.reset_index()
+
+
+def suggest_layouts(
+    *,
+    tile_requests: pd.DataFrame,
+    pixels_per_tile: list = (128, 256),
+    target_chunk_size: list = (1, 5, 10, 25),
+    shard_size: list = (0, 50, 100),
+    metric: str = 'estimated_latency',
+    top: int = 5,
+    **kwargs,
+):
+    """
+    Simulate every combination of layout parameters and rank them.
+
+    Parameters
+    ----------
+
+    tile_requests: pd.DataFrame
+        Tile requests returned by ``extract_tile_requests``.
+
+    pixels_per_tile, target_chunk_size, shard_size: list
+        Candidate values for each layout parameter.
+
+    metric: str
+        Column used to rank layouts, summed across actions.
+
+    top: int
+        Number of layouts to return.
+
+    **kwargs
+        Additional parameters passed to ``simulate_layout``.
+
+    Returns
+    -------
+    layouts : DataFrame containing the totals across actions for the best layouts
+    """
+    simulations = [
+        simulate_layout(
+            tile_requests=tile_requests,
+            pixels_per_tile=pix,
+            target_chunk_size=chunk,
+            shard_size=shard,
+            **kwargs,
+        )
+        for pix, chunk, shard in itertools.product(pixels_per_tile, target_chunk_size, shard_size)
+    ]
+    layouts = (
+        pd.concat(simulations)
+        .groupby(['pixels_per_tile', 'target_chunk_size', 'shard_size'])[
+            ['chunk_requests', 'index_requests', 'requests', 'bytes', 'estimated_latency']
+        ]
+        .sum()
+        .sort_values(metric)
+        .reset_index()
+    )
+    return layouts.head(top)
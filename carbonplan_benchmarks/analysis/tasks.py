@@ -0,0 +1,164 @@
+# Utilities for attributing main thread, worker and GPU task time to each action
+
+import numpy as np
+import pandas as pd
+
+from .intervals import union_duration
+from .parsing import get_start_time
+
+# Trace events attributed to each category, in order of precedence for nested events.
+# Names ending with '*' match any event name with that prefix.
+TASK_CATEGORIES = {
+    'gc': ['V8.GC*', 'MajorGC', 'MinorGC', 'BlinkGC.AtomicPhase'],
+    'decode': ['Decode Image', 'ImageDecodeTask', 'Decode LazyPixelRef'],
+    'rendering': [
+        'UpdateLayoutTree',
+        'Layout',
+        'PrePaint',
+        'Paint',
+        'Layerize',
+        'UpdateLayer',
+        'CompositeLayers',
+        'RasterTask',
+    ],
+    'scripting': [
+        'EvaluateScript',
+        'FunctionCall',
+        'TimerFire',
+        'FireAnimationFrame',
+        'EventDispatch',
+        'v8.compile',
+        'v8.compileModule',
+        'V8.Execute',
+    ],
+}
+TASK_EVENT_TYPES = ['RunTask', 'ThreadControllerImpl::RunTask'] + [
+    name for names in TASK_CATEGORIES.values() for name in names if not name.endswith('*')
+]
+TASK_EVENT_PREFIXES = tuple(
+    name[:-1] for names in TASK_CATEGORIES.values() for name in names if name.endswith('*')
+)
+# Threads that decode chunks off the main thread
+WORKER_THREADS = ('DedicatedWorker thread',)
+# Threads that run GPU work when the GPU process is folded into the browser process
+GPU_THREADS = ('CrGpuMain',)
+
+
+def categorize_task(name: str):
+    """
+    Get the category of a trace event, or None for uncategorized tasks.
+    """
+    for category, names in TASK_CATEGORIES.items():
+        for pattern in names:
+            if name == pattern or (pattern.endswith('*') and name.startswith(pattern[:-1])):
+                return category
+    return None
+
+
+def extract_task_data(*, trace_events):
+    """
+    Extract complete task events with their thread, process and category.
+
+    Parameters
+    ----------
+
+    trace_events: list
+        The list of trace events.
+
+    Returns
+    -------
+    task_data : DataFrame containing information about tasks
+    """
+    start_time = get_start_time(trace_events=trace_events)
+    thread_names = {
+        (event['pid'], event['tid']): event['args']['name']
+        for event in trace_events
+        if event.get('ph') == 'M' and event['name'] == 'thread_name'
+    }
+    process_names = {
+        event['pid']: event['args']['name']
+        for event in trace_events
+        if event.get('ph') == 'M' and event['name'] == 'process_name'
+    }
+    tasks = pd.DataFrame(
+        [
+            (event['name'], event['pid'], event['tid'], event['ts'], event['dur'])
+            for event in trace_events
+            if event.get('ph') == 'X'
+            and 'dur' in event
+            and (event['name'] in TASK_EVENT_TYPES or event['name'].startswith(TASK_EVENT_PREFIXES))
+        ],
+        columns=['name', 'pid', 'tid', 'ts', 'dur'],
+    )
+    tasks['startTime'] = tasks['ts'] * 1e-3 - start_time
+    tasks['endTime'] = tasks['startTime'] + tasks['dur'] * 1e-3
+    tasks['thread_name'] = [thread_names.get(key) for key in zip(tasks['pid'], tasks['tid'])]
+    tasks['process_name'] = tasks['pid'].map(process_names)
+    names = tasks['name'].drop_duplicates()
+    tasks['category'] = tasks['name'].map(dict(zip(names, names.map(categorize_task))))
+    # Scripting on worker threads is chunk decompression and decoding
+    worker = tasks['thread_name'].isin(WORKER_THREADS) & (tasks['category'] == 'scripting')
+    tasks.loc[worker, 'category'] = 'decode'
+    gpu = (tasks['process_name'] == 'GPU Process') | tasks['thread_name'].isin(GPU_THREADS)
+    tasks.loc[gpu, 'category'] = 'gpu'
+    return tasks.drop(columns=['ts', 'dur']).sort_values('startTime').reset_index(drop=True)
+
+
+def _attribute(tasks: pd.DataFrame, *, start: float, end: float):
+    """
+    Attribute the time covered by tasks on a single thread to categories, assigning time covered
+    by nested events to the category with the highest precedence.
+    """
+    starts = tasks['startTime'].clip(start, end).to_numpy()
+    ends = tasks['endTime'].clip(start, end).to_numpy()
+    categories = tasks['category'].to_numpy()
+    durations = {}
+    covered = 0.0
+    mask = np.zeros(len(tasks), dtype=bool)
+    for category in ['gpu', *TASK_CATEGORIES]:
+        mask |= categories == category
+        total = union_duration(starts[mask], ends[mask])
+        durations[category] = total - covered
+        covered = total
+    durations['other'] = union_duration(starts, ends) - covered
+    return durations
+
+
+def summarize_tasks(*, task_data: pd.DataFrame, action_data: pd.DataFrame, end: str = 'end_time'):
+    """
+    Break each action window into time spent on each task category.
+
+    Times are summed across threads, so the total can exceed the duration of the action when
+    work runs in parallel on the main thread, workers and the GPU.
+
+    Parameters
+    ----------
+
+    task_data: pd.DataFrame
+        Task data returned by ``extract_task_data``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    end: str
+        Column of ``action_data`` marking the end of each window.
+
+    Returns
+    -------
+    tasks : DataFrame with the time in ms spent on each category per action
+    """
+    categories = ['gpu', *TASK_CATEGORIES, 'other']
+    columns = [f'{category}_time' for category in categories] + ['main_thread_busy']
+    summary = pd.DataFrame(0.0, index=action_data.index, columns=columns)
+    for ind, action in action_data.iterrows():
+        start, stop = action['start_time'], action[end]
+        in_window = (task_data['endTime'] > start) & (task_data['startTime'] < stop)
+        tasks = task_data[in_window]
+        for _, thread in tasks.groupby(['pid', 'tid']):
+            for category, duration in _attribute(thread, start=start, end=stop).items():
+                summary.loc[ind, f'{category}_time'] += duration
+        main_thread = tasks[tasks['thread_name'] == 'CrRendererMain']
+        summary.loc[ind, 'main_thread_busy'] = union_duration(
+            main_thread['startTime'].clip(start, stop), main_thread['endTime'].clip(start, stop)
+        )
+    return summary
@@ -0,0 +1,113 @@
+# Utilities for measuring visual progress within each action from screenshot RMSE
+
+import numpy as np
+import pandas as pd
+
+
+def compute_visual_progress(*, screenshot_data: pd.DataFrame, action_data: pd.DataFrame):
+    """
+    Compute the visual progress curve of each action.
+
+    Progress is the RMSE against the action's baseline snapshot normalised between the last
+    screenshot before the action started (0) and the best matching screenshot within the action
+    window (1), so frames from later actions never affect an action's progress.
+
+    Parameters
+    ----------
+
+    screenshot_data: pd.DataFrame
+        Screenshot data returned by ``calculate_snapshot_rmse``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    Returns
+    -------
+    progress : DataFrame with the time relative to the start of the action, RMSE and progress
+        of each screenshot within each action window
+    """
+    times = screenshot_data['startTime'].to_numpy()
+    curves = []
+    for ind, action in action_data.iterrows():
+        rmse = screenshot_data[f'rmse_snapshot_{ind}'].to_numpy()
+        start, end = action['start_time'], action['action_end_time']
+        in_window = (times > start) & (times <= end)
+        if not in_window.any():
+            continue
+        before = np.flatnonzero(times <= start)
+        initial = rmse[before[-1]] if len(before) else rmse[in_window][0]
+        window_rmse = rmse[in_window]
+        span = initial - window_rmse.min()
+        progress = (
+            np.clip((initial - window_rmse) / span, 0, 1) if span > 0 else np.ones(len(window_rmse))
+        )
+        curves.append(
+            pd.DataFrame(
+                {
+                    'action': ind,
+                    'time': times[in_window] - start,
+                    'rmse': window_rmse,
+                    'initial_rmse': initial,
+                    'progress': progress,
+                }
+            )
+        )
+    if not curves:
+        return pd.DataFrame(columns=['action', 'time', 'rmse', 'initial_rmse', 'progress'])
+    return pd.concat(curves, ignore_index=True)
+
+
+def summarize_visual_progress(
+    *,
+    screenshot_data: pd.DataFrame,
+    action_data: pd.DataFrame,
+    change_threshold: float = 0.01,
+):
+    """
+    Summarize the visual progress of each action.
+
+    Parameters
+    ----------
+
+    screenshot_data: pd.DataFrame
+        Screenshot data returned by ``calculate_snapshot_rmse``.
+
+    action_data: pd.DataFrame
+        Action data returned by ``process_actions``.
+
+    change_threshold: float
+        Relative change in RMSE from the initial screenshot that counts as a visual change.
+
+    Returns
+    -------
+    visual : DataFrame with one row per action containing the time in ms to the first visual
+        change, to 50%, 90% and 100% visual completeness, and the Speed Index (the integral of
+        visual incompleteness over time until the action is visually complete)
+    """
+    columns = [
+        'first_visual_change',
+        'visually_complete_50',
+        'visually_complete_90',
+        'visually_complete_100',
+        'speed_index',
+    ]
+    summary = pd.DataFrame(index=action_data.index, columns=columns, dtype=float)
+    progress = compute_visual_progress(screenshot_data=screenshot_data, action_data=action_data)
+    for ind, curve in progress.groupby('action'):
+        times = curve['time'].to_numpy()
+        values = curve['progress'].to_numpy()
+        changed = np.abs(curve['rmse'] - curve['initial_rmse']).to_numpy() > (
+            change_threshold * curve['initial_rmse'].to_numpy()
+        )
+        if changed.any():
+            summary.loc[ind, 'first_visual_change'] = times[changed.argmax()]
+        for threshold in [50, 90, 100]:
+            summary.loc[ind, f'visually_complete_{threshold}'] = times[
+                (values >= threshold / 100).argmax()
+            ]
+        # Progress holds its value until the next screenshot, starting from zero at the action start
+        complete = values.argmax() + 1
+        steps = np.r_[0, times[:complete]]
+        levels = np.r_[0, values[: complete - 1]]
+        summary.loc[ind, 'speed_index'] = np.sum((1 - levels) * np.diff(steps))
+    return summary
@@ -0,0 +1,236 @@
+# Utilities for detecting performance regressions between two sets of benchmark summaries
+
+import argparse
+
+import fsspec
+import numpy as np
+import pandas as pd
+
+from .utils import CONFIGURATION_COLUMNS, percentile_interval, resample_means
+
+# Whether lower or higher values of each metric are better
+METRICS = {
+    'duration': 'lower',
+    'fps': 'higher',
+    'request_duration': 'lower',
+    'min_rmse': 'lower',
+}
+
+
+def load_summaries(path: str):
+    """
+    Load a summary table, or concatenate all summary tables matching a glob or within a directory
+
+    Parameters
+    ----------
+
+    path: str
+        Path, glob or directory of Parquet or CSV summary tables, e.g.
+        ``s3://carbonplan-benchmarks/benchmark-data/v0.2/summary.parq``
+
+
+    Returns
+    -------
+    summary : pd.DataFrame
+    """
+    fs, _, paths = fsspec.get_fs_token_paths(path)
+    if len(paths) == 1 and fs.isdir(paths[0]):
+        paths = [
+            p for p in fs.ls(paths[0], detail=False) if p.endswith(('.parq', '.parquet', '.csv'))
+        ]
+    if not paths:
+        raise FileNotFoundError(f'No summaries found at {path}')
+    summaries = []
+    for p in paths:
+        with fs.open(p) as f:
+            summaries.append(pd.read_csv(f) if p.endswith('.csv') else pd.read_parquet(f))
+    summary = pd.concat(summaries)
+    if 'dataset' not in summary.columns:
+        summary = summary.reset_index()
+    return summary
+
+
+def bootstrap_difference(
+    baseline, contender, *, confidence: float = 0.95, nboot: int = 1000, seed: int = None
+):
+    """
+    Bootstrap confidence interval for the difference in means between two samples
+
+    Returns
+    -------
+    low, high : float
+        Bounds of the confidence interval on ``mean(contender) - mean(baseline)``, NaN unless
+        both samples have at least two values
+    """
+    baseline = np.asarray(baseline, dtype=float)
+    contender = np.asarray(contender, dtype=float)
+    if len(baseline) < 2 or len(contender) < 2:
+        return np.nan, np.nan
+    rng = np.random.default_rng(seed)
+    differences = resample_means(contender, nboot=nboot, rng=rng) - resample_means(
+        baseline, nboot=nboot, rng=rng
+    )
+    return percentile_interval(differences, confidence=confidence)
+
+
+def cohens_d(baseline, contender):
+    """
+    Effect size of the difference in means, using the pooled standard deviation
+    """
+    baseline = np.asarray(baseline, dtype=float)
+    contender = np.asarray(contender, dtype=float)
+    dof = len(baseline) + len(contender) - 2
+    if dof < 1:
+        return np.nan
+    pooled = np.sqrt(
+        ((len(baseline) - 1) * baseline.var(ddof=1) + (len(contender) - 1) * contender.var(ddof=1))
+        / dof
+    )
+    difference = contender.mean() - baseline.mean()
+    if pooled == 0:
+        return 0.0 if difference == 0 else np.copysign(np.inf, difference)
+    return difference / pooled
+
+
+def compare_summaries(
+    baseline: pd.DataFrame,
+    contender: pd.DataFrame,
+    *,
+    metrics: list = None,
+    by: list = None,
+    threshold: float = 0.05,
+    confidence: float = 0.95,
+    nboot: int = 1000,
+    seed: int = None,
+):
+    """
+    Compare metrics between matching configurations of two sets of summaries
+
+    A regression is flagged when the confidence interval on the difference in means excludes
+    zero in the worse direction and the relative change exceeds ``threshold``. Configurations
+    with fewer than two runs on either side have no interval and are never flagged.
+
+    Parameters
+    ----------
+
+    baseline, contender: pd.DataFrame
+        Summary tables as returned by ``create_summary``
+
+    metrics: list, optional
+        Metrics to compare. Defaults to every metric in ``METRICS``
+
+    by: list, optional
+        Columns identifying a configuration. Defaults to the ``CONFIGURATION_COLUMNS`` present
+        in both tables
+
+    threshold: float
+        Smallest relative change in the worse direction that counts as a regression
+
+    confidence: float
+        Confidence level of the intervals
+
+    nboot: int
+        Number of bootstrap resamples
+
+    seed: int, optional
+        Seed for the bootstrap resampling
+
+
+    Returns
+    -------
+    comparison : DataFrame with one row per configuration and metric
+    """
+    metrics = metrics or list(METRICS)
+    by = by or [
+        c for c in CONFIGURATION_COLUMNS if c in baseline.columns and c in contender.columns
+    ]
+    contender_groups = dict(list(contender.groupby(by)))
+    rows = []
+    for key, baseline_group in baseline.groupby(by):
+        if key not in contender_groups:
+            continue
+        contender_group = contender_groups[key]
+        for metric in metrics:
+            a = baseline_group[metric].dropna().to_numpy(dtype=float)
+            b = contender_group[metric].dropna().to_numpy(dtype=float)
+            if not len(a) or not len(b):
+                continue
+            low, high = bootstrap_difference(a, b, confidence=confidence, nboot=nboot, seed=seed)
+            change = (b.mean() - a.mean()) / a.mean() if a.mean() else np.nan
+            worse = METRICS.get(metric, 'lower') == 'lower'
+            # Comparisons with a missing interval are False, so single runs are never significant
+            significant = low > 0 if worse else high < 0
+            rows.append(
+                {
+                    **dict(zip(by, key)),
+                    'metric': metric,
+                    'baseline_runs': len(a),
+                    'contender_runs': len(b),
+                    'baseline_mean': a.mean(),
+                    'contender_mean': b.mean(),
+                    'difference_ci_low': low,
+                    'difference_ci_high': high,
+                    'relative_change': change,
+                    'effect_size': cohens_d(a, b),
+                    'regression': bool(significant and (change if worse else -change) > threshold),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def main(argv: list = None):
+    """
+    Compare two sets of summaries and return a non-zero exit code when a regression is found
+    """
+    parser = argparse.ArgumentParser(
+        prog='carbonplan_benchmarks compare',
+        description='Compare benchmark summaries and flag significant regressions',
+    )
+    parser.add_argument('baseline', type=str, help='Path, glob or directory of baseline summaries')
+    parser.add_argument(
+        'contender', type=str, help='Path, glob or directory of contender summaries'
+    )
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        nargs='+',
+        default=list(METRICS),
+        help=f'Metrics to compare. Defaults to: {list(METRICS)}',
+    )
+    parser.add_argument(
+        '--by',
+        type=str,
+        nargs='+',
+        default=None,
+        help=f'Columns identifying a configuration. Defaults to: {CONFIGURATION_COLUMNS}',
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.05,
+        help='Smallest relative change that counts as a regression',
+    )
+    parser.add_argument('--confidence', type=float, default=0.95, help='Confidence level')
+    parser.add_argument('--nboot', type=int, default=1000, help='Number of bootstrap resamples')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    parser.add_argument('--output', type=str, default=None, help='Write the comparison to a CSV')
+    args = parser.parse_args(argv)
+
+    comparison = compare_summaries(
+        load_summaries(args.baseline),
+        load_summaries(args.contender),
+        metrics=args.metrics,
+        by=args.by,
+        threshold=args.threshold,
+        confidence=args.confidence,
+        nboot=args.nboot,
+        seed=args.seed,
+    )
+    if comparison.empty:
+        raise ValueError('No matching configurations found in the baseline and contender')
+    if args.output:
+        comparison.to_csv(args.output, index=False)
+    print(comparison.to_string(index=False))
+    regressions = comparison[comparison['regression']]
+    print(f'{len(regressions)} regressions found in {len(comparison)} comparisons')
+    return 1 if len(regressions) else 0
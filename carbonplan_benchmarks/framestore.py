@@ -0,0 +1,93 @@
+# Utilities for storing trace screenshots as JPEG blobs next to the trace, with an index
+
+import base64
+import json
+import posixpath
+
+import fsspec
+import numpy as np
+
+FRAME_STORE_VERSION = 1
+# Columns of each frame in the index, with offsets and lengths in bytes into the blob file
+FRAME_FIELDS = ['frame', 'ts', 'offset', 'length']
+
+
+def extract_frames(trace_events: list, *, blobs_path: str):
+    """
+    Move the screenshots of a Chromium trace into a frame store
+
+    The base64 JPEG ``args.snapshot`` of each Screenshot event is replaced, in place, by the
+    number of the frame in ``args.frame``.
+
+    Parameters
+    ----------
+
+    trace_events: list
+        The list of trace events.
+
+    blobs_path: str
+        Path of the blob file relative to the index, recorded in the index.
+
+    Returns
+    -------
+    blobs, index
+        The JPEG images concatenated in trace order, and the index of the frame store with the
+        frame number, trace timestamp, offset and length of each image.
+    """
+    blobs = bytearray()
+    frames = []
+    for event in trace_events:
+        if event['name'] != 'Screenshot' or 'snapshot' not in event.get('args', {}):
+            continue
+        jpeg = base64.b64decode(event['args'].pop('snapshot'))
+        event['args']['frame'] = len(frames)
+        frames.append([len(frames), event['ts'], len(blobs), len(jpeg)])
+        blobs += jpeg
+    index = {
+        'version': FRAME_STORE_VERSION,
+        'blobs': blobs_path,
+        'fields': FRAME_FIELDS,
+        'frames': frames,
+    }
+    return bytes(blobs), index
+
+
+def frame_reader(index_path: str):
+    """
+    Open a frame store for reading single frames
+
+    Local blob files are memory-mapped and remote blob files are read with a range request for
+    each frame, so only the frames that are read are loaded.
+
+    Parameters
+    ----------
+
+    index_path: str
+        Path to the index of the frame store.
+
+    Returns
+    -------
+    read : function taking a frame number and returning the JPEG bytes of the frame
+    """
+    if 's3' in index_path:
+        fs = fsspec.filesystem('s3', anon=True)
+    else:
+        fs = fsspec.filesystem('file')
+    index = json.loads(fs.cat_file(index_path))
+    blobs_path = posixpath.join(posixpath.dirname(index_path), index['blobs'])
+    column = {name: ind for ind, name in enumerate(index['fields'])}
+    frames = {
+        row[column['frame']]: (row[column['offset']], row[column['length']])
+        for row in index['frames']
+    }
+    # Empty files cannot be memory-mapped
+    local = 's3' not in index_path and frames
+    blobs = np.memmap(blobs_path, dtype=np.uint8, mode='r') if local else None
+
+    def read(frame: int):
+        offset, length = frames[frame]
+        if blobs is not None:
+            return blobs[offset : offset + length].tobytes()
+        return fs.cat_file(blobs_path, start=offset, end=offset + length)
+
+    return read
@@ -0,0 +1,86 @@
+# Scripted sequences of map interactions, each timed between its own user timing marks
+
+CANVAS_SELECTOR = '.mapboxgl-canvas'
+VARIABLE_SELECTOR = 'xpath=//div[text()="Variable"]/following-sibling::div//select'
+TIME_SLIDER_SELECTOR = 'input[type="range"]'
+# Interactions of action scripts and the arguments each takes, in order
+SCRIPT_ACTIONS = {
+    'zoom_in': [],
+    'zoom_out': [],
+    # Drag the map by dx and dy CSS pixels
+    'pan': ['dx', 'dy'],
+    # Move the time slider by a number of steps, backwards when negative
+    'time_step': ['steps'],
+    'variable': ['variable'],
+}
+# Mouse moves of a pan, so that the map sees a drag rather than a jump
+PAN_MOUSE_STEPS = 10
+
+
+def parse_action_script(script: str, *, timeout: int):
+    """
+    Parse an action script into a list of steps
+
+    Parameters
+    ----------
+
+    script: str
+        Comma separated actions with colon separated arguments, each optionally followed by
+        ``@<timeout>`` to wait for that many ms instead of ``timeout`` after the action, e.g.
+        ``zoom_in,pan:200:-100@3000,time_step:1,variable:tasmax``.
+
+    timeout: int
+        Time to wait after each action in ms, unless the step sets its own.
+
+    Returns
+    -------
+    steps : list of dicts with the ``action``, its arguments and ``timeout``
+    """
+    steps = []
+    for item in script.split(','):
+        item, _, step_timeout = item.strip().partition('@')
+        action, *values = item.split(':')
+        if action not in SCRIPT_ACTIONS:
+            raise ValueError(
+                f'Invalid scripted action: {action}. Must be one of: {list(SCRIPT_ACTIONS)}'
+            )
+        names = SCRIPT_ACTIONS[action]
+        if len(values) != len(names):
+            raise ValueError(
+                f'Invalid arguments for {action}: {values}. Expected values for: {names}'
+            )
+        step = {'action': action}
+        for name, value in zip(names, values):
+            try:
+                step[name] = value if name == 'variable' else int(value)
+            except ValueError:
+                raise ValueError(f'Invalid {name} for {action}: {value}. Must be an integer.')
+        step['timeout'] = int(step_timeout) if step_timeout else timeout
+        steps.append(step)
+    return steps
+
+
+async def perform_step(page, step: dict):
+    """
+    Perform a single step of an action script, without waiting for the map to settle
+    """
+    action = step['action']
+    if action in ('zoom_in', 'zoom_out'):
+        # Earlier steps may have moved the focus, e.g. to the time slider
+        await page.focus(CANVAS_SELECTOR)
+        await page.keyboard.press('=' if action == 'zoom_in' else '-')
+    elif action == 'pan':
+        box = await page.locator(CANVAS_SELECTOR).bounding_box()
+        x, y = box['x'] + box['width'] / 2, box['y'] + box['height'] / 2
+        await page.mouse.move(x, y)
+        await page.mouse.down()
+        await page.mouse.move(x + step['dx'], y + step['dy'], steps=PAN_MOUSE_STEPS)
+        await page.mouse.up()
+    elif action == 'time_step':
+        slider = page.locator(TIME_SLIDER_SELECTOR).first
+        await slider.focus()
+        key = 'ArrowRight' if step['steps'] > 0 else 'ArrowLeft'
+        for _ in range(abs(step['steps'])):
+            await page.keyboard.press(key)
+    elif action == 'variable':
+        await page.select_option(VARIABLE_SELECTOR, step['variable'])
@@ -0,0 +1,71 @@
+# Rendering backends for chromium and capture of the WebGL renderer actually used
+# https://chromium.googlesource.com/chromium/src/+/master/ui/gl/gl_switches.cc
+
+# Chromium flags of each backend
+RENDERING_BACKENDS = {
+    # Flags used by earlier benchmark versions, letting chromium pick the GL implementation
+    'default': [
+        '--enable-features=Vulkan,UseSkiaRenderer',
+        '--enable-unsafe-webgpu',
+        '--disable-vulkan-fallback-to-gl-for-testing',
+        '--ignore-gpu-blocklist',
+    ],
+    # CPU-only rendering, available on hosts without a GPU
+    'swiftshader': ['--use-gl=angle', '--use-angle=swiftshader', '--enable-unsafe-swiftshader'],
+    'angle-gl': ['--use-gl=angle', '--use-angle=gl', '--ignore-gpu-blocklist'],
+    'angle-vulkan': [
+        '--use-gl=angle',
+        '--use-angle=vulkan',
+        '--enable-features=Vulkan',
+        '--ignore-gpu-blocklist',
+    ],
+}
+# Substrings of WebGL renderer strings of software rasterizers
+SOFTWARE_RENDERERS = ('swiftshader', 'llvmpipe', 'softpipe', 'software')
+
+WEBGL_INFO_SCRIPT = """
+() => {
+    const canvas = document.createElement('canvas');
+    const gl = canvas.getContext('webgl2') || canvas.getContext('webgl');
+    if (!gl) {
+        return null;
+    }
+    const debugInfo = gl.getExtension('WEBGL_debug_renderer_info');
+    return {
+        vendor: gl.getParameter(debugInfo ? debugInfo.UNMASKED_VENDOR_WEBGL : gl.VENDOR),
+        renderer: gl.getParameter(debugInfo ? debugInfo.UNMASKED_RENDERER_WEBGL : gl.RENDERER),
+        version: gl.getParameter(gl.VERSION),
+    };
+}
+"""
+
+
+def is_software_renderer(renderer: str | None):
+    """
+    Check whether a WebGL renderer string belongs to a software rasterizer
+    """
+    return renderer is None or any(name in renderer.lower() for name in SOFTWARE_RENDERERS)
+
+
+async def webgl_info(page):
+    """
+    Get the WebGL vendor, renderer and version of a page
+
+    Parameters
+    ----------
+
+    page: playwright.async_api.Page
+        Page to create a WebGL context in.
+
+    Returns
+    -------
+    info : dict with ``webgl_vendor``, ``webgl_renderer`` and ``webgl_version``, which are None
+        when WebGL is unavailable, and whether the renderer is a software rasterizer
+    """
+    info = await page.evaluate(WEBGL_INFO_SCRIPT) or {}
+    return {
+        'webgl_vendor': info.get('vendor'),
+        'webgl_renderer': info.get('renderer'),
+        'webgl_version': info.get('version'),
+        'software_rendering': is_software_renderer(info.get('renderer')),
+    }
@@ -1,11 +1,13 @@
 import argparse
 import asyncio
+import sys
 
 import upath
-from cloud_detect import provider
 
 from .. import __version__
-from .run import start
+from .actions import SCRIPT_ACTIONS, parse_action_script
+from .backends import RENDERING_BACKENDS
+from .profiles import DEVICE_PROFILES
 
 BASE_URL = 'https://prototype-maps.vercel.app'
 DATASETS_KEYS = [
@@ -79,10 +81,18 @@ DATASETS_KEYS = [
 VARIABLES = ['tasmax']
 APPROACHES = ['dynamic-client']
 SUPPORTED_ACTIONS = ['zoom_in', 'zoom_out']
+COLLECTION_MODES = ['trace', 'observer']
+CACHE_MODES = ['cold', 'warm', 'disabled']
 
 
 # Parse command line arguments and run main function
-def main():
+def main(argv: list = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'compare':
+        from ..compare import main as compare
+
+        sys.exit(compare(argv[1:]))
+
     parser = argparse.ArgumentParser()
     parser.add_argument('--runs', type=int, default=1, help='Number of runs to perform')
     parser.add_argument('--timeout', type=int, default=5000, help='Timeout limit in milliseconds')
@@ -116,8 +126,81 @@ def main():
         help=f'Action to perform. Must be one of: {SUPPORTED_ACTIONS}',
     )
     parser.add_argument('--zoom-level', type=int, default=None, help='Zoom level')
+    parser.add_argument(
+        '--action-script',
+        type=str,
+        default=None,
+        help=(
+            'Comma separated actions to perform after the initial load instead of --action, '
+            'e.g. zoom_in,pan:200:0@3000,time_step:1. '
+            f'Actions: {list(SCRIPT_ACTIONS)}, with arguments separated by colons and an '
+            'optional @timeout in milliseconds'
+        ),
+    )
+    parser.add_argument(
+        '--resource-interval',
+        type=int,
+        default=0,
+        help='Interval in milliseconds between browser resource samples, e.g. 250. Defaults to 0, '
+        'which disables sampling',
+    )
+    parser.add_argument(
+        '--collection-mode',
+        type=str,
+        default='trace',
+        help='Record a full Chromium trace with screenshots, or lightweight in-page metrics',
+    )
+    parser.add_argument(
+        '--cache-mode',
+        type=str,
+        default='cold',
+        help=(
+            'Measure with an empty HTTP cache (cold), after an unmeasured priming pass (warm), '
+            'or with the cache disabled (disabled)'
+        ),
+    )
+    parser.add_argument(
+        '--device-profile',
+        type=str,
+        nargs='+',
+        default=['default'],
+        help=f'Device profiles to emulate, in turn for each run. Options: {list(DEVICE_PROFILES)}',
+    )
+    parser.add_argument(
+        '--rendering-backend',
+        type=str,
+        nargs='+',
+        default=['default'],
+        help=f'Rendering backends to use, in turn for each run. Options: {list(RENDERING_BACKENDS)}',
+    )
+    parser.add_argument(
+        '--screencast',
+        action='store_true',
+        help='Capture screenshots with a CDP screencast instead of trace screenshots',
+    )
+    parser.add_argument(
+        '--screencast-max-width',
+        type=int,
+        default=None,
+        help='Maximum width of screencast frames in pixels. Defaults to the viewport width',
+    )
+    parser.add_argument(
+        '--screencast-max-height',
+        type=int,
+        default=None,
+        help='Maximum height of screencast frames in pixels. Defaults to the viewport height',
+    )
+    parser.add_argument(
+        '--screencast-quality', type=int, default=80, help='JPEG quality of screencast frames'
+    )
+    parser.add_argument(
+        '--screencast-every-nth-frame',
+        type=int,
+        default=1,
+        help='Only capture every n-th frame drawn by the page in the screencast',
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Validate arguments
     if args.action and args.action not in SUPPORTED_ACTIONS:
@@ -134,6 +217,56 @@ def main():
         raise ValueError(
             f'Invalid zoom level: {args.zoom_level}. --action must be set if zoom-level is greater than 0.'
         )
+    if args.action_script:
+        if args.action or args.zoom_level:
+            raise ValueError('--action-script cannot be combined with --action or --zoom-level')
+        for step in parse_action_script(args.action_script, timeout=args.timeout):
+            if step['action'] == 'variable' and step['variable'] not in VARIABLES:
+                raise ValueError(
+                    f'Invalid variable: {step["variable"]}. Must be one of: {VARIABLES}'
+                )
+
+    if args.collection_mode not in COLLECTION_MODES:
+        raise ValueError(
+            f'Invalid collection mode: {args.collection_mode}. Must be one of: {COLLECTION_MODES}'
+        )
+
+    if args.cache_mode not in CACHE_MODES:
+        raise ValueError(f'Invalid cache mode: {args.cache_mode}. Must be one of: {CACHE_MODES}')
+
+    screencast = None
+    if args.screencast:
+        if args.collection_mode != 'trace':
+            raise ValueError('--screencast requires --collection-mode trace')
+        if not 0 <= args.screencast_quality <= 100:
+            raise ValueError(
+                f'Invalid screencast quality: {args.screencast_quality}. Must be between 0 and 100.'
+            )
+        if args.screencast_every_nth_frame < 1:
+            raise ValueError(
+                f'Invalid screencast frame interval: {args.screencast_every_nth_frame}. '
+                'Must be an integer greater than 0.'
+            )
+        screencast = {
+            'max_width': args.screencast_max_width,
+            'max_height': args.screencast_max_height,
+            'quality': args.screencast_quality,
+            'every_nth_frame': args.screencast_every_nth_frame,
+        }
+
+    for device_profile in args.device_profile:
+        if device_profile not in DEVICE_PROFILES:
+            raise ValueError(
+                f'Invalid device profile: {device_profile}. Must be one of: {list(DEVICE_PROFILES)}'
+            )
+
+    for rendering_backend in args.rendering_backend:
+        if rendering_backend not in RENDERING_BACKENDS:
+            raise ValueError(
+                f'Invalid rendering backend: {rendering_backend}. '
+                f'Must be one of: {list(RENDERING_BACKENDS)}'
+            )
+
     # Validate approach argument
     if args.approach not in APPROACHES:
         raise ValueError(f'Invalid approach: {args.approach}. Must be one of: {APPROACHES}')
@@ -157,7 +290,14 @@ def main():
     data_dir.mkdir(exist_ok=True, parents=True)
 
     # Detect cloud provider
-    provider_name = provider() if args.detect_provider else 'unknown'
+    provider_name = 'unknown'
+    if args.detect_provider:
+        from cloud_detect import provider
+
+        provider_name = provider()
+
+    # Playwright and the rest of the harness are only needed once the arguments are valid
+    from .run import start
 
     asyncio.run(
         start(
@@ -171,8 +311,15 @@ def main():
             data_dir=data_dir,
             action=args.action,
             zoom_level=args.zoom_level,
+            action_script=args.action_script,
             headless=not args.non_headless,
             benchmark_version=benchmark_version,
+            resource_interval=args.resource_interval,
+            collection_mode=args.collection_mode,
+            cache_mode=args.cache_mode,
+            device_profiles=args.device_profile,
+            rendering_backends=args.rendering_backend,
+            screencast=screencast,
         )
     )
 
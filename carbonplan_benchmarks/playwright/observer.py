@@ -0,0 +1,78 @@
+# Utilities for collecting lightweight in-page metrics instead of a full Chromium trace
+
+import json
+
+# Fields recorded for each entry type. Entries are stored as arrays to keep the output compact.
+OBSERVER_FIELDS = {
+    'resources': [
+        'name',
+        'initiatorType',
+        'startTime',
+        'fetchStart',
+        'requestStart',
+        'responseStart',
+        'responseEnd',
+        'transferSize',
+        'encodedBodySize',
+        'responseStatus',
+        'nextHopProtocol',
+    ],
+    'longtasks': ['name', 'startTime', 'duration'],
+    'marks': ['name', 'startTime'],
+    'measures': ['name', 'startTime', 'duration'],
+}
+ENTRY_TYPES = {
+    'resources': 'resource',
+    'longtasks': 'longtask',
+    'marks': 'mark',
+    'measures': 'measure',
+}
+
+# Injected into every page before any other script runs
+OBSERVER_SCRIPT = f"""
+(() => {{
+    const fields = {json.dumps(OBSERVER_FIELDS)};
+    const entryTypes = {json.dumps(ENTRY_TYPES)};
+    const data = {{ timeOrigin: performance.timeOrigin, frames: [] }};
+    window.__benchmarkObserver = data;
+    for (const [key, type] of Object.entries(entryTypes)) {{
+        data[key] = [];
+        try {{
+            new PerformanceObserver((list) => {{
+                for (const entry of list.getEntries()) {{
+                    data[key].push(fields[key].map((field) => entry[field] ?? null));
+                }}
+            }}).observe({{ type, buffered: true }});
+        }} catch (error) {{
+            console.warn(`PerformanceObserver does not support '${{type}}' entries`);
+        }}
+    }}
+    // Record the start time of every animation frame
+    const onFrame = (time) => {{
+        data.frames.push(time);
+        requestAnimationFrame(onFrame);
+    }};
+    requestAnimationFrame(onFrame);
+}})();
+"""
+
+
+async def collect_observer_data(page):
+    """
+    Collect the entries recorded by ``OBSERVER_SCRIPT`` since the page loaded
+
+    Parameters
+    ----------
+
+    page: playwright.async_api.Page
+        Page with ``OBSERVER_SCRIPT`` added as an init script.
+
+    Returns
+    -------
+    observer_data : dict with the time origin, animation frame times and the entries of each
+        type as lists of arrays, along with the field names of each entry type
+    """
+    data = await page.evaluate('() => window.__benchmarkObserver')
+    if data is None:
+        raise RuntimeError('In-page observer was not installed before the page loaded')
+    return {'fields': OBSERVER_FIELDS, **data}
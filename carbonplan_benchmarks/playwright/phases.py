@@ -0,0 +1,31 @@
+# Utilities for timing the phases of the benchmark harness itself
+
+import contextlib
+import time
+
+
+def phase_recorder():
+    """
+    Create a recorder of harness phase spans, timed with a monotonic clock
+
+    Returns
+    -------
+    phases, phase
+        ``phases`` is the list of recorded spans, each with the phase ``name`` and its ``start``
+        and ``duration`` in seconds since the recorder was created. ``phase`` is a context
+        manager taking the name of the phase to time.
+    """
+    origin = time.monotonic()
+    phases = []
+
+    @contextlib.contextmanager
+    def phase(name: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            phases.append(
+                {'name': name, 'start': start - origin, 'duration': time.monotonic() - start}
+            )
+
+    return phases, phase
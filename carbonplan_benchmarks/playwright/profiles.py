@@ -0,0 +1,73 @@
+# Device profiles emulating the screens and CPUs of different clients
+
+# Viewports are in CSS pixels. CPU throttling rates are slowdown factors relative to the host.
+DEVICE_PROFILES = {
+    # Playwright's default viewport at full host CPU speed, as used by earlier benchmark versions
+    'default': {
+        'viewport': {'width': 1280, 'height': 720},
+        'device_scale_factor': 1,
+        'cpu_throttling_rate': 1,
+    },
+    'desktop-hd': {
+        'viewport': {'width': 1920, 'height': 1080},
+        'device_scale_factor': 1,
+        'cpu_throttling_rate': 1,
+    },
+    'laptop-hidpi': {
+        'viewport': {'width': 1440, 'height': 900},
+        'device_scale_factor': 2,
+        'cpu_throttling_rate': 1,
+    },
+    'laptop-low-end': {
+        'viewport': {'width': 1366, 'height': 768},
+        'device_scale_factor': 1,
+        'cpu_throttling_rate': 4,
+    },
+}
+
+
+async def new_device_page(*, browser, device_profile: str):
+    """
+    Create a browser context and page emulating a device profile
+
+    Parameters
+    ----------
+
+    browser: playwright.async_api.Browser
+        Browser to create the context in.
+
+    device_profile: str
+        Key of ``DEVICE_PROFILES``.
+
+    Returns
+    -------
+    context, page, cdp_session
+        The CDP session applies CPU throttling for as long as it is attached, and is None when the
+        profile does not throttle the CPU.
+    """
+    profile = DEVICE_PROFILES[device_profile]
+    context = await browser.new_context(
+        viewport=profile['viewport'], device_scale_factor=profile['device_scale_factor']
+    )
+    page = await context.new_page()
+    cdp_session = None
+    if profile['cpu_throttling_rate'] > 1:
+        cdp_session = await context.new_cdp_session(page)
+        await cdp_session.send(
+            'Emulation.setCPUThrottlingRate', {'rate': profile['cpu_throttling_rate']}
+        )
+    return context, page, cdp_session
+
+
+def profile_metadata(device_profile: str):
+    """
+    Flatten a device profile into metadata columns
+    """
+    profile = DEVICE_PROFILES[device_profile]
+    return {
+        'device_profile': device_profile,
+        'viewport_width': profile['viewport']['width'],
+        'viewport_height': profile['viewport']['height'],
+        'device_scale_factor': profile['device_scale_factor'],
+        'cpu_throttling_rate': profile['cpu_throttling_rate'],
+    }
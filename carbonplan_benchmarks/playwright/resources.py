@@ -0,0 +1,134 @@
+# Utilities for sampling browser process resources during a benchmark run
+
+import asyncio
+import contextlib
+
+import psutil
+
+from ..analysis.resources import PROCESS_GROUPS
+
+# CDP Performance.getMetrics values to record in each sample
+CDP_METRICS = [
+    'JSHeapUsedSize',
+    'JSHeapTotalSize',
+    'Nodes',
+    'Documents',
+    'JSEventListeners',
+    'LayoutCount',
+    'RecalcStyleCount',
+]
+# Chromium --type flags of each process group. Processes without a type are the browser process.
+PROCESS_TYPES = {'renderer': 'renderer', 'gpu-process': 'gpu'}
+
+
+def classify_process(cmdline: list):
+    """
+    Get the process group of a chromium process from its command line
+    """
+    for arg in cmdline:
+        if arg.startswith('--type='):
+            return PROCESS_TYPES.get(arg.split('=', 1)[1], 'other')
+    return 'browser'
+
+
+def browser_processes():
+    """
+    Get the chromium processes launched by playwright from this process
+    """
+    processes = []
+    for proc in psutil.Process().children(recursive=True):
+        try:
+            if any(name in proc.name().lower() for name in ('chrom', 'headless_shell')):
+                processes.append(proc)
+        except psutil.NoSuchProcess:
+            continue
+    return processes
+
+
+def sample_processes(processes: list):
+    """
+    Sum cumulative CPU seconds and resident memory of each process group
+
+    Returns
+    -------
+    sample : dict with ``cpu_<group>`` in seconds and ``rss_<group>`` in bytes
+    """
+    sample = {f'{stat}_{group}': 0.0 for group in PROCESS_GROUPS for stat in ('cpu', 'rss')}
+    for proc in processes:
+        try:
+            with proc.oneshot():
+                group = classify_process(proc.cmdline())
+                cpu = proc.cpu_times()
+                sample[f'cpu_{group}'] += cpu.user + cpu.system
+                sample[f'rss_{group}'] += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return sample
+
+
+async def sample_resources(*, client, samples: list, interval: float):
+    """
+    Append a sample to ``samples`` every ``interval`` seconds until cancelled
+
+    Parameters
+    ----------
+
+    client: playwright.async_api.CDPSession
+        CDP session attached to the benchmarked page with the Performance domain enabled.
+
+    samples: list
+        List to append samples to.
+
+    interval: float
+        Time between samples in seconds.
+    """
+    processes = browser_processes()
+    while True:
+        response = await client.send('Performance.getMetrics')
+        metrics = {metric['name']: metric['value'] for metric in response['metrics']}
+        # Processes are started lazily, e.g. the GPU process on first paint
+        if len(processes) != len(current := browser_processes()):
+            processes = current
+        samples.append(
+            {
+                # Seconds on the same monotonic clock as trace event timestamps
+                'timestamp': metrics['Timestamp'],
+                **{name: metrics.get(name) for name in CDP_METRICS},
+                **sample_processes(processes),
+            }
+        )
+        await asyncio.sleep(interval)
+
+
+@contextlib.asynccontextmanager
+async def resource_sampler(*, context, page, interval: float):
+    """
+    Sample browser resources in the background while the context is active
+
+    Parameters
+    ----------
+
+    context: playwright.async_api.BrowserContext
+        Browser context of the benchmarked page.
+
+    page: playwright.async_api.Page
+        The benchmarked page.
+
+    interval: float
+        Time between samples in seconds.
+
+    Yields
+    ------
+    samples : list of dicts, which is complete once the context exits
+    """
+    client = await context.new_cdp_session(page)
+    await client.send('Performance.enable', {'timeDomain': 'timeTicks'})
+    samples = []
+    task = asyncio.create_task(sample_resources(client=client, samples=samples, interval=interval))
+    try:
+        yield samples
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await client.detach()
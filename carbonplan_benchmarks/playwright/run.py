@@ -1,12 +1,23 @@
 import asyncio
+import contextlib
 import datetime
+import importlib.metadata
 import json
-import subprocess
 
 import upath
 from playwright.async_api import async_playwright
 from rich import print
 
+from ..framestore import extract_frames
+from .actions import parse_action_script, perform_step
+from .backends import RENDERING_BACKENDS, webgl_info
+from .observer import OBSERVER_SCRIPT, collect_observer_data
+from .phases import phase_recorder
+from .profiles import new_device_page, profile_metadata
+from .resources import resource_sampler
+from .screencast import screencast_events, screencast_recorder
+from .upload import background_uploader, upload_status
+
 # Get current timestamp
 now = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H-%M-%S')
 
@@ -54,6 +65,102 @@ async def mark_and_measure(*, page, start_mark: str, end_mark: str, label: str,
         raise RuntimeError(error)
 
 
+# Load the map and perform the benchmarked actions
+async def perform_actions(
+    *,
+    page,
+    url: str,
+    approach: str,
+    dataset: str,
+    variable: str,
+    timeout: int,
+    action: str | None = None,
+    zoom_level: int | None = None,
+    action_steps: list | None = None,
+    phase=None,
+):
+    # Time each step when given a phase recorder
+    phase = phase or (lambda name: contextlib.nullcontext())
+
+    # Go to URL
+    print(f'🚀  Running benchmark for approach: {approach}, dataset: {dataset} on {url} 🚀')
+    with phase('goto'):
+        await page.goto(f'{url}/{approach}/{dataset}')
+
+    # Wait for the dropdown to be visible
+    with phase('wait_for_selector'):
+        await page.wait_for_selector('text=Variable')
+
+    # Find the select element that is a child of the div containing the 'Dataset' text
+    with phase('select_variable'):
+        variable_dropdown = await page.query_selector(
+            'xpath=//div[text()="Variable"]/following-sibling::div//select'
+        )
+        await variable_dropdown.select_option(variable)
+
+    with phase('initial-load'):
+        await asyncio.gather(
+            page.evaluate("""
+                () => (window.performance.mark("benchmark-initial-load:start"))
+                """),
+            page.focus('.mapboxgl-canvas'),
+            page.click('.mapboxgl-canvas'),
+        )
+
+        # Wait for the timeout to be reached
+        await mark_and_measure(
+            page=page,
+            start_mark='benchmark-initial-load:start',
+            end_mark='benchmark-initial-load:end',
+            label='benchmark-initial-load',
+            timeout=timeout,
+        )
+
+    if zoom_level:
+        for level in range(zoom_level):
+            start_mark = f'benchmark-{action}-level-{level}:start'
+            end_mark = f'benchmark-{action}-level-{level}:end'
+            label = f'benchmark-{action}-level-{level}'
+            with phase(f'{action}-level-{level}'):
+                if action == 'zoom_in':
+                    await asyncio.gather(
+                        page.evaluate(f"""
+                                () => (window.performance.mark("{start_mark}"))
+                            """),
+                        page.keyboard.press('='),
+                    )
+
+                elif action == 'zoom_out':
+                    await asyncio.gather(
+                        page.evaluate(f"""
+                                () => (window.performance.mark("{start_mark}"))
+                            """),
+                        page.keyboard.press('-'),
+                    )
+
+                await mark_and_measure(
+                    page=page,
+                    start_mark=start_mark,
+                    end_mark=end_mark,
+                    label=label,
+                    timeout=timeout,
+                )
+
+    # Steps of an action script are numbered from 1, after the initial load
+    for ind, step in enumerate(action_steps or [], start=1):
+        label = f'benchmark-{ind}-{step["action"]}'
+        with phase(f'{ind}-{step["action"]}'):
+            await page.evaluate(f'() => (window.performance.mark("{label}:start"))')
+            await perform_step(page, step)
+            await mark_and_measure(
+                page=page,
+                start_mark=f'{label}:start',
+                end_mark=f'{label}:end',
+                label=label,
+                timeout=step['timeout'],
+            )
+
+
 # Define main benchmarking function
 async def run(
     *,
@@ -69,101 +176,142 @@ async def run(
     benchmark_version: str | None = None,
     provider_name: str | None = None,
     trace_dir: upath.UPath,
+    save,
     action: str | None = None,
     zoom_level: int | None = None,
+    action_script: str | None = None,
     headless: bool = False,
+    resource_interval: int | None = None,
+    collection_mode: str = 'trace',
+    cache_mode: str = 'cold',
+    device_profile: str = 'default',
+    rendering_backend: str = 'default',
+    screencast: dict | None = None,
 ):
-    # Launch browser and create new page
-    # https://chromium.googlesource.com/chromium/src/+/master/ui/gl/gl_switches.cc
-    chrome_args = [
-        '--enable-features=Vulkan,UseSkiaRenderer',
-        '--enable-unsafe-webgpu',
-        '--disable-vulkan-fallback-to-gl-for-testing',
-        '--ignore-gpu-blocklist',
-        # '--use-angle=vulkan', # this results in a Browser console: Error: Failed to initialize WebGL
-    ]
-    browser = await playwright.chromium.launch(headless=headless, args=chrome_args)
+    # Time every phase of the harness, not only the in-page marks
+    phases, phase = phase_recorder()
+    action_steps = parse_action_script(action_script, timeout=timeout) if action_script else None
 
-    context = await browser.new_context()
-    page = await context.new_page()
-    await browser.start_tracing(page=page, screenshots=True)
+    # Launch browser with the flags of the rendering backend and create new page
+    with phase('launch_browser'):
+        browser = await playwright.chromium.launch(
+            headless=headless, args=RENDERING_BACKENDS[rendering_backend]
+        )
+
+    # Emulate the viewport, pixel ratio and CPU of the device profile before navigating
+    with phase('new_page'):
+        context, page, throttling_session = await new_device_page(
+            browser=browser, device_profile=device_profile
+        )
+
+    # Record the GL implementation that chromium actually uses, which may fall back to software
+    with phase('webgl_info'):
+        renderer = await webgl_info(page)
+    print(
+        f'[bold cyan]🖥️  Rendering backend: {rendering_backend}, '
+        f'WebGL renderer: {renderer["webgl_renderer"]}[/bold cyan]'
+    )
 
     # Log console messages
     page.on('console', log_console_message)
 
-    # Start benchmark run
-    print(f'[bold cyan]🚀 Starting benchmark run: {run_number}/{runs}...[/bold cyan]')
-
-    # Go to URL
-    print(f'🚀  Running benchmark for approach: {approach}, dataset: {dataset} on {url} 🚀')
-    await page.goto(f'{url}/{approach}/{dataset}')
+    actions = {
+        'page': page,
+        'url': url,
+        'approach': approach,
+        'dataset': dataset,
+        'variable': variable,
+        'timeout': timeout,
+        'action': action,
+        'zoom_level': zoom_level,
+        'action_steps': action_steps,
+    }
+    if cache_mode == 'disabled':
+        # The cache stays disabled for as long as the CDP session is attached
+        with phase('disable_cache'):
+            cdp_session = await context.new_cdp_session(page)
+            await cdp_session.send('Network.enable')
+            await cdp_session.send('Network.setCacheDisabled', {'cacheDisabled': True})
+    elif cache_mode == 'warm':
+        # Fill the HTTP cache of the context with an unmeasured pass over the same actions
+        print(f'[bold cyan]🔥 Priming the cache for run: {run_number}/{runs}...[/bold cyan]')
+        with phase('prime_cache'):
+            await perform_actions(**actions)
 
-    # Wait for the dropdown to be visible
-    await page.wait_for_selector('text=Variable')
+    if collection_mode == 'observer':
+        with phase('install_observer'):
+            await context.add_init_script(script=OBSERVER_SCRIPT)
+    else:
+        with phase('start_tracing'):
+            # Screencast frames replace the screenshots recorded by tracing
+            await browser.start_tracing(page=page, screenshots=screencast is None)
 
-    # Find the select element that is a child of the div containing the 'Dataset' text
-    variable_dropdown = await page.query_selector(
-        'xpath=//div[text()="Variable"]/following-sibling::div//select'
-    )
-    await variable_dropdown.select_option(variable)
-
-    await asyncio.gather(
-        page.evaluate(
-            """
-            () => (window.performance.mark("benchmark-initial-load:start"))
-            """
-        ),
-        page.focus('.mapboxgl-canvas'),
-        page.click('.mapboxgl-canvas'),
-    )
+    # Start benchmark run
+    print(f'[bold cyan]🚀 Starting benchmark run: {run_number}/{runs}...[/bold cyan]')
 
-    # Wait for the timeout to be reached
-    await mark_and_measure(
-        page=page,
-        start_mark='benchmark-initial-load:start',
-        end_mark='benchmark-initial-load:end',
-        label='benchmark-initial-load',
-        timeout=timeout,
-    )
+    # Sample browser resources in the background while performing the actions
+    async with contextlib.AsyncExitStack() as stack:
+        resource_samples = (
+            await stack.enter_async_context(
+                resource_sampler(context=context, page=page, interval=resource_interval * 1e-3)
+            )
+            if resource_interval
+            else None
+        )
+        capture = (
+            await stack.enter_async_context(
+                screencast_recorder(context=context, page=page, **screencast)
+            )
+            if screencast
+            else None
+        )
+        await perform_actions(**actions, phase=phase)
 
-    if zoom_level:
-        for level in range(zoom_level):
-            start_mark = f'benchmark-{action}-level-{level}:start'
-            end_mark = f'benchmark-{action}-level-{level}:end'
-            label = f'benchmark-{action}-level-{level}'
-            if action == 'zoom_in':
-                await asyncio.gather(
-                    page.evaluate(
-                        f"""
-                            () => (window.performance.mark("{start_mark}"))
-                        """
-                    ),
-                    page.keyboard.press('='),
-                )
+    # Collect the outputs of the run, which are saved once the metadata record exists
+    outputs = {}
+    trace_path = observer_path = frames_path = None
+    if collection_mode == 'observer':
+        # Save the compact in-page metrics
+        with phase('collect_observer'):
+            observer_data = await collect_observer_data(page)
+        with phase('close_browser'):
+            await browser.close()
+        observer_path = f'{now}-{run_number}-observer.json'
+        with phase('serialize'):
+            outputs[observer_path] = json.dumps(observer_data)
+    else:
+        # Stop tracing and save trace data
+        with phase('stop_tracing'):
+            trace_json = await browser.stop_tracing()
+        with phase('close_browser'):
+            await browser.close()
 
-            elif action == 'zoom_out':
-                await asyncio.gather(
-                    page.evaluate(
-                        f"""
-                            () => (window.performance.mark("{start_mark}"))
-                        """
-                    ),
-                    page.keyboard.press('-'),
+        trace_path = f'{now}-{run_number}.json'
+        with phase('serialize'):
+            trace_data = json.loads(trace_json)
+            if capture is not None:
+                trace_data['traceEvents'] += screencast_events(
+                    capture=capture, trace_events=trace_data['traceEvents']
                 )
-
-            await mark_and_measure(
-                page=page, start_mark=start_mark, end_mark=end_mark, label=label, timeout=timeout
+            # Keep the screenshots, most of the trace, out of it so that it parses quickly
+            frames_path = f'{now}-{run_number}-frames.json'
+            blobs_path = f'{now}-{run_number}-frames.bin'
+            outputs[blobs_path], frame_index = extract_frames(
+                trace_data['traceEvents'], blobs_path=blobs_path
             )
+            outputs[frames_path] = json.dumps(frame_index)
+            outputs[trace_path] = json.dumps(trace_data, indent=2)
 
-    # Stop tracing and save trace data
-    trace_json = await browser.stop_tracing()
-    await browser.close()
+    # Save resource samples next to the trace
+    resources_path = None
+    if resource_samples is not None:
+        resources_path = f'{now}-{run_number}-resources.json'
+        with phase('serialize'):
+            outputs[resources_path] = json.dumps(resource_samples)
 
-    trace_data = json.loads(trace_json)
-    json_path = trace_dir / f'{now}-{run_number}.json'
-    print(f"[bold cyan]📊 Writing trace data to '{json_path}'[/bold cyan]")
-    json_path.write_text(json.dumps(trace_data, indent=2))
-    print(f"[bold cyan]📊 Trace data saved as '{json_path}'[/bold cyan]")
+    screenshot_mode = 'screencast' if screencast else 'trace'
+    if collection_mode == 'observer':
+        screenshot_mode = 'none'
 
     # Record system metrics
     data = {
@@ -179,11 +327,32 @@ async def run(
         'variable': variable,
         'action': action,
         'zoom_level': zoom_level,
-        'trace_path': f'{now}-{run_number}.json',
+        'action_script': action_script,
+        'action_steps': action_steps,
+        'collection_mode': collection_mode,
+        'screenshot_mode': screenshot_mode,
+        **{f'screencast_{key}': value for key, value in (screencast or {}).items()},
+        'cache_mode': cache_mode,
+        'trace_path': trace_path,
+        'frames_path': frames_path,
+        'observer_path': observer_path,
         'timeout': timeout,
         'headless': headless,
+        'resources_path': resources_path,
+        'resource_interval': resource_interval,
+        **profile_metadata(device_profile),
+        'rendering_backend': rendering_backend,
+        **renderer,
+        'phases': phases,
     }
 
+    # Remote outputs are uploaded in the background while the next run starts
+    with phase('save'):
+        for name, content in outputs.items():
+            print(f"[bold cyan]📊 Saving '{trace_dir / name}'[/bold cyan]")
+            await save(name, content, record=data)
+
+    data['harness_duration'] = phases[-1]['start'] + phases[-1]['duration']
     all_data.append(data)
 
 
@@ -199,21 +368,35 @@ async def start(
     data_dir: upath.UPath,
     action: str | None = None,
     zoom_level: int | None = None,
+    action_script: str | None = None,
     headless: bool,
     provider_name: str | None = None,
     benchmark_version: str | None = None,
+    resource_interval: int | None = None,
+    collection_mode: str = 'trace',
+    cache_mode: str = 'cold',
+    device_profiles: list[str] | None = None,
+    rendering_backends: list[str] | None = None,
+    screencast: dict | None = None,
 ):
     # Get Playwright versions
-    playwright_python_version = subprocess.run(
-        ['pip', 'show', 'playwright'],
-        capture_output=True,
-        text=True,
-    )
-    playwright_python_version = playwright_python_version.stdout.split('\n')[1].split(': ')[1]
+    playwright_python_version = importlib.metadata.version('playwright')
+
+    # Interleave rendering backends and device profiles within each repetition so that drift
+    # affects all configurations alike
+    schedule = [
+        (rendering_backend, device_profile)
+        for _ in range(runs)
+        for rendering_backend in rendering_backends or ['default']
+        for device_profile in device_profiles or ['default']
+    ]
 
     # Run benchmark
-    async with async_playwright() as playwright:
-        for run_number in range(runs):
+    async with (
+        async_playwright() as playwright,
+        background_uploader(data_dir=data_dir) as save,
+    ):
+        for run_number, (rendering_backend, device_profile) in enumerate(schedule):
             try:
                 await run(
                     playwright=playwright,
@@ -221,21 +404,33 @@ async def start(
                     approach=approach,
                     dataset=dataset,
                     variable=variable,
-                    runs=runs,
+                    runs=len(schedule),
                     timeout=timeout,
                     run_number=run_number + 1,
                     playwright_python_version=playwright_python_version,
                     benchmark_version=benchmark_version,
                     provider_name=provider_name,
                     trace_dir=data_dir,
+                    save=save,
                     action=action,
                     zoom_level=zoom_level,
+                    action_script=action_script,
                     headless=headless,
+                    resource_interval=resource_interval,
+                    collection_mode=collection_mode,
+                    cache_mode=cache_mode,
+                    device_profile=device_profile,
+                    rendering_backend=rendering_backend,
+                    screencast=screencast,
                 )
             except Exception as exc:
                 print(f'{run_number + 1} timed out : {exc}')
                 continue
 
+    # Runs are only complete once all of their outputs have been uploaded
+    for data in all_data:
+        data['upload_status'] = upload_status(data)
+
     # Write the data to a json file
     data_path = data_dir / f'data-{now}.json'
     print(data_path)
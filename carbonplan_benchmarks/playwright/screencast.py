@@ -0,0 +1,114 @@
+# Capture of screenshots with a CDP screencast, as a lighter alternative to trace screenshots
+# https://chromedevtools.github.io/devtools-protocol/tot/Page/#method-startScreencast
+
+import contextlib
+
+CLOCK_SYNC_MARK = 'benchmark-clock-sync'
+# Mark an instant on the trace clock and return the same instant in ms since the epoch, the clock
+# of screencast frame timestamps
+CLOCK_SYNC_SCRIPT = f"""
+() => {{
+    const mark = window.performance.mark('{CLOCK_SYNC_MARK}');
+    return window.performance.timeOrigin + mark.startTime;
+}}
+"""
+
+
+@contextlib.asynccontextmanager
+async def screencast_recorder(
+    *,
+    context,
+    page,
+    max_width: int | None = None,
+    max_height: int | None = None,
+    quality: int = 80,
+    every_nth_frame: int = 1,
+):
+    """
+    Record a screencast of the page while the context is active
+
+    Parameters
+    ----------
+
+    context: playwright.async_api.BrowserContext
+        Browser context of the benchmarked page.
+
+    page: playwright.async_api.Page
+        The benchmarked page, whose trace must be recording user timing marks.
+
+    max_width, max_height: int, optional
+        Maximum size of frames in device pixels. Frames are scaled down to fit, keeping the
+        aspect ratio of the viewport.
+
+    quality: int
+        JPEG quality of frames, from 0 to 100.
+
+    every_nth_frame: int
+        Only capture every n-th frame drawn by the page.
+
+    Yields
+    ------
+    capture : dict with the ``clock_sync`` time of ``CLOCK_SYNC_MARK`` in ms since the epoch, and
+        the ``frames``, each with its ``timestamp`` in seconds since the epoch and base64 JPEG
+        ``data``, which are complete once the context exits
+    """
+    client = await context.new_cdp_session(page)
+    capture = {'clock_sync': None, 'frames': []}
+
+    async def on_frame(params):
+        capture['frames'].append(
+            {'timestamp': params['metadata']['timestamp'], 'data': params['data']}
+        )
+        # Chromium only sends the next frame once this one is acknowledged
+        await client.send('Page.screencastFrameAck', {'sessionId': params['sessionId']})
+
+    client.on('Page.screencastFrame', on_frame)
+    options = {'format': 'jpeg', 'quality': quality, 'everyNthFrame': every_nth_frame}
+    if max_width:
+        options['maxWidth'] = max_width
+    if max_height:
+        options['maxHeight'] = max_height
+    await client.send('Page.startScreencast', options)
+    capture['clock_sync'] = await page.evaluate(CLOCK_SYNC_SCRIPT)
+    try:
+        yield capture
+    finally:
+        await client.send('Page.stopScreencast')
+        await client.detach()
+
+
+def screencast_events(*, capture: dict, trace_events: list):
+    """
+    Convert screencast frames to Screenshot trace events on the trace clock
+
+    Parameters
+    ----------
+
+    capture: dict
+        Capture yielded by ``screencast_recorder``.
+
+    trace_events: list
+        The list of trace events recorded during the capture, including ``CLOCK_SYNC_MARK``.
+
+    Returns
+    -------
+    events : list of Screenshot events, in the format of screenshots recorded by tracing
+    """
+    mark = next((event for event in trace_events if event['name'] == CLOCK_SYNC_MARK), None)
+    if mark is None:
+        raise ValueError(f'The trace does not contain the {CLOCK_SYNC_MARK} mark')
+    # Offset between the trace clock and the epoch in µs
+    offset = mark['ts'] - capture['clock_sync'] * 1e3
+    return [
+        {
+            'name': 'Screenshot',
+            'cat': 'disabled-by-default-devtools.screenshot',
+            'ph': 'O',
+            'id': hex(ind + 1),
+            'pid': mark['pid'],
+            'tid': mark.get('tid'),
+            'ts': frame['timestamp'] * 1e6 + offset,
+            'args': {'snapshot': frame['data']},
+        }
+        for ind, frame in enumerate(capture['frames'])
+    ]
@@ -0,0 +1,227 @@
+# Utilities for uploading benchmark outputs in the background while later runs continue
+
+import asyncio
+import contextlib
+import hashlib
+import pathlib
+import shutil
+import tempfile
+import time
+
+import upath
+from rich import print
+
+# Number of attempts for each upload before giving up
+UPLOAD_RETRIES = 3
+# Part size of multipart uploads, in bytes
+UPLOAD_CHUNKSIZE = 64 * 2**20
+
+
+def is_remote(path: upath.UPath):
+    """
+    Check whether writing to a path goes over the network
+    """
+    return getattr(path, 'protocol', '') not in ('', 'file', 'local')
+
+
+def stream_checksum(f):
+    """
+    Compute the SHA-256 checksum of an open binary file without reading it into memory at once
+    """
+    checksum = hashlib.sha256()
+    while chunk := f.read(2**20):
+        checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def file_checksum(path: pathlib.Path):
+    """
+    Compute the SHA-256 checksum of a local file
+    """
+    with open(path, 'rb') as f:
+        return stream_checksum(f)
+
+
+def remote_checksum(path: upath.UPath):
+    """
+    Compute the SHA-256 checksum of an uploaded object by reading it back
+    """
+    with path.fs.open(path.path, 'rb') as f:
+        return stream_checksum(f)
+
+
+def upload_file(
+    *,
+    source: pathlib.Path,
+    destination: upath.UPath,
+    retries: int = UPLOAD_RETRIES,
+    backoff: float = 1.0,
+):
+    """
+    Upload a local file, retrying transient failures with exponential backoff.
+
+    Large files are uploaded in parts of ``UPLOAD_CHUNKSIZE`` bytes by filesystems that support
+    multipart uploads. Each attempt is verified by comparing the size and the SHA-256 checksum of
+    the uploaded object with the local file, so that a truncated or corrupted upload is retried.
+
+    Parameters
+    ----------
+
+    source: pathlib.Path
+        Local file to upload.
+
+    destination: upath.UPath
+        Path to upload the file to.
+
+    retries: int
+        Number of attempts before giving up.
+
+    backoff: float
+        Seconds to wait after the first failed attempt, doubled after each further failure.
+
+    Returns
+    -------
+    upload : dict with the size in bytes and SHA-256 checksum of the file, the number of attempts
+        needed and the duration of the upload in seconds
+    """
+    start = time.monotonic()
+    size = source.stat().st_size
+    checksum = file_checksum(source)
+    for attempt in range(1, retries + 1):
+        try:
+            destination.fs.put_file(str(source), destination.path, chunksize=UPLOAD_CHUNKSIZE)
+            uploaded_size = destination.fs.info(destination.path)['size']
+            if uploaded_size != size:
+                raise OSError(
+                    f'Uploaded {uploaded_size} bytes to {destination} but {source} has {size} bytes'
+                )
+            uploaded_checksum = remote_checksum(destination)
+            if uploaded_checksum != checksum:
+                raise OSError(
+                    f'SHA-256 of {destination} ({uploaded_checksum}) does not match '
+                    f'{source} ({checksum})'
+                )
+            return {
+                'size': size,
+                'sha256': checksum,
+                'attempts': attempt,
+                'duration': time.monotonic() - start,
+            }
+        except Exception as exc:
+            if attempt == retries:
+                raise
+            print(
+                f'[bold yellow]⚠️  Upload of {destination} failed ({exc}), retrying...[/bold yellow]'
+            )
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+
+async def upload_worker(*, queue: asyncio.Queue, retries: int):
+    """
+    Upload staged files from ``queue`` until cancelled, recording the outcome in each record
+    """
+    while True:
+        source, destination, record = await queue.get()
+        upload = record['uploads'][destination.name]
+        try:
+            upload.update(
+                await asyncio.to_thread(
+                    upload_file, source=source, destination=destination, retries=retries
+                )
+            )
+            upload['status'] = 'complete'
+            source.unlink()
+            print(f"[bold cyan]📤 Uploaded '{destination}'[/bold cyan]")
+        except Exception as exc:
+            # Keep the staged copy so that the upload can be retried by hand
+            upload.update({'status': 'failed', 'error': str(exc), 'staged_path': str(source)})
+            print(f"[bold red]❌ Upload of '{destination}' failed: {exc}[/bold red]")
+        finally:
+            queue.task_done()
+
+
+def upload_status(record: dict):
+    """
+    Get the overall upload status of a run from the status of each of its files
+    """
+    statuses = {upload['status'] for upload in record.get('uploads', {}).values()}
+    for status in ('failed', 'pending'):
+        if status in statuses:
+            return status
+    return 'complete'
+
+
+def write_content(path, content: str | bytes):
+    """
+    Write text or binary content to a local or remote path
+    """
+    if isinstance(content, bytes):
+        path.write_bytes(content)
+    else:
+        path.write_text(content)
+
+
+@contextlib.asynccontextmanager
+async def background_uploader(
+    *,
+    data_dir: upath.UPath,
+    max_pending: int = 4,
+    concurrency: int = 2,
+    retries: int = UPLOAD_RETRIES,
+):
+    """
+    Save run outputs to ``data_dir``, uploading them in the background when it is remote.
+
+    Remote outputs are staged on local disk and queued for upload, so that the next run can start
+    while earlier outputs are uploading. Saving blocks once ``max_pending`` files are waiting to be
+    uploaded, which bounds the local disk used for staging. All uploads have finished, successfully
+    or not, when the context exits.
+
+    Parameters
+    ----------
+
+    data_dir: upath.UPath
+        Directory to save outputs to.
+
+    max_pending: int
+        Maximum number of staged files waiting to be uploaded.
+
+    concurrency: int
+        Number of files uploaded at the same time.
+
+    retries: int
+        Number of attempts for each upload before giving up.
+
+    Yields
+    ------
+    save : coroutine function taking the file name, its text or binary content and the metadata
+        record of the run, whose ``uploads`` entry tracks the status of each file
+    """
+    remote = is_remote(data_dir)
+    staging_dir = pathlib.Path(tempfile.mkdtemp(prefix='carbonplan-benchmarks-'))
+    queue = asyncio.Queue(maxsize=max_pending)
+    workers = [
+        asyncio.create_task(upload_worker(queue=queue, retries=retries)) for _ in range(concurrency)
+    ]
+
+    async def save(name: str, content: str | bytes, *, record: dict):
+        uploads = record.setdefault('uploads', {})
+        if not remote:
+            await asyncio.to_thread(write_content, data_dir / name, content)
+            uploads[name] = {'status': 'complete'}
+            return
+        source = staging_dir / name
+        await asyncio.to_thread(write_content, source, content)
+        uploads[name] = {'status': 'pending'}
+        await queue.put((source, data_dir / name, record))
+
+    try:
+        yield save
+        await queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        # Only staged copies of failed uploads are left behind
+        if not any(staging_dir.iterdir()):
+            shutil.rmtree(staging_dir)
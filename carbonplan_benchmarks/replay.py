@@ -0,0 +1,302 @@
+# Utilities for replaying recorded request sequences against a local HTTP server
+
+import asyncio
+import contextlib
+import os
+import pathlib
+import socket
+import time
+from urllib.parse import urlsplit
+
+import httpx
+import numpy as np
+import pandas as pd
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+
+def _request_path(url: str):
+    parts = urlsplit(url)
+    return f'{parts.path}?{parts.query}' if parts.query else parts.path
+
+
+def build_payloads(request_data: pd.DataFrame, *, mirror: str = None):
+    """
+    Build the bytes served for each recorded request path.
+
+    Parameters
+    ----------
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_request_data``.
+
+    mirror: str, optional
+        Local directory mirroring the remote objects, laid out by URL path. Paths that are not
+        found in the mirror are served as random bytes of the recorded encoded size.
+
+    Returns
+    -------
+    payloads : dict mapping request paths to response bodies
+    """
+    sizes = request_data['encoded_data_length']
+    if 'object_size' in request_data.columns:
+        # Serve the whole shard for range requests
+        sizes = request_data['object_size'].fillna(sizes)
+    sizes = (
+        request_data.assign(path=request_data['url'].map(_request_path), size=sizes)
+        .groupby('path')['size']
+        .max()
+        .fillna(0)
+    )
+    payloads = {}
+    for path, size in sizes.items():
+        local = pathlib.Path(mirror) / path.lstrip('/') if mirror else None
+        if local is not None and local.is_file():
+            payloads[path] = local.read_bytes()
+        else:
+            # Random bytes are as incompressible as the gzipped chunks we serve in production
+            payloads[path] = os.urandom(int(size))
+    return payloads
+
+
+def make_app(payloads: dict):
+    """
+    Create an ASGI application serving ``payloads`` with support for byte range requests.
+
+    Ranges starting past the end of a payload are answered with 416 Range Not Satisfiable.
+    """
+
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        path = scope['path']
+        if scope['query_string']:
+            path = f"{path}?{scope['query_string'].decode()}"
+        body = payloads.get(path)
+        if body is None:
+            await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        status = 200
+        headers = dict(scope['headers'])
+        if byte_range := headers.get(b'range'):
+            start, _, end = byte_range.decode().removeprefix('bytes=').partition('-')
+            if not start:
+                start, end = max(len(body) - int(end), 0), len(body) - 1
+            start, end = int(start), min(int(end) if end else len(body) - 1, len(body) - 1)
+            if start > end:
+                # The range starts past the end of the payload
+                content_range = f'bytes */{len(body)}'.encode()
+                body = b''
+                status = 416
+            else:
+                content_range = f'bytes {start}-{end}/{len(body)}'.encode()
+                body = body[start : end + 1]
+                status = 206
+        response_headers = [(b'content-length', str(len(body)).encode())]
+        if status in (206, 416):
+            response_headers.append((b'content-range', content_range))
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    return app
+
+
+@contextlib.asynccontextmanager
+async def serve_payloads(payloads: dict, *, host: str = '127.0.0.1', port: int = None):
+    """
+    Serve ``payloads`` from a local HTTP/1.1 and HTTP/2 (cleartext) server.
+
+    Yields the base URL of the server.
+    """
+    if port is None:
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            port = sock.getsockname()[1]
+    config = Config()
+    config.bind = [f'{host}:{port}']
+    config.accesslog = None
+    config.errorlog = None
+    shutdown = asyncio.Event()
+    task = asyncio.create_task(serve(make_app(payloads), config, shutdown_trigger=shutdown.wait))
+    base_url = f'http://{host}:{port}'
+    # Wait for the server to accept connections
+    for _ in range(100):
+        with contextlib.suppress(OSError):
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            break
+        await asyncio.sleep(0.05)
+    try:
+        yield base_url
+    finally:
+        shutdown.set()
+        await task
+
+
+async def replay_requests(
+    *,
+    request_data: pd.DataFrame,
+    base_url: str,
+    preserve_timing: bool = True,
+    max_connections: int = 6,
+    http2: bool = False,
+    timeout: float = 30,
+):
+    """
+    Reissue a recorded request sequence against ``base_url``.
+
+    Parameters
+    ----------
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_request_data``.
+
+    base_url: str
+        Base URL of the server that replaces the recorded origins.
+
+    preserve_timing: bool
+        Issue each request at its recorded offset from the first request. Otherwise issue all
+        requests as fast as possible.
+
+    max_connections: int
+        Maximum number of concurrent connections in the client pool.
+
+    http2: bool
+        Use HTTP/2 with prior knowledge instead of HTTP/1.1.
+
+    timeout: float
+        Timeout for each request in seconds.
+
+    Returns
+    -------
+    replay_data : DataFrame containing timings in ms for each replayed request
+    """
+    requests = request_data.sort_values('request_start').reset_index(drop=True)
+    offsets = (requests['request_start'] - requests['request_start'].min()).to_numpy()
+    limits = httpx.Limits(
+        max_connections=max_connections, max_keepalive_connections=max_connections
+    )
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, http1=not http2, http2=http2, timeout=timeout
+    ) as client:
+        origin = time.perf_counter()
+
+        async def fetch(ind, row):
+            if preserve_timing:
+                await asyncio.sleep(max(offsets[ind] * 1e-3 - (time.perf_counter() - origin), 0))
+            method = row['method'] if isinstance(row.get('method'), str) else 'GET'
+            headers = {}
+            if pd.notna(row.get('range_start')):
+                end = '' if pd.isna(row['range_end']) else int(row['range_end'])
+                headers['range'] = f"bytes={int(row['range_start'])}-{end}"
+            elif pd.notna(row.get('suffix_length')):
+                headers['range'] = f"bytes=-{int(row['suffix_length'])}"
+            request_start = time.perf_counter()
+            async with client.stream(
+                method, _request_path(row['url']), headers=headers
+            ) as response:
+                first_byte = time.perf_counter()
+                nbytes = 0
+                async for chunk in response.aiter_raw():
+                    nbytes += len(chunk)
+            response_end = time.perf_counter()
+            return {
+                'url': row['url'],
+                'status': response.status_code,
+                'http_version': response.http_version,
+                'scheduled_start': offsets[ind] if preserve_timing else 0.0,
+                'request_start': (request_start - origin) * 1e3,
+                'first_byte': (first_byte - origin) * 1e3,
+                'response_end': (response_end - origin) * 1e3,
+                'bytes': nbytes,
+            }
+
+        results = await asyncio.gather(*(fetch(ind, row) for ind, row in requests.iterrows()))
+
+    replay_data = pd.DataFrame(results)
+    replay_data['ttfb'] = replay_data['first_byte'] - replay_data['request_start']
+    replay_data['total_response_time_ms'] = (
+        replay_data['response_end'] - replay_data['request_start']
+    )
+    return replay_data
+
+
+async def replay(
+    *,
+    request_data: pd.DataFrame,
+    mirror: str = None,
+    host: str = '127.0.0.1',
+    **kwargs,
+):
+    """
+    Serve the recorded payloads locally and replay the recorded request sequence against them.
+
+    Parameters
+    ----------
+
+    request_data: pd.DataFrame
+        Request data returned by ``extract_request_data``.
+
+    mirror: str, optional
+        Local directory mirroring the remote objects, see ``build_payloads``.
+
+    host: str
+        Interface to bind the local server to.
+
+    **kwargs
+        Additional parameters passed to ``replay_requests``.
+
+    Returns
+    -------
+    replay_data : DataFrame containing timings in ms for each replayed request
+    """
+    payloads = build_payloads(request_data, mirror=mirror)
+    async with serve_payloads(payloads, host=host) as base_url:
+        return await replay_requests(request_data=request_data, base_url=base_url, **kwargs)
+
+
+def summarize_replay(replay_data: pd.DataFrame, *, request_data: pd.DataFrame = None):
+    """
+    Summarize throughput and tail latency of a replayed request sequence.
+
+    Parameters
+    ----------
+
+    replay_data: pd.DataFrame
+        Replay data returned by ``replay_requests``.
+
+    request_data: pd.DataFrame, optional
+        Recorded request data, used to compare the replay against the recorded request duration.
+
+    Returns
+    -------
+    summary : dict
+    """
+    wall_time = replay_data['response_end'].max() - replay_data['request_start'].min()
+    latency = replay_data['total_response_time_ms'].to_numpy()
+    summary = {
+        'requests': len(replay_data),
+        'bytes': int(replay_data['bytes'].sum()),
+        'replay_duration': wall_time,
+        'throughput_mbps': replay_data['bytes'].sum() * 8 * 1e-6 / (wall_time * 1e-3),
+        'requests_per_second': len(replay_data) / (wall_time * 1e-3),
+        'median_latency': np.percentile(latency, 50),
+        'p95_latency': np.percentile(latency, 95),
+        'p99_latency': np.percentile(latency, 99),
+        'max_latency': latency.max(),
+        'median_ttfb': replay_data['ttfb'].median(),
+    }
+    if request_data is not None:
+        summary['request_duration'] = (
+            request_data['response_end'].max() - request_data['request_start'].min()
+        )
+        summary['replay_percent'] = summary['replay_duration'] / summary['request_duration'] * 100
+    return summary
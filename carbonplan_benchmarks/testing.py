@@ -0,0 +1,379 @@
+# Utilities for generating synthetic Chromium traces to test and benchmark the analysis offline
+
+import base64
+import json
+import pathlib
+
+import cv2 as cv
+import numpy as np
+
+from .framestore import extract_frames
+from .playwright.actions import parse_action_script
+
+DATASET = 'pyramids-v2-3857-True-128-1-0-0-f4-0-0-0-gzipL1-100'
+TILE_URL = (
+    'https://carbonplan-benchmarks.s3.us-west-2.amazonaws.com/data/NEX-GDDP-CMIP6/'
+    '{dataset}/{level}/tasmax/0.{x}.{y}'
+)
+# Trace clock of the first event, in µs
+TRACE_START = 1e11
+# Processes and threads of the synthetic browser
+BROWSER_PID, RENDERER_PID, GPU_PID = 1, 2, 3
+MAIN_TID, COMPOSITOR_TID, WORKER_TID = 1, 2, 3
+
+
+def make_image(*, level: int, width: int, height: int):
+    """
+    Make a smooth test pattern that differs for each zoom level
+    """
+    x = np.linspace(0, (level + 1) * np.pi, width)
+    y = np.linspace(0, (level + 2) * np.pi, height)
+    pattern = np.sin(x)[np.newaxis, :] * np.cos(y)[:, np.newaxis]
+    channels = [(pattern * (64 + 32 * channel) + 128) for channel in range(3)]
+    return np.clip(np.stack(channels, axis=-1), 0, 255).astype(np.uint8)
+
+
+def encode_image(image: np.ndarray):
+    """
+    Encode an image as base64 JPEG, as stored in Screenshot events and baseline snapshots
+    """
+    return base64.b64encode(cv.imencode('.jpg', image)[1]).decode()
+
+
+def make_trace(
+    *,
+    requests: int = 200,
+    frames: int = 600,
+    screenshots: int = 60,
+    zoom_levels: int = 2,
+    script: str = None,
+    timeout: int = 5000,
+    image_size: tuple = (1280, 720),
+    dataset: str = DATASET,
+    seed: int = 0,
+):
+    """
+    Generate a synthetic benchmark run of an initial load followed by zooming in, or by the
+    steps of an action script.
+
+    Each action lasts ``timeout`` ms, unless a scripted step sets its own timeout. Requests, frames
+    and screenshots are spread evenly over the actions. Screenshots of each action switch from the
+    view after the previous action to a view unique to the action halfway through the action. The
+    view after the n-th action is stored as the baseline of zoom level n.
+
+    Parameters
+    ----------
+
+    requests: int
+        Number of tile requests.
+
+    frames: int
+        Number of frames, of which every tenth is dropped.
+
+    screenshots: int
+        Number of screenshots.
+
+    zoom_levels: int
+        Number of zoom actions after the initial load.
+
+    script: str, optional
+        Action script, in the format of ``--action-script``, to perform after the initial load
+        instead of zooming in.
+
+    timeout: int
+        Duration of each action in ms.
+
+    image_size: tuple
+        Width and height of screenshots and baselines in pixels, which all represent the default
+        1280 CSS pixel wide viewport.
+
+    dataset: str
+        Dataset name, which sets the layout recorded in the metadata.
+
+    seed: int
+        Seed of the random request timings and sizes.
+
+    Returns
+    -------
+    metadata, trace_events, snapshots
+        Metadata in the form returned by ``load_metadata``, the list of trace events and the
+        baseline snapshots in the form returned by ``load_snapshots``.
+    """
+    rng = np.random.default_rng(seed)
+    width, height = image_size
+    steps = parse_action_script(script, timeout=timeout) if script else None
+    if steps:
+        labels = [f'benchmark-{ind}-{step["action"]}' for ind, step in enumerate(steps, start=1)]
+        durations = np.array([timeout] + [step['timeout'] for step in steps])
+    else:
+        labels = [f'benchmark-zoom_in-level-{level}' for level in range(zoom_levels)]
+        durations = np.full(zoom_levels + 1, timeout)
+    labels = ['benchmark-initial-load'] + labels
+    actions = len(labels)
+    # Actions start 1 s after the trace starts, in ms since the trace started
+    action_starts = 1000 + np.concatenate([[0], np.cumsum(durations[:-1])])
+    end = action_starts[-1] + durations[-1]
+
+    def ts(time):
+        return TRACE_START + float(time) * 1e3
+
+    events = [
+        {'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'ts': 0, 'args': {'name': name}}
+        for pid, name in [
+            (BROWSER_PID, 'Browser'),
+            (RENDERER_PID, 'Renderer'),
+            (GPU_PID, 'GPU Process'),
+        ]
+    ] + [
+        {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'ts': 0, 'args': {'name': name}}
+        for pid, tid, name in [
+            (RENDERER_PID, MAIN_TID, 'CrRendererMain'),
+            (RENDERER_PID, COMPOSITOR_TID, 'Compositor'),
+            (RENDERER_PID, WORKER_TID, 'DedicatedWorker thread'),
+            (GPU_PID, MAIN_TID, 'CrGpuMain'),
+        ]
+    ]
+
+    # User timing marks around each action
+    for label, start, duration in zip(labels, action_starts, durations):
+        events.append({'name': f'{label}:start', 'ph': 'R', 'pid': RENDERER_PID, 'ts': ts(start)})
+        events.append(
+            {'name': f'{label}:end', 'ph': 'R', 'pid': RENDERER_PID, 'ts': ts(start + duration)}
+        )
+
+    # Tile requests within the first half of each action
+    request_actions = np.arange(requests) % actions
+    send = action_starts[request_actions] + rng.uniform(0, 1, requests) * (
+        durations[request_actions] / 2
+    )
+    latency = rng.uniform(20, 200, requests)
+    transfer = rng.uniform(5, 100, requests)
+    sizes = rng.integers(10_000, 500_000, requests)
+    for ind in range(requests):
+        request_id = f'{RENDERER_PID}.{ind}'
+        level = request_actions[ind]
+        url = TILE_URL.format(dataset=dataset, level=level, x=ind % 8, y=ind // 8)
+        request_time = send[ind] * 1e-3 + TRACE_START * 1e-6
+        response = send[ind] + latency[ind]
+        finish = response + transfer[ind]
+        data = {'requestId': request_id}
+        events += [
+            {
+                'name': 'ResourceSendRequest',
+                'ph': 'I',
+                'pid': RENDERER_PID,
+                'ts': ts(send[ind]),
+                'args': {
+                    'data': {
+                        **data,
+                        'url': url,
+                        'requestMethod': 'GET',
+                        'priority': 'High',
+                        'headers': [{'name': 'Accept', 'value': '*/*'}],
+                    }
+                },
+            },
+            {
+                'name': 'ResourceReceiveResponse',
+                'ph': 'I',
+                'pid': RENDERER_PID,
+                'ts': ts(response),
+                'args': {
+                    'data': {
+                        **data,
+                        'statusCode': 200,
+                        'fromCache': False,
+                        'timing': {
+                            'requestTime': request_time,
+                            'sendStart': 1.0,
+                            'receiveHeadersEnd': float(latency[ind]),
+                        },
+                        'headers': [{'name': 'Content-Length', 'value': str(sizes[ind])}],
+                    }
+                },
+            },
+            *(
+                {
+                    'name': 'ResourceReceivedData',
+                    'ph': 'I',
+                    'pid': RENDERER_PID,
+                    'ts': ts(response + transfer[ind] * part / 2),
+                    'args': {'data': {**data, 'encodedDataLength': int(sizes[ind] // 2)}},
+                }
+                for part in (0, 1)
+            ),
+            {
+                'name': 'ResourceFinish',
+                'ph': 'I',
+                'pid': RENDERER_PID,
+                'ts': ts(finish),
+                'args': {'data': {**data, 'encodedDataLength': int(sizes[ind])}},
+            },
+            {
+                'name': 'RunTask',
+                'ph': 'X',
+                'pid': RENDERER_PID,
+                'tid': WORKER_TID,
+                'ts': ts(finish),
+                'dur': 2000.0,
+            },
+            {
+                'name': 'FunctionCall',
+                'ph': 'X',
+                'pid': RENDERER_PID,
+                'tid': WORKER_TID,
+                'ts': ts(finish + 0.1),
+                'dur': 1500.0,
+            },
+        ]
+
+    # Frames spread over the whole run, each with main thread and GPU work
+    frame_starts = np.linspace(action_starts[0], end, frames, endpoint=False)
+    for seq, start in enumerate(frame_starts):
+        args = {'frameSeqId': seq}
+        events += [
+            {
+                'name': 'BeginFrame',
+                'ph': 'I',
+                'pid': RENDERER_PID,
+                'tid': COMPOSITOR_TID,
+                'ts': ts(start),
+                'args': args,
+            },
+            {'name': 'Commit', 'ph': 'X', 'pid': RENDERER_PID, 'ts': ts(start + 2), 'args': args},
+            {
+                'name': 'DroppedFrame' if seq % 10 == 9 else 'DrawFrame',
+                'ph': 'I',
+                'pid': GPU_PID,
+                'ts': ts(start + 4),
+                'args': args,
+            },
+            {
+                'name': 'RunTask',
+                'ph': 'X',
+                'pid': RENDERER_PID,
+                'tid': MAIN_TID,
+                'ts': ts(start),
+                'dur': 3000.0,
+            },
+            {
+                'name': 'FireAnimationFrame',
+                'ph': 'X',
+                'pid': RENDERER_PID,
+                'tid': MAIN_TID,
+                'ts': ts(start + 0.5),
+                'dur': 2000.0,
+            },
+            {
+                'name': 'RunTask',
+                'ph': 'X',
+                'pid': GPU_PID,
+                'tid': MAIN_TID,
+                'ts': ts(start + 3),
+                'dur': 1000.0,
+            },
+        ]
+
+    # Screenshots converging on the baseline of each zoom level, starting from an empty map
+    baselines = [make_image(level=level, width=width, height=height) for level in range(actions)]
+    encoded = [encode_image(image) for image in baselines]
+    blank = encode_image(np.full((height, width, 3), 255, dtype=np.uint8))
+    screenshot_starts = np.linspace(action_starts[0], end, screenshots, endpoint=False)
+    for start in screenshot_starts:
+        action = np.searchsorted(action_starts, start, side='right') - 1
+        if start - action_starts[action] >= durations[action] / 2:
+            snapshot = encoded[action]
+        else:
+            snapshot = encoded[action - 1] if action else blank
+        events.append(
+            {
+                'name': 'Screenshot',
+                'ph': 'O',
+                'pid': BROWSER_PID,
+                'ts': ts(start),
+                'args': {'snapshot': snapshot},
+            }
+        )
+
+    events.sort(key=lambda event: event['ts'])
+    parts = dataset.split('-')
+    metadata = {
+        'run_number': 1,
+        'dataset': dataset,
+        'action': 'zoom_in' if zoom_levels and not steps else None,
+        'zoom_level': 0 if steps else zoom_levels,
+        'action_script': script,
+        'action_steps': steps,
+        'timeout': timeout,
+        'collection_mode': 'trace',
+        'trace_path': 'trace.json',
+        'resources_path': None,
+        'zarr_version': int(parts[1][1]),
+        'projection': int(parts[2]),
+        'pixels_per_tile': int(parts[4]),
+        'target_chunk_size': int(parts[5]),
+        'shard_orientation': parts[6],
+        'shard_size': int(parts[7]),
+    }
+    snapshots = {
+        str(metadata['zarr_version']): {
+            str(metadata['pixels_per_tile']): {
+                str(metadata['projection']): {
+                    str(level): image for level, image in enumerate(encoded)
+                }
+            }
+        }
+    }
+    return metadata, events, snapshots
+
+
+def write_trace(directory, *, frame_store: bool = False, **kwargs):
+    """
+    Write a synthetic benchmark run to ``directory`` in the layout of the benchmark outputs
+
+    Parameters
+    ----------
+
+    directory: str or pathlib.Path
+        Local directory to write ``data.json``, ``trace.json`` and ``baselines.json`` to.
+
+    frame_store: bool
+        Whether to move the screenshots out of the trace into ``frames.bin`` and ``frames.json``,
+        as the benchmark harness does.
+
+    **kwargs
+        Passed to ``make_trace``.
+
+    Returns
+    -------
+    metadata_path, snapshot_path : str
+        Paths to pass to ``load_data`` and ``load_snapshots``.
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    metadata, trace_events, snapshots = make_trace(**kwargs)
+    # Only the fields recorded by the benchmark harness, without the parsed layout
+    record = {
+        key: metadata[key]
+        for key in [
+            'run_number',
+            'dataset',
+            'action',
+            'zoom_level',
+            'action_script',
+            'action_steps',
+            'timeout',
+            'collection_mode',
+            'trace_path',
+            'resources_path',
+        ]
+    }
+    if frame_store:
+        blobs, index = extract_frames(trace_events, blobs_path='frames.bin')
+        (directory / 'frames.bin').write_bytes(blobs)
+        (directory / 'frames.json').write_text(json.dumps(index))
+        record['frames_path'] = 'frames.json'
+    (directory / 'data.json').write_text(json.dumps([record]))
+    (directory / metadata['trace_path']).write_text(json.dumps({'traceEvents': trace_events}))
+    (directory / 'baselines.json').write_text(json.dumps(snapshots))
+    return str(directory / 'data.json'), str(directory / 'baselines.json')
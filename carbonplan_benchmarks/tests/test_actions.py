@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+
+from carbonplan_benchmarks.analysis import create_summary, process_run
+from carbonplan_benchmarks.analysis.actions import pair_action_marks
+from carbonplan_benchmarks.analysis.processing import process_zoom_levels
+from carbonplan_benchmarks.playwright.actions import parse_action_script
+from carbonplan_benchmarks.testing import make_trace
+
+
+def test_parse_action_script():
+    steps = parse_action_script('zoom_in, pan:200:-100@3000,time_step:-2,variable:pr', timeout=500)
+    assert steps == [
+        {'action': 'zoom_in', 'timeout': 500},
+        {'action': 'pan', 'dx': 200, 'dy': -100, 'timeout': 3000},
+        {'action': 'time_step', 'steps': -2, 'timeout': 500},
+        {'action': 'variable', 'variable': 'pr', 'timeout': 500},
+    ]
+
+
+@pytest.mark.parametrize('script', ['rotate', 'pan:200', 'zoom_in:1', 'time_step:next'])
+def test_parse_invalid_action_script(script):
+    with pytest.raises(ValueError):
+        parse_action_script(script, timeout=500)
+
+
+def test_pair_action_marks():
+    marks = pd.DataFrame(
+        [
+            ['benchmark-1-zoom_in:start', 100],
+            ['benchmark-initial-load:start', 0],
+            ['benchmark-initial-load:end', 100],
+            ['benchmark-1-zoom_in', 100],
+            ['benchmark-1-zoom_in:end', 200],
+            ['benchmark-2-pan:start', 200],
+            ['benchmark-2-pan:end', 300],
+            ['benchmark-3-zoom_in:start', 300],
+            ['benchmark-3-zoom_in:end', 400],
+        ],
+        columns=['name', 'startTime'],
+    )
+    actions = pair_action_marks(marks)
+    assert actions['label'].to_list() == ['initial-load', '1-zoom_in', '2-pan', '3-zoom_in']
+    assert actions['action'].to_list() == ['initial-load', 'zoom_in', 'pan', 'zoom_in']
+    assert actions['start_time'].to_list() == [0, 100, 200, 300]
+    assert actions['action_end_time'].to_list() == [100, 200, 300, 400]
+    assert actions['zoom'].to_list() == [0, 1, 1, 2]
+    # Baselines only show the views reached by zooming from the initial view
+    assert actions['baseline'].to_list() == [0, 1, pd.NA, pd.NA]
+
+
+def test_pair_repeated_action_marks():
+    marks = pd.DataFrame(
+        [
+            ['benchmark-initial-load:start', 0],
+            ['benchmark-initial-load:end', 100],
+            ['benchmark-zoom_out-level-0:start', 100],
+            ['benchmark-zoom_out-level-0:end', 200],
+        ],
+        columns=['name', 'startTime'],
+    )
+    actions = pair_action_marks(marks)
+    assert actions['label'].to_list() == ['initial-load', 'zoom_out-level-0']
+    assert actions['zoom'].to_list() == [0, -1]
+    assert actions['baseline'].to_list() == [0, pd.NA]
+
+
+# The timeout flags of the summary must not be set into an integer column
+@pytest.mark.filterwarnings('error::FutureWarning')
+def test_scripted_run():
+    metadata, trace_events, snapshots = make_trace(
+        requests=30,
+        frames=90,
+        screenshots=30,
+        script='zoom_in,pan:100:0@3000,time_step:1',
+        timeout=4000,
+        image_size=(320, 180),
+    )
+    data = process_run(
+        metadata=metadata, trace_events=trace_events, snapshots=snapshots, profile=False
+    )
+    action_data = data['action_data']
+    assert action_data['action'].to_list() == ['initial-load', 'zoom_in', 'pan', 'time_step']
+    # Actions without a baseline end once the view matches their last screenshot
+    assert action_data['duration'].to_list() == [2000, 2000, 1500, 2000]
+    assert (action_data['min_rmse'] == 0).all()
+    summary = create_summary(metadata=metadata, data=data, profile=False, chunk_size=False)
+    assert summary['action_type'].to_list() == action_data['action'].to_list()
+    assert summary['action_index'].to_list() == [0, 1, 2, 3]
+    assert summary['zoom'].to_list() == [0, 1, 1, 1]
+    assert summary['filtered_requests'].sum() == 30
+    assert not summary['timeout'].any()
+
+
+def test_process_zoom_levels():
+    metadata, trace_events, snapshots = make_trace(
+        requests=30, frames=90, screenshots=30, zoom_levels=2, image_size=(320, 180)
+    )
+    data = process_run(
+        metadata=metadata, trace_events=trace_events, snapshots=snapshots, profile=False
+    )
+    action_data = process_zoom_levels(
+        trace_events=trace_events,
+        screenshot_data=data['screenshot_data'],
+        zoom_level=metadata['zoom_level'],
+    )
+    assert action_data.columns.to_list() == [
+        'start_time',
+        'end_time',
+        'action_end_time',
+        'min_rmse',
+        'duration',
+    ]
+    pd.testing.assert_frame_equal(action_data, data['action_data'][action_data.columns])
+    summary = create_summary(metadata=metadata, data=data, profile=False, chunk_size=False)
+    assert summary['zoom'].to_list() == summary['action_index'].to_list() == [0, 1, 2]
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from carbonplan_benchmarks.playwright.backends import (
+    RENDERING_BACKENDS,
+    is_software_renderer,
+    webgl_info,
+)
+
+
+class Page:
+    def __init__(self, info):
+        self.info = info
+
+    async def evaluate(self, script):
+        return self.info
+
+
+@pytest.mark.parametrize(
+    'renderer,software',
+    [
+        ('ANGLE (Google, Vulkan 1.3.0 (SwiftShader Device (Subzero)), SwiftShader driver)', True),
+        ('ANGLE (Mesa, llvmpipe (LLVM 15.0.7, 256 bits), OpenGL 4.5)', True),
+        ('ANGLE (NVIDIA Corporation, NVIDIA A10G/PCIe/SSE2, OpenGL 4.5.0)', False),
+        (None, True),
+    ],
+)
+def test_is_software_renderer(renderer, software):
+    assert is_software_renderer(renderer) == software
+
+
+def test_rendering_backends():
+    assert 'default' in RENDERING_BACKENDS
+    for flags in RENDERING_BACKENDS.values():
+        assert all(flag.startswith('--') for flag in flags)
+
+
+def test_webgl_info():
+    info = asyncio.run(
+        webgl_info(
+            Page(
+                {
+                    'vendor': 'Google Inc. (NVIDIA Corporation)',
+                    'renderer': 'ANGLE (NVIDIA Corporation, NVIDIA A10G/PCIe/SSE2, OpenGL 4.5.0)',
+                    'version': 'WebGL 2.0 (OpenGL ES 3.0 Chromium)',
+                }
+            )
+        )
+    )
+    assert info['webgl_version'] == 'WebGL 2.0 (OpenGL ES 3.0 Chromium)'
+    assert not info['software_rendering']
+    # Without WebGL, e.g. when GPU and software rendering are both disabled
+    info = asyncio.run(webgl_info(Page(None)))
+    assert info['webgl_renderer'] is None
+    assert info['software_rendering']
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from carbonplan_benchmarks.compare import compare_summaries, main
+
+
+def make_summary(*, duration, fps, runs=10, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            'dataset': np.repeat(['a', 'b'], runs),
+            'zoom': 0,
+            'duration': np.r_[rng.normal(duration, 10, runs), rng.normal(500, 10, runs)],
+            'fps': np.r_[rng.normal(fps, 1, runs), rng.normal(60, 1, runs)],
+        }
+    )
+
+
+def test_compare_summaries():
+    baseline = make_summary(duration=500, fps=60)
+    contender = make_summary(duration=700, fps=40, seed=1)
+    comparison = compare_summaries(
+        baseline, contender, metrics=['duration', 'fps'], threshold=0.05, seed=0
+    ).set_index(['dataset', 'metric'])
+    assert comparison.loc[('a', 'duration'), 'regression']
+    assert comparison.loc[('a', 'fps'), 'regression']
+    assert comparison.loc[('a', 'duration'), 'effect_size'] > 0
+    assert comparison.loc[('a', 'fps'), 'effect_size'] < 0
+    assert not comparison.loc['b', 'regression'].any()
+
+
+def test_compare_improvement():
+    baseline = make_summary(duration=700, fps=40)
+    contender = make_summary(duration=500, fps=60, seed=1)
+    comparison = compare_summaries(baseline, contender, metrics=['duration', 'fps'], seed=0)
+    assert not comparison['regression'].any()
+
+
+def test_compare_single_runs():
+    baseline = make_summary(duration=500, fps=60, runs=1)
+    contender = make_summary(duration=550, fps=60, runs=1, seed=1)
+    comparison = compare_summaries(baseline, contender, metrics=['duration'], seed=0)
+    assert comparison['difference_ci_low'].isna().all()
+    assert comparison['difference_ci_high'].isna().all()
+    assert not comparison['regression'].any()
+
+
+@pytest.mark.parametrize('duration,expected', [(500, 0), (700, 1)])
+def test_compare_exit_code(tmp_path, duration, expected):
+    make_summary(duration=500, fps=60).to_csv(tmp_path / 'baseline.csv', index=False)
+    make_summary(duration=duration, fps=60, seed=1).to_csv(tmp_path / 'contender.csv', index=False)
+    argv = [str(tmp_path / 'baseline.csv'), str(tmp_path / 'contender.csv')]
+    assert main([*argv, '--metrics', 'duration', 'fps', '--seed', '0']) == expected
@@ -0,0 +1,93 @@
+import holoviews as hv
+import numpy as np
+import pandas as pd
+
+from carbonplan_benchmarks.analysis.dashboard import (
+    aggregate_summary,
+    dashboard,
+    plot_distributions,
+    plot_heatmap,
+    read_summary,
+)
+
+
+def make_summary(runs=3, cache_modes=('cold',)):
+    rows = []
+    for chunk in [1, 5]:
+        for shard in [0, 50]:
+            for zoom in [0, 1]:
+                for run in range(runs):
+                    for cache_mode in cache_modes:
+                        rows.append(
+                            {
+                                'dataset': f'pyramids-v3-3857-True-128-{chunk}-both-{shard}',
+                                'metadata_path': 'data.json',
+                                'trace_path': f'{cache_mode}-{chunk}-{shard}-{run}.json',
+                                'cache_mode': cache_mode,
+                                'zoom': zoom,
+                                'target_chunk_size': chunk,
+                                'shard_size': shard,
+                                'duration': 100.0 * chunk + shard + run,
+                                'fps': 60.0,
+                                'request_duration': 50.0,
+                                'min_rmse': 1.0,
+                            }
+                        )
+    return pd.DataFrame(rows).set_index('dataset')
+
+
+def test_aggregate_summary():
+    aggregated = aggregate_summary(make_summary().reset_index())
+    assert len(aggregated) == 8
+    assert (aggregated['count'] == 3).all()
+    row = aggregated.query('zoom == 0 and target_chunk_size == 5 and shard_size == 50')
+    assert row['median'].item() == 551
+
+
+def test_plots():
+    summary = make_summary().reset_index()
+    heatmap = plot_heatmap(summary, metric='duration')
+    assert list(heatmap.keys()) == [0, 1]
+    assert isinstance(heatmap[0], hv.HeatMap)
+    np.testing.assert_array_equal(
+        sorted(heatmap[0].dimension_values('median')), [101, 151, 501, 551]
+    )
+    assert len(plot_distributions(summary)[1]) == 12
+
+
+def test_read_summary(tmp_path):
+    path = str(tmp_path / 'summary.parq')
+    make_summary().to_parquet(path)
+    summary = read_summary(path, columns=('zoom', 'duration'))
+    assert list(summary.columns) == ['dataset', 'zoom', 'duration']
+    # Callers get their own copy of the cached table
+    summary['duration'] = 0.0
+    assert (read_summary(path, columns=('zoom', 'duration'))['duration'] > 0).all()
+    # Rewritten tables are read again
+    make_summary(runs=1).to_parquet(path)
+    assert len(read_summary(path, columns=('zoom', 'duration'))) == 8
+
+
+def test_dashboard(tmp_path):
+    path = str(tmp_path / 'summary.parq')
+    make_summary(cache_modes=('cold', 'warm')).to_parquet(path)
+    app = dashboard(summary_path=path, snapshot_path='baselines.json')
+    app.get_root()
+    cache_mode = app[0][-1]
+    assert cache_mode.options == ['cold', 'warm']
+    heatmap, runs = app[1]
+    (tap,) = [
+        s for s in hv.streams.Stream.registry[heatmap.object] if isinstance(s, hv.streams.Tap)
+    ]
+    tap.event(x='5', y='50')
+    assert runs.value['trace_path'].to_list() == [
+        'cold-5-50-0.json',
+        'cold-5-50-1.json',
+        'cold-5-50-2.json',
+    ]
+    cache_mode.value = 'warm'
+    assert runs.value['trace_path'].to_list() == [
+        'warm-5-50-0.json',
+        'warm-5-50-1.json',
+        'warm-5-50-2.json',
+    ]
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from carbonplan_benchmarks.analysis.frames import summarize_frames
+
+
+def test_summarize_frames():
+    durations = [16, 16, 50, 16, 16, 16, 34, 16, 16, 16]
+    dropped = [False, False, True, True, True, False, True, False, False, False]
+    frames_data = pd.DataFrame(
+        {
+            'startTime': np.cumsum([0] + durations[:-1]) + 1.0,
+            'duration': durations,
+            'dropped': dropped,
+        }
+    )
+    action_data = pd.DataFrame({'start_time': [0.0, 150.0], 'end_time': [150.0, 250.0]})
+    action_data['duration'] = action_data['end_time'] - action_data['start_time']
+    summary = summarize_frames(frames_data=frames_data, action_data=action_data, frame_budget=16)
+    assert summary.loc[0, 'longest_frame'] == 50
+    assert summary.loc[0, 'frame_duration_p50'] == 16
+    assert summary.loc[0, 'dropped_frames'] == 4
+    assert summary.loc[0, 'longest_dropped_run'] == 3
+    assert summary.loc[0, 'jank_score'] == (34 + 18) / 150 * 100
+    assert summary.loc[1, 'dropped_frames'] == 0
+    assert summary.loc[1, 'dropped_frame_percent'] == 0
+    assert summary.loc[1, 'longest_dropped_run'] == 0
+    assert summary.loc[1, 'jank_score'] == 0
@@ -0,0 +1,55 @@
+import base64
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from carbonplan_benchmarks.analysis import load_data, load_snapshots, process_run
+from carbonplan_benchmarks.framestore import extract_frames, frame_reader
+from carbonplan_benchmarks.testing import write_trace
+
+
+def test_frame_store(tmp_path):
+    jpegs = [b'first', b'', b'third frame']
+    trace_events = [
+        {'name': 'BeginFrame', 'ts': 0, 'args': {}},
+        *(
+            {'name': 'Screenshot', 'ts': ts, 'args': {'snapshot': base64.b64encode(jpeg).decode()}}
+            for ts, jpeg in zip([10, 20, 30], jpegs)
+        ),
+    ]
+    blobs, index = extract_frames(trace_events, blobs_path='frames.bin')
+    assert blobs == b''.join(jpegs)
+    # Screenshots only keep a reference to their frame
+    assert [event['args'] for event in trace_events[1:]] == [{'frame': ind} for ind in range(3)]
+    assert [row[1] for row in index['frames']] == [10, 20, 30]
+    (tmp_path / 'frames.bin').write_bytes(blobs)
+    (tmp_path / 'index.json').write_text(json.dumps(index))
+    read = frame_reader(str(tmp_path / 'index.json'))
+    assert [read(ind) for ind in (2, 0, 1)] == [jpegs[2], jpegs[0], jpegs[1]]
+
+
+def test_process_frame_store(tmp_path):
+    kwargs = {'requests': 20, 'frames': 60, 'screenshots': 12, 'image_size': (320, 180)}
+    results = []
+    for frame_store in (False, True):
+        directory = tmp_path / str(frame_store)
+        metadata_path, snapshot_path = write_trace(directory, frame_store=frame_store, **kwargs)
+        metadata, trace_events = load_data(metadata_path=metadata_path, run=0)
+        data = process_run(
+            metadata=metadata,
+            trace_events=trace_events,
+            snapshots=load_snapshots(snapshot_path=snapshot_path),
+            profile=False,
+        )
+        results.append(data)
+    embedded, stored = results
+    assert os.path.getsize(tmp_path / 'True' / 'trace.json') < os.path.getsize(
+        tmp_path / 'False' / 'trace.json'
+    )
+    pd.testing.assert_frame_equal(embedded['action_data'], stored['action_data'])
+    rmse = [column for column in embedded['screenshot_data'] if column.startswith('rmse')]
+    np.testing.assert_array_equal(
+        embedded['screenshot_data'][rmse], stored['screenshot_data'][rmse]
+    )
@@ -0,0 +1,52 @@
+import json
+import time
+
+import pytest
+
+from carbonplan_benchmarks.analysis.harness import load_harness_data, summarize_phases
+from carbonplan_benchmarks.playwright.phases import phase_recorder
+
+
+def make_run(run_number):
+    phases = [
+        {'name': 'launch_browser', 'start': 0.0, 'duration': 1.0},
+        {'name': 'goto', 'start': 1.0, 'duration': 2.0},
+        {'name': 'initial-load', 'start': 3.0, 'duration': 5.0},
+        {'name': 'zoom_in-level-0', 'start': 8.0, 'duration': 5.0},
+        {'name': 'zoom_in-level-1', 'start': 13.0, 'duration': 5.0},
+        {'name': 'serialize', 'start': 18.0, 'duration': 1.0},
+    ]
+    return {
+        'run_number': run_number,
+        'dataset': 'pyramids-v2-3857-True-128-1-0-0-f4-0-0-0-gzipL1-100',
+        'phases': phases,
+        'harness_duration': 20.0,
+        'uploads': {f'{run_number}.json': {'status': 'complete', 'duration': 3.0}},
+    }
+
+
+def test_phase_recorder():
+    phases, phase = phase_recorder()
+    with phase('first'):
+        time.sleep(0.01)
+    with pytest.raises(RuntimeError):
+        with phase('second'):
+            raise RuntimeError
+    assert [span['name'] for span in phases] == ['first', 'second']
+    assert phases[0]['duration'] >= 0.01
+    assert phases[1]['start'] >= phases[0]['start'] + phases[0]['duration']
+
+
+def test_summarize_phases(tmp_path):
+    (tmp_path / 'data-1.json').write_text(json.dumps([make_run(1), make_run(2)]))
+    # Runs recorded before phases were timed are skipped
+    (tmp_path / 'data-0.json').write_text(json.dumps([{'run_number': 1}]))
+    phase_data = load_harness_data(str(tmp_path / 'data-*.json'))
+    summary = summarize_phases(phase_data)
+    assert summary.loc['actions', 'total_seconds'] == 20
+    assert summary.loc['actions', 'measured']
+    assert not summary.loc['goto', 'measured']
+    assert summary.loc['unaccounted', 'total_seconds'] == pytest.approx(2)
+    assert summary['percent'].sum() == pytest.approx(100)
+    assert summary.loc['upload', 'total_seconds'] == 6
+    assert summary.index[0] == 'actions'
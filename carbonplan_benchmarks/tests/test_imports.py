@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+import pytest
+
+import carbonplan_benchmarks.analysis as cba
+
+# Dependencies that are only needed by some functions, and must not be loaded on import
+HEAVY_MODULES = ['holoviews', 'hvplot', 'bokeh', 'panel', 'cv2', 'zarrita', 'cloud_detect']
+
+
+@pytest.mark.parametrize(
+    'module',
+    [
+        'carbonplan_benchmarks.analysis',
+        'carbonplan_benchmarks.analysis.processing',
+        'carbonplan_benchmarks.playwright.cli',
+    ],
+)
+def test_lazy_imports(module):
+    code = f'import sys, {module}; print(" ".join(sorted(sys.modules)))'
+    modules = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert not [name for name in modules if name.split('.')[0] in HEAVY_MODULES]
+    if module.endswith('cli'):
+        assert 'playwright' not in modules
+
+
+def test_lazy_attributes():
+    assert callable(cba.process_run)
+    assert cba.create_summary.__module__ == 'carbonplan_benchmarks.analysis.processing'
+    assert cba.parsing.extract_request_data
+    assert 'plot_frames' in dir(cba)
+    with pytest.raises(AttributeError):
+        cba.missing_function
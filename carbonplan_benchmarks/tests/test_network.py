@@ -0,0 +1,125 @@
+import pandas as pd
+
+from carbonplan_benchmarks.analysis import create_summary, process_run, processing
+from carbonplan_benchmarks.analysis.network import (
+    compute_waterfall,
+    concurrency_timeline,
+    summarize_network,
+)
+from carbonplan_benchmarks.analysis.parsing import extract_request_data
+from carbonplan_benchmarks.testing import make_trace
+
+URL = 'https://example.com/data/0/tasmax/0.0.{}'
+
+# request start, send start, headers received, response end (ms)
+REQUESTS = [(0, 1, 5, 10), (2, 3, 8, 12), (12, 15, 20, 30), (31, 31, 35, 40)]
+
+
+def make_trace_events():
+    trace_events = [{'name': 'TracingStartedInBrowser', 'ts': 1000, 'args': {}}]
+    for ind, (start, send, headers, end) in enumerate(REQUESTS):
+        request = {
+            'requestId': str(ind),
+            'url': URL.format(ind),
+            'requestMethod': 'GET',
+            'priority': 'High',
+        }
+        timing = {
+            'requestTime': (1000 + start * 1e3) * 1e-6,
+            'sendStart': send - start,
+            'receiveHeadersEnd': headers - start,
+        }
+        trace_events += [
+            {'name': 'ResourceSendRequest', 'ts': 1000 + start * 1e3, 'args': {'data': request}},
+            {
+                'name': 'ResourceReceiveResponse',
+                'ts': 1000 + headers * 1e3,
+                'args': {
+                    'data': {
+                        'requestId': str(ind),
+                        'statusCode': 200,
+                        'fromCache': ind == 3,
+                        'timing': timing,
+                    }
+                },
+            },
+            {
+                'name': 'ResourceReceivedData',
+                'ts': 1000 + end * 1e3,
+                'args': {'data': {'requestId': str(ind), 'encodedDataLength': 1000}},
+            },
+            {
+                'name': 'ResourceFinish',
+                'ts': 1000 + end * 1e3,
+                'args': {'data': {'requestId': str(ind), 'encodedDataLength': 1000}},
+            },
+        ]
+    return trace_events
+
+
+def test_extract_request_timing():
+    request_data = extract_request_data(trace_events=make_trace_events())
+    assert request_data['send_start'].round(6).to_list() == [1, 3, 15, 31]
+    assert request_data['receive_headers_end'].round(6).to_list() == [5, 8, 20, 35]
+    assert request_data['received_data_length'].to_list() == [1000] * 4
+    assert request_data['from_cache'].to_list() == [False, False, False, True]
+
+
+def test_request_data_dtypes():
+    request_data = extract_request_data(trace_events=make_trace_events())
+    assert request_data['method'].dtype == 'category'
+    assert request_data['priority'].dtype == 'category'
+    assert request_data['url'].dtype == object
+    assert request_data['request_start'].dtype == 'float32'
+    assert 'request_headers' not in request_data
+    assert not {'first_data', 'last_data'} & set(request_data.columns)
+    request_data = extract_request_data(trace_events=make_trace_events(), headers=True)
+    assert {'request_headers', 'response_headers'} <= set(request_data.columns)
+
+
+def test_concurrency_timeline():
+    timeline = concurrency_timeline(extract_request_data(trace_events=make_trace_events()))
+    assert timeline['in_flight'].max() == 2
+    # The third request starts exactly when the second ends
+    assert timeline.loc[timeline['time'] == 12, 'in_flight'].item() == 1
+
+
+def test_waterfall():
+    request_data = extract_request_data(trace_events=make_trace_events())
+    action_data = pd.DataFrame({'start_time': [-1, 30], 'action_end_time': [30, 50]})
+    waterfall = compute_waterfall(request_data=request_data, action_data=action_data)
+    assert waterfall['action'].to_list() == [0, 0, 0, 1]
+    assert waterfall['queueing'].round(6).to_list() == [1, 1, 3, 0]
+    assert waterfall['ttfb'].round(6).to_list() == [4, 5, 5, 4]
+    assert waterfall['transfer'].round(6).to_list() == [5, 4, 10, 5]
+    assert waterfall['critical_path'].to_list() == [False, True, True, True]
+
+    network = summarize_network(waterfall_data=waterfall, action_data=action_data)
+    assert network.loc[0, 'max_concurrent_requests'] == 2
+    assert network.loc[0, 'critical_path_requests'] == 2
+    assert round(network.loc[0, 'bytes_per_second']) == 100000
+    assert network.loc[1, 'critical_path_requests'] == 1
+
+
+def test_summary_reuses_waterfall(monkeypatch):
+    metadata, trace_events, snapshots = make_trace(
+        requests=30, frames=90, screenshots=30, image_size=(320, 180)
+    )
+    data = process_run(
+        metadata=metadata, trace_events=trace_events, snapshots=snapshots, profile=False
+    )
+    calls = []
+
+    def counting_compute_waterfall(**kwargs):
+        calls.append(kwargs['url_filter'])
+        return compute_waterfall(**kwargs)
+
+    monkeypatch.setattr(processing, 'compute_waterfall', counting_compute_waterfall)
+    summary = create_summary(metadata=metadata, data=data, profile=False, chunk_size=False)
+    assert calls == []
+    filtered = create_summary(
+        metadata=metadata, data=data, url_filter='no-match', profile=False, chunk_size=False
+    )
+    assert calls == ['no-match']
+    assert summary['critical_path_requests'].sum() > 0
+    assert filtered['critical_path_requests'].sum() == 0
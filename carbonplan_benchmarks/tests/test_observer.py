@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pytest
+
+import carbonplan_benchmarks.analysis.processing as processing
+from carbonplan_benchmarks.analysis.observer import load_observer_data, process_observer_run
+from carbonplan_benchmarks.playwright.observer import OBSERVER_FIELDS
+
+TILE_URL = 'https://example.com/data/pyramids/0/tasmax/0.0.{}'
+
+
+def make_observer_data():
+    resources = [
+        # name, initiatorType, startTime, fetchStart, requestStart, responseStart, responseEnd,
+        # transferSize, encodedBodySize, responseStatus, nextHopProtocol
+        ['https://example.com/app.js', 'script', 5, 5, 6, 8, 9, 100, 90, 200, 'h2'],
+        [TILE_URL.format(0), 'fetch', 20, 20, 21, 30, 40, 1000, 900, 200, 'h2'],
+        [TILE_URL.format(1), 'fetch', 25, 25, 0, 0, 60, 1000, 900, 200, 'h2'],
+        [TILE_URL.format(2), 'fetch', 520, 520, 521, 530, 580, 0, 900, 200, 'h2'],
+    ]
+    marks = [
+        ['benchmark-initial-load:start', 10],
+        ['benchmark-initial-load:end', 510],
+        ['benchmark-zoom_in-level-0:start', 510],
+        ['benchmark-zoom_in-level-0:end', 1010],
+    ]
+    return {
+        'fields': OBSERVER_FIELDS,
+        'timeOrigin': 1.7e12,
+        'frames': list(np.arange(0, 1000, 1000 / 60)) + [1050],
+        'resources': resources,
+        'longtasks': [['self', 100, 80]],
+        'marks': marks,
+        'measures': [],
+    }
+
+
+@pytest.fixture
+def observer_run(tmp_path):
+    (tmp_path / 'observer.json').write_text(json.dumps(make_observer_data()))
+    metadata = {
+        'dataset': 'pyramids-v2-3857-True-128-1-0-0-f4-0-0-0-gzipL1-100',
+        'action': 'zoom_in',
+        'zoom_level': 1,
+        'timeout': 500,
+        'collection_mode': 'observer',
+        'trace_path': None,
+        'observer_path': 'observer.json',
+        'phases': [
+            {'name': 'launch_browser', 'start': 0.0, 'duration': 1.0},
+            {'name': 'goto', 'start': 1.0, 'duration': 2.0},
+        ],
+        'uploads': {'observer.json': {'status': 'complete'}},
+    }
+    (tmp_path / 'data.json').write_text(json.dumps([metadata]))
+    return load_observer_data(metadata_path=str(tmp_path / 'data.json'), run=0)
+
+
+def test_process_observer_run(observer_run):
+    metadata, observer_data = observer_run
+    data = process_observer_run(
+        metadata=metadata, observer_data=observer_data, url_filter='pyramids'
+    )
+    request_data = data['request_data']
+    assert len(request_data) == 4
+    # Cross-origin timings without Timing-Allow-Origin are missing rather than zero
+    assert np.isnan(request_data.loc[2, 'send_start'])
+    assert request_data.loc[1, 'total_response_time_ms'] == 20
+
+    action_data = data['action_data']
+    assert action_data['start_time'].to_list() == [10, 510]
+    assert action_data['end_time'].to_list() == [60, 580]
+    assert action_data['min_rmse'].isna().all()
+
+    frames = data['frames_data']
+    assert frames['dropped'].sum() == 1
+    assert frames['duration'].iloc[-1] == pytest.approx(1050 - 1000 * 59 / 60)
+    assert data['waterfall_data']['action'].to_list() == [0, 0, 1]
+
+
+def test_observer_summary(observer_run, monkeypatch):
+    monkeypatch.setattr(processing, 'add_chunk_size', lambda summary: summary)
+    metadata, observer_data = observer_run
+    data = process_observer_run(
+        metadata=metadata, observer_data=observer_data, url_filter='pyramids'
+    )
+    summary = processing.create_summary(metadata=metadata, data=data, url_filter='pyramids')
+    assert summary['filtered_requests'].to_list() == [2, 1]
+    assert summary['duration'].to_list() == [50, 70]
+    assert summary['cache_hit_percent'].to_list() == [0, 100]
+    assert summary.loc[0, 'fps'] == pytest.approx(3 / 0.05)
+
+
+def test_observer_summary_profile(observer_run, monkeypatch):
+    monkeypatch.setattr(processing, 'add_chunk_size', lambda summary: summary)
+    metadata, observer_data = observer_run
+    data = process_observer_run(metadata=metadata, observer_data=observer_data)
+    processing.create_summary(metadata=metadata, data=data, profile=True)
+    assert data['profile_data']['stage'].to_list() == ['create_summary', 'add_chunk_size']
+    assert data['profile_data'].loc[0, 'actions'] == 2
@@ -0,0 +1,50 @@
+import holoviews as hv
+import numpy as np
+import pandas as pd
+import pytest
+
+from carbonplan_benchmarks.analysis.plotting import plot_frames, plot_requests
+
+
+def make_request_data(n):
+    start = np.arange(n) * 10.0
+    return pd.DataFrame(
+        {
+            'request_start': start,
+            'response_end': start + 50,
+            'total_response_time_ms': 50.0,
+            'encoded_data_length': 1000,
+            'url': [f'https://example.com/a/b/c/d/e/f/g/0/tasmax/0.0.{i}' for i in range(n)],
+            'method': 'GET',
+        }
+    )
+
+
+def test_plot_requests():
+    plt = plot_requests(make_request_data(10), url_filter='0.0.1')
+    assert isinstance(plt, hv.Rectangles)
+    assert len(plt) == 1
+    assert plt.dimension_values('y0').tolist() == [1]
+    assert plt.dimension_values('url').tolist() == ['0/tasmax/0.0.1']
+
+
+@pytest.mark.parametrize('n,rasterized', [(10, False), (100, True)])
+def test_plot_requests_rasterize(n, rasterized):
+    plt = plot_requests(make_request_data(n), threshold=50)
+    assert isinstance(plt, hv.DynamicMap) == rasterized
+
+
+def test_plot_frames():
+    frame_data = pd.DataFrame(
+        {
+            'startTime': [0.0, 16.0, 32.0, 48.0],
+            'endTime': [16.0, 32.0, 48.0, 64.0],
+            'idle': [True, False, False, False],
+            'isPartial': [False, True, False, False],
+            'dropped': [False, True, True, False],
+            'drawn': [False, False, True, False],
+        }
+    )
+    plt = plot_frames(frame_data)
+    assert plt.dimension_values('state').tolist() == ['idle', 'dropped', 'drawn']
+    assert plt.dimension_values('color').tolist() == ['lightgrey', 'red', 'lightgreen']
@@ -0,0 +1,85 @@
+import base64
+
+import cv2 as cv
+import numpy as np
+import pytest
+
+from carbonplan_benchmarks.analysis.processing import calculate_snapshot_rmse
+
+METADATA = {'zoom_level': 0, 'zarr_version': 3, 'pixels_per_tile': 128, 'projection': 3857}
+
+
+def encode(image):
+    return base64.b64encode(cv.imencode('.jpg', image, [cv.IMWRITE_JPEG_QUALITY, 100])[1]).decode()
+
+
+def make_image(*, width, height, sidebar, sidebar_value=0):
+    """Grey map with a sidebar of ``sidebar`` columns on the left"""
+    image = np.full((height, width, 3), 128, dtype=np.uint8)
+    image[:, :sidebar] = sidebar_value
+    return image
+
+
+def make_snapshots(**profiles):
+    baseline = make_image(width=100, height=60, sidebar=20)
+    snapshots = {'3': {'128': {'3857': {'0': encode(baseline)}}}}
+    for profile, image in profiles.items():
+        snapshots[profile] = {'3': {'128': {'3857': {'0': encode(image)}}}}
+    return snapshots
+
+
+@pytest.mark.parametrize(
+    'viewport_width,width,height',
+    [
+        # Default profile
+        (1280, 100, 60),
+        # Twice the pixel ratio, so the sidebar is twice as many pixels wide
+        (1280, 200, 120),
+        # A wider viewport at the same pixel ratio shows more map but the same sidebar
+        (1920, 150, 60),
+    ],
+)
+def test_snapshot_rmse_follows_viewport(viewport_width, width, height):
+    sidebar = round(20 * width / 100 * 1280 / viewport_width)
+    frame = make_image(width=width, height=height, sidebar=sidebar, sidebar_value=255)
+    trace_events = [
+        {'name': 'TracingStartedInBrowser', 'ts': 1000, 'args': {}},
+        {'name': 'Screenshot', 'ts': 2000, 'args': {'snapshot': encode(frame)}},
+    ]
+    metadata = {**METADATA, 'device_profile': 'profile', 'viewport_width': viewport_width}
+    snapshots = make_snapshots(profile=make_image(width=width, height=height, sidebar=sidebar))
+    screenshots = calculate_snapshot_rmse(
+        trace_events=trace_events, snapshots=snapshots, metadata=metadata, xstart=20
+    )
+    assert screenshots['rmse_snapshot_0'].item() < 5
+    # Without baselines for the profile, the default baselines are resized when only the pixel
+    # ratio differs
+    if viewport_width == 1280:
+        screenshots = calculate_snapshot_rmse(
+            trace_events=trace_events, snapshots=make_snapshots(), metadata=metadata, xstart=20
+        )
+        assert screenshots['rmse_snapshot_0'].item() < 5
+
+
+@pytest.mark.parametrize(
+    'viewport_width,width,height',
+    [
+        # A wider viewport shows more of the map than the default baselines
+        (1920, 150, 60),
+        # A viewport with another aspect ratio
+        (1280, 100, 80),
+    ],
+)
+def test_snapshot_rmse_without_matching_baselines(viewport_width, width, height):
+    sidebar = round(20 * width / 100 * 1280 / viewport_width)
+    frame = make_image(width=width, height=height, sidebar=sidebar, sidebar_value=255)
+    trace_events = [
+        {'name': 'TracingStartedInBrowser', 'ts': 1000, 'args': {}},
+        {'name': 'Screenshot', 'ts': 2000, 'args': {'snapshot': encode(frame)}},
+    ]
+    metadata = {**METADATA, 'device_profile': 'profile', 'viewport_width': viewport_width}
+    with pytest.warns(UserWarning, match='rmse_snapshot_0'):
+        screenshots = calculate_snapshot_rmse(
+            trace_events=trace_events, snapshots=make_snapshots(), metadata=metadata, xstart=20
+        )
+    assert np.isnan(screenshots['rmse_snapshot_0'].item())
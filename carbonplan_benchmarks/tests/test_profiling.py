@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from carbonplan_benchmarks.analysis.processing import process_run
+from carbonplan_benchmarks.analysis.profiling import (
+    PROFILE_ENV_VAR,
+    profile_label,
+    profiling_enabled,
+    stage_profiler,
+    summarize_memory,
+    summarize_profiles,
+)
+from carbonplan_benchmarks.testing import make_trace
+
+
+@pytest.mark.parametrize('value,enabled', [('1', True), ('true', True), ('0', False), ('', False)])
+def test_profiling_enabled(value, enabled, monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV_VAR, value)
+    assert profiling_enabled() == enabled
+    # An explicit argument takes precedence over the environment variable
+    assert profiling_enabled(False) is False
+
+
+def test_profile_label():
+    assert profile_label({'trace_path': '2024-01-01T00-00-00-1.json'}) == '2024-01-01T00-00-00-1'
+    assert profile_label({'trace_path': None, 'run_number': 3}) == 'run-3'
+
+
+def test_stage_profiler(tmp_path):
+    stages, stage = stage_profiler(enabled=True, profile_dir=str(tmp_path), label='trace')
+    with stage('allocate', events=10):
+        data = [0] * 1_000_000
+    del data
+    assert stages[0]['stage'] == 'allocate'
+    assert stages[0]['events'] == 10
+    # A list of one million pointers takes 8 MB
+    assert stages[0]['peak_memory'] >= 8
+    assert (tmp_path / 'trace-allocate.prof').exists()
+
+
+def test_stage_profiler_disabled():
+    stages, stage = stage_profiler(enabled=False)
+    with stage('noop', events=10):
+        pass
+    assert stages == []
+
+
+def test_summarize_profiles():
+    profile_data = [
+        pd.DataFrame(
+            {
+                'stage': ['extract_request_data', 'calculate_snapshot_rmse'],
+                'wall_seconds': [1.0, 3.0 * run],
+                'peak_memory': [10.0, 100.0],
+                'events': [500_000, 500_000],
+            }
+        )
+        for run in (1, 2)
+    ]
+    summary = summarize_profiles(profile_data)
+    assert summary.index[0] == 'calculate_snapshot_rmse'
+    assert summary.loc['calculate_snapshot_rmse', 'runs'] == 2
+    assert summary.loc['calculate_snapshot_rmse', 'seconds_per_million_events'] == 9
+    assert summary['percent'].sum() == pytest.approx(100)
+
+
+def test_summarize_memory():
+    metadata, trace_events, snapshots = make_trace(
+        requests=20, frames=60, screenshots=12, image_size=(320, 180)
+    )
+    data = process_run(
+        metadata=metadata, trace_events=trace_events, snapshots=snapshots, profile=False
+    )
+    memory = summarize_memory(data)
+    assert {'request_data', 'frames_data', 'screenshot_data'} <= set(memory.index)
+    assert memory.loc['request_data', 'rows'] == 20
+    assert (memory['memory'] > 0).all()
+    # Screenshot images are not kept in the screenshot table
+    assert 'args.snapshot' not in data['screenshot_data']
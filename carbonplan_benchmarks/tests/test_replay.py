@@ -0,0 +1,81 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from carbonplan_benchmarks.replay import make_app, replay, summarize_replay
+
+REQUEST_DATA = pd.DataFrame(
+    {
+        'url': [f'https://example.com/data/0/tasmax/0.0.{x}' for x in range(8)],
+        'method': 'GET',
+        'request_start': [0.0, 1.0, 2.0, 3.0, 20.0, 21.0, 22.0, 23.0],
+        'response_end': [10.0, 11.0, 12.0, 13.0, 30.0, 31.0, 32.0, 33.0],
+        'encoded_data_length': [1000, 2000, 3000, 4000, 5000, 6000, 7000, 8000],
+    }
+)
+
+
+@pytest.mark.parametrize('http2', [False, True])
+@pytest.mark.parametrize('preserve_timing', [False, True])
+def test_replay(http2, preserve_timing):
+    replay_data = asyncio.run(
+        replay(
+            request_data=REQUEST_DATA,
+            http2=http2,
+            preserve_timing=preserve_timing,
+            max_connections=2,
+        )
+    )
+    assert (replay_data['status'] == 200).all()
+    assert replay_data['bytes'].to_list() == REQUEST_DATA['encoded_data_length'].to_list()
+    assert (replay_data['http_version'] == ('HTTP/2' if http2 else 'HTTP/1.1')).all()
+    if preserve_timing:
+        assert (replay_data['request_start'] >= replay_data['scheduled_start']).all()
+
+    summary = summarize_replay(replay_data, request_data=REQUEST_DATA)
+    assert summary['requests'] == 8
+    assert summary['bytes'] == 36000
+    assert summary['p99_latency'] >= summary['median_latency']
+    assert summary['request_duration'] == 33.0
+
+
+def request(app, path, headers=()):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'path': path, 'query_string': b'', 'headers': list(headers)}
+    asyncio.run(app(scope, receive, send))
+    start, body = messages
+    return start['status'], dict(start['headers']), body['body']
+
+
+@pytest.mark.parametrize(
+    'byte_range,expected_range,expected_body',
+    [
+        (b'bytes=2-5', b'bytes 2-5/10', b'2345'),
+        (b'bytes=8-', b'bytes 8-9/10', b'89'),
+        (b'bytes=-3', b'bytes 7-9/10', b'789'),
+        (b'bytes=5-100', b'bytes 5-9/10', b'56789'),
+    ],
+)
+def test_range_request(byte_range, expected_range, expected_body):
+    app = make_app({'/chunk': b'0123456789'})
+    status, headers, body = request(app, '/chunk', [(b'range', byte_range)])
+    assert status == 206
+    assert headers[b'content-range'] == expected_range
+    assert body == expected_body
+
+
+@pytest.mark.parametrize('byte_range', [b'bytes=10-', b'bytes=20-30'])
+def test_unsatisfiable_range_request(byte_range):
+    app = make_app({'/chunk': b'0123456789'})
+    status, headers, body = request(app, '/chunk', [(b'range', byte_range)])
+    assert status == 416
+    assert headers[b'content-range'] == b'bytes */10'
+    assert body == b''
@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pandas as pd
+import psutil
+import pytest
+
+from carbonplan_benchmarks.analysis.resources import load_resource_data, summarize_resources
+from carbonplan_benchmarks.playwright.resources import (
+    classify_process,
+    sample_processes,
+    sample_resources,
+)
+
+
+def make_samples():
+    # One sample every 100 ms starting 1 s after the trace started
+    return [
+        {
+            'timestamp': 1 + ind * 0.1,
+            'JSHeapUsedSize': 1e6 * (ind + 1),
+            'Nodes': 100 + ind,
+            **{f'cpu_{group}': 0.01 * ind for group in ['browser', 'renderer', 'gpu', 'other']},
+            **{f'rss_{group}': 1e7 for group in ['browser', 'renderer', 'gpu', 'other']},
+        }
+        for ind in range(10)
+    ]
+
+
+@pytest.mark.parametrize(
+    'cmdline,group',
+    [
+        (['chrome', '--headless'], 'browser'),
+        (['chrome', '--type=renderer', '--lang=en-US'], 'renderer'),
+        (['chrome', '--type=gpu-process'], 'gpu'),
+        (['chrome', '--type=utility'], 'other'),
+    ],
+)
+def test_classify_process(cmdline, group):
+    assert classify_process(cmdline) == group
+
+
+def test_sample_processes():
+    sample = sample_processes([psutil.Process()])
+    assert sample['rss_browser'] > 0
+    assert sample['rss_renderer'] == 0
+
+
+def test_sample_resources():
+    class Client:
+        async def send(self, method):
+            return {'metrics': [{'name': 'Timestamp', 'value': 1.0}, {'name': 'Nodes', 'value': 5}]}
+
+    async def sample():
+        samples = []
+        task = asyncio.create_task(sample_resources(client=Client(), samples=samples, interval=0))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        return samples
+
+    samples = asyncio.run(sample())
+    assert samples
+    assert samples[0]['Nodes'] == 5
+    assert samples[0]['JSHeapUsedSize'] is None
+
+
+def test_summarize_resources(tmp_path):
+    (tmp_path / 'resources.json').write_text(json.dumps(make_samples()))
+    metadata = {
+        'metadata_path': str(tmp_path / 'data.json'),
+        'resources_path': 'resources.json',
+    }
+    trace_events = [{'name': 'TracingStartedInBrowser', 'ts': 1000, 'args': {}}]
+    resource_data = load_resource_data(metadata=metadata, trace_events=trace_events)
+    assert resource_data['startTime'].round(6).to_list()[:3] == [999, 1099, 1199]
+
+    action_data = pd.DataFrame({'start_time': [1000, 1300], 'end_time': [1300, 2000]})
+    resources = summarize_resources(resource_data=resource_data, action_data=action_data)
+    # Samples at 1099, 1199 and 1299 ms fall in the first action
+    assert resources.loc[0, 'peak_js_heap'] == 4
+    assert resources.loc[0, 'peak_dom_nodes'] == 103
+    assert round(resources.loc[0, 'renderer_cpu_seconds'], 6) == 0.03
+    assert round(resources.loc[1, 'renderer_cpu_seconds'], 6) == 0.06
+    assert resources.loc[1, 'gpu_peak_rss'] == 10
+
+
+def test_no_resources():
+    assert load_resource_data(metadata={'resources_path': None}, trace_events=[]) is None
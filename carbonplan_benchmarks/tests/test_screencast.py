@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from carbonplan_benchmarks.playwright.screencast import (
+    CLOCK_SYNC_MARK,
+    screencast_events,
+    screencast_recorder,
+)
+
+
+class Session:
+    def __init__(self):
+        self.sent = []
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+
+    async def detach(self):
+        pass
+
+
+class Context:
+    def __init__(self, session):
+        self.session = session
+
+    async def new_cdp_session(self, page):
+        return self.session
+
+
+class Page:
+    async def evaluate(self, script):
+        return 1.7e12
+
+
+def test_screencast_recorder():
+    session = Session()
+
+    async def record():
+        async with screencast_recorder(
+            context=Context(session), page=Page(), max_width=640, quality=50
+        ) as capture:
+            await session.handlers['Page.screencastFrame'](
+                {'data': 'frame', 'metadata': {'timestamp': 1.7e9 + 0.5}, 'sessionId': 3}
+            )
+        return capture
+
+    capture = asyncio.run(record())
+    assert capture == {
+        'clock_sync': 1.7e12,
+        'frames': [{'timestamp': 1.7e9 + 0.5, 'data': 'frame'}],
+    }
+    assert session.sent == [
+        (
+            'Page.startScreencast',
+            {'format': 'jpeg', 'quality': 50, 'everyNthFrame': 1, 'maxWidth': 640},
+        ),
+        ('Page.screencastFrameAck', {'sessionId': 3}),
+        ('Page.stopScreencast', None),
+    ]
+
+
+def test_screencast_events():
+    capture = {
+        'clock_sync': 1.7e12,
+        'frames': [
+            {'timestamp': 1.7e9 + 0.25, 'data': 'first'},
+            {'timestamp': 1.7e9 + 1, 'data': 'second'},
+        ],
+    }
+    trace_events = [{'name': CLOCK_SYNC_MARK, 'ph': 'R', 'pid': 2, 'ts': 5e9}]
+    events = screencast_events(capture=capture, trace_events=trace_events)
+    # Frames are placed on the trace clock relative to the clock sync mark
+    assert [event['ts'] for event in events] == pytest.approx([5e9 + 2.5e5, 5e9 + 1e6])
+    assert [event['args']['snapshot'] for event in events] == ['first', 'second']
+    assert all(event['name'] == 'Screenshot' for event in events)
+    with pytest.raises(ValueError):
+        screencast_events(capture=capture, trace_events=[])
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from carbonplan_benchmarks.analysis.parsing import extract_request_data, parse_range
+from carbonplan_benchmarks.analysis.sharding import summarize_coalescing
+
+SHARD = 'https://example.com/data/pyramids-v3-3857-True-128-1-both-50-f4-0-0-gzipL1-100/1/tasmax/c/0/0/0'
+
+
+def make_trace_events(ranges):
+    trace_events = [{'name': 'TracingStartedInBrowser', 'ts': 1000, 'args': {}}]
+    for ind, (start, end, size) in enumerate(ranges):
+        ts = 2000 + ind * 1000
+        request = {'requestId': str(ind), 'url': SHARD, 'requestMethod': 'GET', 'priority': 'High'}
+        headers = [{'name': 'Content-Range', 'value': f'bytes {start}-{end}/{size}'}]
+        trace_events += [
+            {'name': 'ResourceSendRequest', 'ts': ts, 'args': {'data': request}},
+            {
+                'name': 'ResourceReceiveResponse',
+                'ts': ts + 400,
+                'args': {'data': {'requestId': str(ind), 'statusCode': 206, 'headers': headers}},
+            },
+            {
+                'name': 'ResourceFinish',
+                'ts': ts + 500,
+                'args': {'data': {'requestId': str(ind), 'encodedDataLength': end - start + 1}},
+            },
+        ]
+    return trace_events
+
+
+def test_parse_range():
+    assert parse_range(content_range='bytes 0-99/1000')[:3] == (0, 99, 1000)
+    assert parse_range(range_header='bytes=-16')[3] == 16
+    assert parse_range(range_header='bytes=10-19')[:2] == (10, 19)
+
+
+def test_extract_request_ranges():
+    request_data = extract_request_data(trace_events=make_trace_events([(0, 99, 1000)]))
+    assert request_data.loc[0, 'status_code'] == 206
+    assert request_data.loc[0, ['range_start', 'range_end', 'object_size']].to_list() == [
+        0,
+        99,
+        1000,
+    ]
+
+
+def test_summarize_coalescing():
+    trace_events = make_trace_events(
+        [(968, 999, 1000), (0, 99, 1000), (100, 199, 1000), (150, 299, 1000), (500, 599, 1000)]
+    )
+    request_data = extract_request_data(trace_events=trace_events)
+    action_data = pd.DataFrame({'start_time': [0], 'action_end_time': [100]})
+    summary = summarize_coalescing(request_data=request_data, action_data=action_data)
+    row = summary.iloc[0]
+    assert row['range_requests'] == 4
+    assert row['index_requests'] == 1
+    assert row['index_bytes'] == 32
+    assert row['adjacent_ranges'] == 1
+    assert row['overlapping_ranges'] == 1
+    assert row['coalesced_requests'] == 2
+    assert row['coalescible_requests'] == 2
+    assert row['wasted_bytes'] == 50
+
+    summary = summarize_coalescing(request_data=request_data, action_data=action_data, max_gap=200)
+    assert summary.loc[0, 'coalesced_requests'] == 1
+    assert summary.loc[0, 'gap_bytes'] == 200
@@ -0,0 +1,77 @@
+import pandas as pd
+
+from carbonplan_benchmarks.analysis.simulation import (
+    extract_tile_requests,
+    simulate_layout,
+    suggest_layouts,
+    time_chunk_length,
+)
+
+URL = 'https://example.com/data/pyramids-v2-3857-True-128-1-0-0-f4-0-0-0-gzipL1-100'
+METADATA = {
+    'dataset': 'pyramids-v2-3857-True-128-1-0-0-f4-0-0-0-gzipL1-100',
+    'variable': 'tasmax',
+    'pixels_per_tile': 128,
+    'target_chunk_size': 1,
+    'shard_size': 0,
+}
+
+
+def make_tile_requests():
+    request_data = pd.DataFrame(
+        {
+            'request_start': [5, 10, 110, 120, 130, 140, 150],
+            'encoded_data_length': [100, 30000, 30000, 30000, 30000, 30000, 30000],
+            'url': [
+                f'{URL}/.zmetadata',
+                f'{URL}/0/tasmax/0.0.0',
+                f'{URL}/1/tasmax/0.0.0',
+                f'{URL}/1/tasmax/0.0.1',
+                f'{URL}/1/tasmax/0.1.0',
+                f'{URL}/1/tasmax/0.1.1',
+                f'{URL}/1/time/0',
+            ],
+        }
+    )
+    action_data = pd.DataFrame({'start_time': [0, 100], 'action_end_time': [100, 200]})
+    return extract_tile_requests(
+        request_data=request_data, action_data=action_data, metadata=METADATA
+    )
+
+
+def test_extract_tile_requests():
+    tiles = make_tile_requests()
+    assert tiles['action'].to_list() == [0, 1, 1, 1, 1]
+    assert tiles['level'].to_list() == [0, 1, 1, 1, 1]
+    assert tiles[['y', 'x']].values.tolist() == [[0, 0], [0, 0], [0, 1], [1, 0], [1, 1]]
+
+
+def test_simulate_recorded_layout():
+    tiles = make_tile_requests()
+    simulation = simulate_layout(tile_requests=tiles, pixels_per_tile=128, target_chunk_size=1)
+    assert simulation['requests'].to_list() == [1, 4]
+    assert simulation['bytes'].to_list() == [30000, 120000]
+
+
+def test_simulate_larger_tiles():
+    tiles = make_tile_requests()
+    simulation = simulate_layout(tile_requests=tiles, pixels_per_tile=256, target_chunk_size=1)
+    # 256 pixel tiles cover the level 1 footprint with the single level 0 tile,
+    # which has already been fetched for the initial load
+    assert simulation['chunk_requests'].to_list() == [1, 0]
+    assert time_chunk_length(pixels_per_tile=256, target_chunk_size=1) == 3
+
+
+def test_simulate_sharded_layout():
+    tiles = make_tile_requests()
+    simulation = simulate_layout(
+        tile_requests=tiles, pixels_per_tile=128, target_chunk_size=1, shard_size=5
+    )
+    assert simulation['chunk_requests'].to_list() == [1, 4]
+    assert simulation['index_requests'].to_list() == [1, 1]
+
+
+def test_suggest_layouts():
+    layouts = suggest_layouts(tile_requests=make_tile_requests(), top=3)
+    assert len(layouts) == 3
+    assert layouts['estimated_latency'].is_monotonic_increasing
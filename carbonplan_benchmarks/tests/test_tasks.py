@@ -0,0 +1,76 @@
+import pandas as pd
+
+from carbonplan_benchmarks.analysis.tasks import extract_task_data, summarize_tasks
+
+
+def task(name, tid, start, end, pid=1):
+    return {
+        'name': name,
+        'ph': 'X',
+        'pid': pid,
+        'tid': tid,
+        'ts': (start + 1) * 1e3,
+        'dur': (end - start) * 1e3,
+    }
+
+
+def thread(name, tid, pid=1):
+    return {
+        'name': 'thread_name',
+        'ph': 'M',
+        'pid': pid,
+        'tid': tid,
+        'ts': 0,
+        'args': {'name': name},
+    }
+
+
+TRACE_EVENTS = [
+    {'name': 'TracingStartedInBrowser', 'ph': 'I', 'pid': 1, 'tid': 1, 'ts': 1000, 'args': {}},
+    thread('CrRendererMain', 1),
+    thread('DedicatedWorker thread', 2),
+    {
+        'name': 'process_name',
+        'ph': 'M',
+        'pid': 2,
+        'tid': 1,
+        'ts': 0,
+        'args': {'name': 'GPU Process'},
+    },
+    task('RunTask', 1, 0, 10),
+    task('FunctionCall', 1, 1, 8),
+    task('V8.GC_SCAVENGER', 1, 2, 3),
+    task('Layout', 1, 8, 9),
+    task('RunTask', 1, 30, 40),
+    task('FunctionCall', 2, 0, 5),
+    task('RunTask', 1, 4, 6, pid=2),
+]
+
+
+def test_extract_task_data():
+    tasks = extract_task_data(trace_events=TRACE_EVENTS)
+    assert len(tasks) == 7
+    assert tasks.groupby('category').size().to_dict() == {
+        'decode': 1,
+        'gc': 1,
+        'gpu': 1,
+        'rendering': 1,
+        'scripting': 1,
+    }
+
+
+def test_summarize_tasks():
+    tasks = extract_task_data(trace_events=TRACE_EVENTS)
+    action_data = pd.DataFrame({'start_time': [0.0, 25.0], 'end_time': [20.0, 35.0]})
+    summary = summarize_tasks(task_data=tasks, action_data=action_data).round(6)
+    assert summary.loc[0].to_dict() == {
+        'gpu_time': 2,
+        'gc_time': 1,
+        'decode_time': 5,
+        'rendering_time': 1,
+        'scripting_time': 6,
+        'other_time': 2,
+        'main_thread_busy': 10,
+    }
+    assert summary.loc[1, 'other_time'] == 5
+    assert summary.loc[1, 'main_thread_busy'] == 5
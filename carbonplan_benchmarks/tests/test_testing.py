@@ -0,0 +1,36 @@
+import pytest
+
+from carbonplan_benchmarks.analysis import create_summary, load_data, load_snapshots, process_run
+from carbonplan_benchmarks.testing import make_trace, write_trace
+
+
+@pytest.mark.parametrize('zoom_levels', [0, 2])
+def test_make_trace(zoom_levels):
+    metadata, trace_events, snapshots = make_trace(
+        requests=30, frames=90, screenshots=12, zoom_levels=zoom_levels, image_size=(320, 180)
+    )
+    data = process_run(
+        metadata=metadata, trace_events=trace_events, snapshots=snapshots, profile=False
+    )
+    assert len(data['request_data']) == 30
+    action_data = data['action_data']
+    assert len(action_data) == zoom_levels + 1
+    # Screenshots match the baseline of each action halfway through the action
+    assert (action_data['duration'] == 2500).all()
+    assert (action_data['min_rmse'] == 0).all()
+    summary = create_summary(metadata=metadata, data=data, profile=False, chunk_size=False)
+    assert summary['filtered_requests'].sum() == 30
+    assert 'actual_chunk_size' not in summary
+
+
+def test_write_trace(tmp_path):
+    metadata_path, snapshot_path = write_trace(
+        tmp_path, requests=10, frames=30, screenshots=6, image_size=(320, 180)
+    )
+    metadata, trace_events = load_data(metadata_path=metadata_path, run=0)
+    expected, expected_events, snapshots = make_trace(
+        requests=10, frames=30, screenshots=6, image_size=(320, 180)
+    )
+    assert {key: metadata[key] for key in expected} == expected
+    assert load_snapshots(snapshot_path=snapshot_path) == snapshots
+    assert len(trace_events) == len(expected_events)
@@ -0,0 +1,126 @@
+import asyncio
+import pathlib
+import shutil
+
+import pytest
+import upath
+
+from carbonplan_benchmarks.playwright.upload import (
+    background_uploader,
+    is_remote,
+    upload_file,
+    upload_status,
+)
+
+
+@pytest.fixture
+def memory_dir():
+    path = upath.UPath('memory://benchmark-data/test')
+    yield path
+    if path.exists():
+        path.fs.rm(path.path, recursive=True)
+
+
+def test_is_remote(tmp_path, memory_dir):
+    assert not is_remote(upath.UPath(tmp_path))
+    assert is_remote(memory_dir)
+
+
+def test_upload_file_retries(tmp_path, memory_dir, monkeypatch):
+    source = tmp_path / 'trace.json'
+    source.write_text('{"traceEvents": []}')
+    destination = memory_dir / 'trace.json'
+    put_file = destination.fs.put_file
+    calls = []
+
+    def flaky_put_file(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError('connection reset')
+        return put_file(*args, **kwargs)
+
+    monkeypatch.setattr(destination.fs, 'put_file', flaky_put_file)
+    upload = upload_file(source=source, destination=destination, backoff=0)
+    assert upload['attempts'] == 2
+    assert upload['size'] == len('{"traceEvents": []}')
+    assert destination.read_text() == '{"traceEvents": []}'
+
+
+def test_upload_file_checksum_mismatch(tmp_path, memory_dir, monkeypatch):
+    source = tmp_path / 'trace.json'
+    source.write_text('{"traceEvents": []}')
+    destination = memory_dir / 'trace.json'
+    put_file = destination.fs.put_file
+    calls = []
+
+    def corrupting_put_file(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            # Same size as the source, different content
+            destination.fs.pipe_file(destination.path, b'{"traceEvents": {}}')
+            return
+        return put_file(*args, **kwargs)
+
+    monkeypatch.setattr(destination.fs, 'put_file', corrupting_put_file)
+    upload = upload_file(source=source, destination=destination, backoff=0)
+    assert upload['attempts'] == 2
+    assert destination.read_text() == '{"traceEvents": []}'
+
+    monkeypatch.setattr(
+        destination.fs,
+        'put_file',
+        lambda *args, **kwargs: destination.fs.pipe_file(destination.path, b'{"traceEvents": {}}'),
+    )
+    with pytest.raises(OSError, match='SHA-256'):
+        upload_file(source=source, destination=destination, retries=2, backoff=0)
+
+
+def test_background_uploader(tmp_path, memory_dir):
+    records = [{'run_number': ind} for ind in range(3)]
+
+    async def save_all():
+        async with background_uploader(data_dir=memory_dir, max_pending=1) as save:
+            for record in records:
+                await save(f'{record["run_number"]}.json', '[]', record=record)
+                await save(f'{record["run_number"]}-resources.json', '[]', record=record)
+
+    asyncio.run(save_all())
+    for record in records:
+        assert upload_status(record) == 'complete'
+        assert set(record['uploads']) == {
+            f'{record["run_number"]}.json',
+            f'{record["run_number"]}-resources.json',
+        }
+        assert (memory_dir / f'{record["run_number"]}.json').read_text() == '[]'
+
+
+def test_background_uploader_failure(memory_dir, monkeypatch):
+    def failing_put_file(*args, **kwargs):
+        raise OSError('service unavailable')
+
+    monkeypatch.setattr(memory_dir.fs, 'put_file', failing_put_file)
+    monkeypatch.setattr('carbonplan_benchmarks.playwright.upload.time.sleep', lambda _: None)
+    record = {}
+
+    async def save():
+        async with background_uploader(data_dir=memory_dir) as save:
+            await save('0.json', '[]', record=record)
+
+    asyncio.run(save())
+    assert upload_status(record) == 'failed'
+    # The staged copy is kept for a manual retry
+    staged_path = pathlib.Path(record['uploads']['0.json']['staged_path'])
+    assert staged_path.read_text() == '[]'
+    shutil.rmtree(staged_path.parent)
+
+
+def test_background_uploader_local(tmp_path):
+    record = {}
+
+    async def save():
+        async with background_uploader(data_dir=upath.UPath(tmp_path)) as save:
+            await save('0.json', '[]', record=record)
+
+    asyncio.run(save())
+    assert upload_status(record) == 'complete'
+    assert (tmp_path / '0.json').read_text() == '[]'
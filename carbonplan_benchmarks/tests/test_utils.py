@@ -1,4 +1,6 @@
-from carbonplan_benchmarks.utils import shuffle_runs
+import pandas as pd
+
+from carbonplan_benchmarks.utils import check_convergence, run_adaptive, schedule_runs, shuffle_runs
 
 
 def test_randomize_runs():
@@ -10,3 +12,88 @@ def test_randomize_runs():
         'carbonplan_benchmarks --dataset pyramids-v3-sharded-4326-1MB --non-headless',
         'carbonplan_benchmarks --dataset pyramids-v3-sharded-4326-5MB --non-headless',
     }
+
+
+def make_summary(durations):
+    return pd.DataFrame(
+        [
+            {
+                'dataset': dataset,
+                'trace_path': f'{dataset}-{run}.json',
+                'zoom': zoom,
+                'duration': duration,
+            }
+            for dataset, values in durations.items()
+            for run, duration in enumerate(values)
+            for zoom in range(2)
+        ]
+    )
+
+
+def test_check_convergence():
+    summary = make_summary(
+        {'stable': [1000, 1001, 999, 1000], 'noisy': [500, 1500, 800, 2000], 'new': [1000]}
+    )
+    convergence = check_convergence(summary, target_width=0.05, min_runs=3, seed=0)
+    assert convergence['stable'].to_dict() == {'new': False, 'noisy': False, 'stable': True}
+    assert convergence.loc['noisy', 'runs'] == 4
+
+
+def test_check_convergence_configurations():
+    # Three cold cache runs and one warm cache run, each loading then zooming out back to zoom 0
+    summary = pd.DataFrame(
+        [
+            {
+                'dataset': 'a',
+                'trace_path': f'{run}.json',
+                'cache_mode': 'warm' if run == 3 else 'cold',
+                'action_index': action_index,
+                'zoom': 0,
+                'duration': 1000,
+            }
+            for run in range(4)
+            for action_index in range(2)
+        ]
+    )
+    convergence = check_convergence(summary, min_runs=3, seed=0)
+    assert convergence.loc['a', 'runs'] == 1
+    assert not convergence.loc['a', 'stable']
+    convergence = check_convergence(summary, by=['dataset', 'zoom'], min_runs=3, seed=0)
+    assert convergence.loc['a', 'runs'] == 4
+    assert convergence.loc['a', 'stable']
+
+
+def test_schedule_runs():
+    datasets = ['stable', 'noisy', 'new', 'unseen']
+    summary = make_summary(
+        {'stable': [1000, 1001, 999, 1000], 'noisy': [500, 1500, 800, 2000], 'new': [1000]}
+    )
+    commands = schedule_runs(
+        datasets=datasets,
+        summary=summary,
+        min_runs=3,
+        max_runs=5,
+        convergence_kwargs={'target_width': 0.05, 'seed': 0},
+        timeout=5000,
+    )
+    counts = pd.Series(commands).value_counts().to_dict()
+    assert counts == {
+        'carbonplan_benchmarks --dataset unseen --timeout 5000': 3,
+        'carbonplan_benchmarks --dataset new --timeout 5000': 2,
+        'carbonplan_benchmarks --dataset noisy --timeout 5000': 1,
+    }
+    assert schedule_runs(datasets=['stable'], summary=summary, min_runs=3) == []
+
+
+def test_run_adaptive():
+    executed = []
+    summary = run_adaptive(
+        datasets=['a', 'b'],
+        summarize=lambda: make_summary(
+            {dataset: [1000] * executed.count(dataset) for dataset in ['a', 'b']}
+        ),
+        execute=lambda command: executed.append(command.split()[2]),
+        min_runs=3,
+    )
+    assert sorted(executed) == ['a', 'a', 'a', 'b', 'b', 'b']
+    assert len(summary) == 12
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from carbonplan_benchmarks.analysis.visual import summarize_visual_progress
+
+
+def test_summarize_visual_progress():
+    screenshot_data = pd.DataFrame(
+        {
+            'startTime': [0.0, 10.0, 20.0, 30.0, 40.0, 110.0, 120.0, 130.0],
+            'rmse_snapshot_0': [40.0, 40.0, 20.0, 4.0, 0.0, 30.0, 30.0, 30.0],
+            'rmse_snapshot_1': [50.0, 50.0, 50.0, 50.0, 40.0, 30.0, 10.0, 0.0],
+        }
+    )
+    action_data = pd.DataFrame({'start_time': [5.0, 100.0], 'action_end_time': [100.0, 200.0]})
+    summary = summarize_visual_progress(screenshot_data=screenshot_data, action_data=action_data)
+    assert summary.loc[0].to_dict() == {
+        'first_visual_change': 15.0,
+        'visually_complete_50': 15.0,
+        'visually_complete_90': 25.0,
+        'visually_complete_100': 35.0,
+        'speed_index': 5 + 10 + 0.5 * 10 + 0.1 * 10,
+    }
+    # Progress starts from the last screenshot before the action
+    assert summary.loc[1].to_dict() == {
+        'first_visual_change': 10.0,
+        'visually_complete_50': 20.0,
+        'visually_complete_90': 30.0,
+        'visually_complete_100': 30.0,
+        'speed_index': 10 + 0.75 * 10 + 0.25 * 10,
+    }
@@ -1,5 +1,23 @@
+import subprocess
+
+import numpy as np
 import pandas as pd
 
+# Summary columns identifying a benchmark configuration, whose runs are comparable
+CONFIGURATION_COLUMNS = [
+    'dataset',
+    'action',
+    'zoom',
+    'action_index',
+    'action_type',
+    'device_profile',
+    'cache_mode',
+    'rendering_backend',
+    'screenshot_mode',
+    'software_rendering',
+    'headless',
+]
+
 
 def shuffle_runs(*, datasets: list, nruns: int, **kwargs):
     """
@@ -33,3 +51,236 @@ def shuffle_runs(*, datasets: list, nruns: int, **kwargs):
             df['command'] = df['command'] + ' ' + str(value)
     df = df.loc[df.index.repeat(nruns)].reset_index(drop=True).sample(frac=1)
     return df['command'].to_list()
+
+
+def resample_means(values: np.ndarray, *, nboot: int, rng: np.random.Generator):
+    """
+    Means of ``nboot`` bootstrap resamples of a sample
+    """
+    return rng.choice(values, size=(nboot, len(values))).mean(axis=1)
+
+
+def percentile_interval(estimates: np.ndarray, *, confidence: float):
+    """
+    Percentile confidence interval from bootstrap estimates
+    """
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(estimates, [tail, 100 - tail])
+    return low, high
+
+
+def bootstrap_ci(values, *, confidence: float = 0.95, nboot: int = 1000, seed: int = None):
+    """
+    Bootstrap confidence interval for the mean of a sample
+
+    Parameters
+    ----------
+
+    values: array-like
+        Sample values
+
+    confidence: float
+        Confidence level of the interval
+
+    nboot: int
+        Number of bootstrap resamples
+
+    seed: int, optional
+        Seed for the random number generator
+
+
+    Returns
+    -------
+    low, high : float
+        Bounds of the confidence interval, NaN for samples with fewer than two values
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) < 2:
+        return np.nan, np.nan
+    rng = np.random.default_rng(seed)
+    return percentile_interval(resample_means(values, nboot=nboot, rng=rng), confidence=confidence)
+
+
+def check_convergence(
+    summary: pd.DataFrame,
+    *,
+    metric: str = 'duration',
+    by: list = None,
+    target_width: float = 0.1,
+    min_runs: int = 3,
+    max_runs: int = 25,
+    confidence: float = 0.95,
+    seed: int = None,
+):
+    """
+    Check which datasets have a stable estimate of a metric
+
+    A dataset is stable once each of its configurations, e.g. each zoom level, cache mode or
+    device profile, has at least ``min_runs`` runs and a confidence interval on the mean of
+    ``metric`` narrower than ``target_width`` times the mean, or once each configuration reaches
+    ``max_runs`` runs.
+
+    Parameters
+    ----------
+
+    summary: pd.DataFrame
+        Consolidated summary of all runs so far, as returned by ``create_summary``
+
+    metric: str
+        Column to estimate
+
+    by: list, optional
+        Columns identifying a configuration, including ``dataset``. Defaults to the
+        ``CONFIGURATION_COLUMNS`` present in the summary
+
+    target_width: float
+        Target width of the confidence interval relative to the mean
+
+    min_runs, max_runs: int
+        Minimum and maximum number of runs per dataset
+
+    confidence: float
+        Confidence level of the interval
+
+    seed: int, optional
+        Seed for the bootstrap resampling
+
+
+    Returns
+    -------
+    convergence : DataFrame with the runs, interval and stability of each dataset
+    """
+    if 'dataset' not in summary.columns:
+        summary = summary.reset_index()
+
+    by = by or [c for c in CONFIGURATION_COLUMNS if c in summary.columns]
+
+    def interval(group):
+        values = group[metric]
+        low, high = bootstrap_ci(values, confidence=confidence, seed=seed)
+        return pd.Series(
+            {
+                # Each run has a row per action, all with the same trace
+                'runs': group['trace_path'].nunique(),
+                'mean': values.mean(),
+                'ci_low': low,
+                'ci_high': high,
+                'relative_width': (high - low) / values.mean(),
+            }
+        )
+
+    configurations = summary.groupby(by, dropna=False)[[metric, 'trace_path']].apply(interval)
+    convergence = configurations.groupby('dataset').agg(
+        runs=('runs', 'min'), relative_width=('relative_width', 'max')
+    )
+    convergence['stable'] = (
+        (convergence['runs'] >= min_runs) & (convergence['relative_width'] <= target_width)
+    ) | (convergence['runs'] >= max_runs)
+    return convergence
+
+
+def schedule_runs(
+    *,
+    datasets: list,
+    summary: pd.DataFrame = None,
+    batch_size: int = 1,
+    min_runs: int = 3,
+    max_runs: int = 25,
+    convergence_kwargs: dict = None,
+    **kwargs,
+):
+    """
+    Create a shuffled set of run commands for the datasets whose results are not yet stable
+
+    Parameters
+    ----------
+
+    datasets: list
+        List of datasets to include
+
+    summary: pd.DataFrame, optional
+        Consolidated summary of all runs so far. Every dataset gets ``min_runs`` runs if None
+
+    batch_size: int
+        Number of additional runs for each unstable dataset once it has ``min_runs`` runs
+
+    min_runs, max_runs: int
+        Minimum and maximum number of runs per dataset
+
+    convergence_kwargs: dict, optional
+        Additional parameters passed to ``check_convergence``
+
+    **kwargs
+        Additional flags and parameters to include in the commands
+
+
+    Returns
+    -------
+    commands : list
+        List containing shuffled CLI commands, empty once every dataset is stable
+    """
+    runs = pd.Series(0, index=pd.Index(datasets, name='dataset'))
+    stable = pd.Series(False, index=runs.index)
+    if summary is not None and len(summary):
+        convergence = check_convergence(
+            summary, min_runs=min_runs, max_runs=max_runs, **(convergence_kwargs or {})
+        )
+        runs = convergence['runs'].reindex(runs.index, fill_value=0)
+        stable = convergence['stable'].reindex(stable.index, fill_value=False)
+    nruns = np.minimum(np.maximum(min_runs - runs, batch_size), max_runs - runs)
+    commands = [
+        command
+        for dataset, n in nruns[~stable].items()
+        if n > 0
+        for command in shuffle_runs(datasets=[dataset], nruns=int(n), **kwargs)
+    ]
+    return pd.Series(commands, dtype=object).sample(frac=1).to_list()
+
+
+def run_adaptive(
+    *,
+    datasets: list,
+    summarize,
+    execute=None,
+    max_rounds: int = 100,
+    **kwargs,
+):
+    """
+    Run benchmarks until the results for every dataset are stable
+
+    Parameters
+    ----------
+
+    datasets: list
+        List of datasets to include
+
+    summarize: callable
+        Function returning the consolidated summary of all runs so far, called after each round
+
+    execute: callable, optional
+        Function running a single CLI command. Defaults to running it in a shell
+
+    max_rounds: int
+        Maximum number of scheduling rounds
+
+    **kwargs
+        Additional parameters passed to ``schedule_runs``
+
+
+    Returns
+    -------
+    summary : pd.DataFrame
+        Consolidated summary after the last round
+    """
+    if execute is None:
+        execute = lambda command: subprocess.run(command, shell=True, check=False)
+    summary = None
+    for _ in range(max_rounds):
+        commands = schedule_runs(datasets=datasets, summary=summary, **kwargs)
+        if not commands:
+            break
+        for command in commands:
+            execute(command)
+        summary = summarize()
+    return summary